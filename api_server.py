@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""Headless HTTP API for RTMP URL generation and saved configs.
+
+A small HTTP/1.1 keep-alive server on plain asyncio streams. It has no
+framework or per-request script execution, so one core can serve
+thousands of requests per second.
+
+    python api_server.py --port 8510
+
+Responses include decrypted stream keys, so the server listens on
+127.0.0.1 by default. With API_TOKEN set in the environment, every
+request needs an "Authorization: Bearer <token>" header, and only then
+will it listen on other interfaces (as the Docker image does).
+
+Endpoints (JSON in, JSON out):
+    GET  /platforms              platform registry (template, help, endpoints)
+    POST /generate               {"platform", "stream_key", "server_url", "app_name"}
+    POST /generate/batch         {"rows": [...], "save": false}
+    GET  /configs                [{"name", "platform"}, ...] from the store index
+    GET  /configs/<name>         one saved config
+    POST /configs                {"name", "platform", "stream_key", ...} -> saved config
+    DELETE /configs/<name>
+"""
+import argparse
+import asyncio
+import hmac
+import ipaddress
+import json
+import os
+from urllib.parse import unquote, urlsplit
+
+from config_store import InvalidConfigName, check_name
+from rtmp_core import RTMPGenerator
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+REASONS = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class APIServer:
+    def __init__(self, generator=None, token=None):
+        self.generator = generator or RTMPGenerator()
+        self._authorization = f"Bearer {token}".encode() if token else None
+        self.routes = {
+            ("GET", "/platforms"): self.list_platforms,
+            ("POST", "/generate"): self.generate,
+            ("POST", "/generate/batch"): self.generate_batch,
+            ("GET", "/configs"): self.list_configs,
+            ("POST", "/configs"): self.save_config,
+        }
+        self.prefix_routes = {
+            ("GET", "/configs/"): self.load_config,
+            ("DELETE", "/configs/"): self.delete_config,
+        }
+        # Handlers that touch the store (file locks, renames, SQLite) or can
+        # run long; they go to a worker thread so one slow save doesn't
+        # stall every other connection
+        self.blocking = {
+            self.generate_batch, self.list_configs, self.load_config, self.save_config, self.delete_config
+        }
+
+    # Handlers take (body, path_arg) and return (status, payload)
+
+    def list_platforms(self, body, arg):
+        return 200, {
+            name: {
+                "template": platform["template"],
+                "help": platform["help"],
+                "endpoints": platform.get("endpoints", [])
+            }
+            for name, platform in self.generator.platforms.items()
+        }
+
+    def generate(self, body, arg):
+        result = self.generator.generate_one(_require_object(body))
+        return (400 if "error" in result else 200), result
+
+    def generate_batch(self, body, arg):
+        body = _require_object(body)
+        rows = body.get("rows")
+        if not isinstance(rows, list):
+            raise HTTPError(400, "Expected a 'rows' list")
+        for number, row in enumerate(rows):
+            if not isinstance(row, (dict, list)):
+                raise HTTPError(400, f"rows[{number}] must be an object or a list")
+        results = self.generator.generate_many(rows)
+        if body.get("save"):
+            results = self.generator.save_many(results)
+        results = list(results)
+        return 200, {
+            "results": results,
+            "failed": sum("error" in result for result in results)
+        }
+
+    def list_configs(self, body, arg):
+        return 200, [
+            {"name": name, "platform": platform}
+            for name, platform in self.generator.store.list_index()
+        ]
+
+    def load_config(self, body, name):
+        config = self.generator.store.load(name)
+        if config is None:
+            raise HTTPError(404, f"No configuration named {name!r}")
+        return 200, config
+
+    def save_config(self, body, arg):
+        body = _require_object(body)
+        check_name(body.get("name"))
+        result = self.generator.generate_one(body)
+        if "error" in result:
+            return 400, result
+        saved = list(self.generator.save_many([result]))[0]
+        return (400 if "error" in saved else 201), saved
+
+    def delete_config(self, body, name):
+        if not self.generator.store.delete(name):
+            raise HTTPError(404, f"No configuration named {name!r}")
+        return 200, {"deleted": name}
+
+    def resolve(self, method, path):
+        """Return (handler, path argument) for a request, or raise HTTPError"""
+        handler = self.routes.get((method, path))
+        arg = None
+        if handler is None:
+            for (route_method, prefix), prefix_handler in self.prefix_routes.items():
+                if path.startswith(prefix) and len(path) > len(prefix):
+                    if route_method != method:
+                        continue
+                    handler, arg = prefix_handler, unquote(path[len(prefix):])
+                    try:
+                        check_name(arg)
+                    except InvalidConfigName as e:
+                        raise HTTPError(400, str(e))
+                    break
+        if handler is None:
+            known = {p for _, p in self.routes} | {p for _, p in self.prefix_routes}
+            if path in known or any(path.startswith(p) for p in known if p.endswith("/")):
+                raise HTTPError(405, f"{method} not allowed on {path}")
+            raise HTTPError(404, f"No route for {path}")
+        return handler, arg
+
+    async def dispatch(self, method, path, body):
+        handler, arg = self.resolve(method, path)
+        if handler in self.blocking:
+            return await asyncio.to_thread(handler, body, arg)
+        return handler(body, arg)
+
+    def authorized(self, headers):
+        if self._authorization is None:
+            return True
+        return hmac.compare_digest(headers.get("authorization", "").encode(), self._authorization)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, raw_body, keep_alive = request
+                try:
+                    if not self.authorized(headers):
+                        raise HTTPError(401, "Missing or wrong bearer token")
+                    body = json.loads(raw_body) if raw_body else None
+                    status, payload = await self.dispatch(method, path, body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except json.JSONDecodeError as e:
+                    status, payload = 400, {"error": f"Invalid JSON: {e}"}
+                except InvalidConfigName as e:
+                    status, payload = 400, {"error": str(e)}
+                except Exception as e:
+                    status, payload = 500, {"error": str(e)}
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except HTTPError as e:
+            writer.write(_response(e.status, {"error": str(e)}, False))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def _require_object(body):
+    if not isinstance(body, dict):
+        raise HTTPError(400, "Expected a JSON object body")
+    return body
+
+
+async def _read_request(reader):
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if e.partial:
+            raise
+        return None
+    except asyncio.LimitOverrunError:
+        raise HTTPError(413, "Request headers too large")
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "Malformed request line")
+
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            key, _, value = line.partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+    length = headers.get("content-length") or "0"
+    # int() alone would also take "-1", " 1" and "1_000"
+    if not (length.isascii() and length.isdigit()):
+        raise HTTPError(400, "Invalid Content-Length")
+    length = int(length)
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+
+    connection = headers.get("connection", "").lower()
+    keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+    return method.upper(), urlsplit(target).path.rstrip("/") or "/", headers, body, keep_alive
+
+
+def _response(status, payload, keep_alive):
+    body = json.dumps(payload).encode()
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        + ('WWW-Authenticate: Bearer realm="rtmp-generator"\r\n' if status == 401 else "")
+        + "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode() + body
+
+
+async def serve(host, port, api=None):
+    api = api or APIServer()
+    server = await asyncio.start_server(api.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+    return server
+
+
+def is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+async def serve_forever(host, port, token=None):
+    server = await serve(host, port, APIServer(token=token))
+    print(f"🎥 RTMP generator API listening on http://{host}:{port}/")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless RTMP URL generation API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8510)
+    args = parser.parse_args()
+    token = os.environ.get("API_TOKEN")
+    if not token and not is_loopback(args.host):
+        parser.error(f"refusing to serve stream keys on {args.host} without API_TOKEN set")
+    try:
+        asyncio.run(serve_forever(args.host, args.port, token))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
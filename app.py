@@ -1,75 +1,119 @@
+import os
+import sys
+import time
+
 import streamlit as st
-import json
-from pathlib import Path
+import config_watch
+import health
+import ingest_select
+import key_rotation
+import metrics
+import profile_export
+import rtmp_probe
+import simulcast
+from config_index import PREFIX, SUBSTRING, ConfigIndex
+from config_store import get_config_store
+from rtmp_core import RTMPGenerator
 
-class RTMPGenerator:
-    def __init__(self):
-        self.platforms = {
-            "twitch": {
-                "template": "rtmp://live.twitch.tv/app/{stream_key}",
-                "help": "Get stream key from Twitch Dashboard -> Settings -> Stream",
-                "server": "live.twitch.tv",
-                "app_name": "app"
-            },
-            "youtube": {
-                "template": "rtmp://a.rtmp.youtube.com/live2/{stream_key}",
-                "help": "Get stream key from YouTube Studio -> Go Live -> Create Stream",
-                "server": "a.rtmp.youtube.com", 
-                "app_name": "live2"
-            },
-            "facebook": {
-                "template": "rtmp://live-api-s.facebook.com:80/rtmp/{stream_key}",
-                "help": "Get stream key from Facebook Live API",
-                "server": "live-api-s.facebook.com:80",
-                "app_name": "rtmp"
-            },
-            "custom": {
-                "template": "rtmp://{server_url}/{app_name}/{stream_key}",
-                "help": "Enter custom RTMP server details for vMix",
-                "server": "",
-                "app_name": ""
-            }
-        }
+METRICS_PORT = os.environ.get("METRICS_PORT", "8511")
+RERUN_SECONDS = metrics.histogram(
+    "rtmp_ui_rerun_seconds", "Streamlit rerun time, in total and per section of main()", ("section",)
+)
+
+@st.cache_resource
+def get_generator():
+    """Platform registry shared by every session and rerun"""
+    return RTMPGenerator()
+
+@st.cache_resource
+def get_store():
+    return get_config_store()
+
+@st.cache_resource
+def get_config_watcher():
+    """Follows a json config directory for every session; None for SQLite"""
+    try:
+        return config_watch.watch(get_store())
+    except ImportError:
+        print("⚠️ watchdog is not installed; the sidebar rescans the config directory on changes", file=sys.stderr)
+        return None
+
+@st.cache_resource
+def get_config_index():
+    """Sidebar search index, updated incrementally by saves and deletes through get_store()
     
-    def generate_rtmp(self, platform, stream_key, server_url="", app_name=""):
-        if platform not in self.platforms:
-            return "Invalid platform selected"
-        
-        template = self.platforms[platform]["template"]
-        
-        if platform == "custom":
-            rtmp_url = template.format(
-                server_url=server_url,
-                app_name=app_name,
-                stream_key=stream_key
-            )
-        else:
-            rtmp_url = template.format(stream_key=stream_key)
-        
-        return rtmp_url
-    
-    def get_server_info(self, platform):
-        """Get server and app name for vMix configuration"""
-        if platform in self.platforms:
-            return {
-                "server": self.platforms[platform]["server"],
-                "app_name": self.platforms[platform]["app_name"]
-            }
-        return {"server": "", "app_name": ""}
+    For a json store it is built from the watcher's cache, and the watcher
+    applies changes made by other processes one file at a time.
+    """
+    watcher = get_config_watcher()
+    if watcher is not None:
+        return ConfigIndex.from_watcher(watcher)
+    return ConfigIndex.from_store(get_store())
 
-# Streamlit App
-def main():
-    st.set_page_config(
-        page_title="vMix RTMP URL Generator",
-        page_icon="🎥",
-        layout="wide"
-    )
+@st.cache_resource
+def start_status_server():
+    """/metrics, /healthz and /readyz for this process; METRICS_PORT="" disables them.
+
+    web_server.py normally starts the server before Streamlit, in which case
+    this only hands the monitor the app's store and index.
+    """
+    health.MONITOR.attach(get_store(), get_config_index())
+    if not METRICS_PORT:
+        return None
+    try:
+        return health.start(int(METRICS_PORT))
+    except OSError as e:
+        print(f"⚠️ Status endpoint not started on port {METRICS_PORT}: {e}", file=sys.stderr)
+        return None
+
+SIDEBAR_PAGE_SIZE = 25
+SIMULCAST_OPTIONS = 50
+
+def render_saved_configs(generator, store, index):
+    st.sidebar.title("💾 Saved Configs")
+    # Only rebuilds when another process (e.g. the CLI container) changed the
+    # store, and not even then when a watcher already applied the change
+    index.sync()
+    if not len(index):
+        st.sidebar.info("No saved configurations")
+        return
     
-    st.title("🎥 vMix RTMP URL Generator")
-    st.write("Generate RTMP URLs and configuration for vMix Streaming")
+    query = st.sidebar.text_input("🔍 Search configs", key="config_search", placeholder="Name contains...")
+    col1, col2 = st.sidebar.columns(2)
+    with col1:
+        mode = st.radio("Match", [SUBSTRING, PREFIX], key="config_match", format_func=str.capitalize)
+    with col2:
+        platform = st.selectbox(
+            "Platform", ["all"] + list(generator.platforms), key="config_platform", format_func=str.capitalize
+        )
     
-    generator = RTMPGenerator()
+    # Search results are cheap to recompute from the index; only one page is rendered
+    names = index.search(query, None if platform == "all" else platform, mode)
+    total = len(names)
+    if not total:
+        st.sidebar.info("No configurations match your search")
+        return
     
+    pages = -(-total // SIDEBAR_PAGE_SIZE)
+    page = 1
+    if pages > 1:
+        # A narrower search can leave the remembered page past the end
+        if st.session_state.get("config_page", 1) > pages:
+            st.session_state.config_page = 1
+        page = st.sidebar.number_input("Page", min_value=1, max_value=pages, value=1, key="config_page")
+    
+    first = (page - 1) * SIDEBAR_PAGE_SIZE
+    entries = [(name, index.platform(name) or "") for name in names[first:first + SIDEBAR_PAGE_SIZE]]
+    first += 1
+    st.sidebar.caption(f"Showing {first}–{first + len(entries) - 1} of {total} (page {page} of {pages})")
+    # The full config is only read from the store when its button is clicked
+    for name, saved_platform in entries:
+        if st.sidebar.button(f"📁 {name}", key=f"config_{name}", help=saved_platform.capitalize()):
+            st.session_state.loaded_config = store.load(name)
+            # Auto-fill form with loaded config
+            st.rerun()
+
+def render_generator(generator, store):
     # Platform selection
     platform = st.selectbox(
         "Select Streaming Platform",
@@ -89,6 +133,13 @@ def main():
         with col2:
             st.text_input("Application", value=server_info["app_name"], disabled=True)
     
+    use_fastest = False
+    if len(ingest_select.platform_endpoints(generator, platform)) > 1:
+        use_fastest = st.checkbox(
+            "⚡ Use fastest ingest server",
+            help="Measure the RTMP handshake time of each ingest server and use the quickest one"
+        )
+    
     # Input fields
     col1, col2 = st.columns(2)
     
@@ -120,21 +171,26 @@ def main():
         placeholder="My vMix YouTube Stream"
     )
     
+    skip_format_check = st.checkbox(
+        "Skip key format check",
+        help="Generate even if the stream key doesn't match the platform's usual format"
+    )
+    
     # Generate button
     if st.button("Generate vMix Configuration", type="primary"):
-        if not stream_key:
-            st.error("❌ Please enter a stream key")
-        elif platform == "custom" and (not server_url or not app_name):
-            st.error("❌ Please enter server URL and application name")
-        else:
-            # Generate RTMP URL
-            rtmp_url = generator.generate_rtmp(platform, stream_key, server_url, app_name)
-            
-            # Get server info for vMix
-            if platform == "custom":
-                server_info = {"server": server_url, "app_name": app_name}
+        errors = generator.validator.validate(platform, stream_key, server_url, app_name)
+        for error in errors:
+            st.error(f"❌ {error['message']}")
+        # Missing fields always block; format problems can be overridden
+        blocking = [e for e in errors if e["code"] != "format" or not skip_format_check]
+        if not blocking:
+            # Generate RTMP URL and the server/app split for vMix in one call
+            if use_fastest:
+                with st.spinner("Measuring ingest servers..."):
+                    rtmp_url, server, app = ingest_select.build_fastest(generator, platform, stream_key)
             else:
-                server_info = generator.get_server_info(platform)
+                rtmp_url, server, app = generator.build(platform, stream_key, server_url, app_name)
+            server_info = {"server": server, "app_name": app}
             
             st.success("✅ vMix Configuration Generated!")
             
@@ -178,9 +234,6 @@ def main():
             with tab3:
                 if config_name:
                     # Save configuration
-                    config_dir = Path("/app/configs")
-                    config_dir.mkdir(exist_ok=True)
-                    
                     config = {
                         "name": config_name,
                         "platform": platform,
@@ -192,9 +245,7 @@ def main():
                     }
                     
                     try:
-                        config_file = config_dir / f"{config_name}.json"
-                        with open(config_file, 'w') as f:
-                            json.dump(config, f, indent=2)
+                        store.save(config)
                         st.success(f"✅ Configuration saved as '{config_name}'")
                         
                         st.write("**Saved Configuration:**")
@@ -203,6 +254,214 @@ def main():
                         st.error(f"Error saving configuration: {e}")
                 else:
                     st.info("💡 Enter a configuration name above to save these settings")
+
+def render_probe_tab(generator, store):
+    st.subheader("📡 Ingest Server Health")
+    st.write("Check that the ingest servers of your saved configurations are reachable and how long the RTMP handshake takes.")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        concurrency = st.number_input("Parallel probes", min_value=1, max_value=500, value=rtmp_probe.DEFAULT_CONCURRENCY)
+    with col2:
+        timeout = st.number_input("Timeout (seconds)", min_value=0.5, max_value=60.0, value=rtmp_probe.DEFAULT_TIMEOUT)
+    
+    if st.button("Probe Saved Configurations"):
+        configs = store.load_all()
+        if not configs:
+            st.info("No saved configurations")
+            return
+        with st.spinner(f"Probing servers of {len(configs)} configuration(s)..."):
+            results = rtmp_probe.probe_configs(generator, configs, int(concurrency), timeout)
+        
+        reachable = sum(r["ok"] for r in results)
+        if reachable == len(results):
+            st.success(f"✅ All {len(results)} server(s) reachable")
+        else:
+            st.warning(f"⚠️ {len(results) - reachable} of {len(results)} server(s) unreachable")
+        
+        st.dataframe(
+            [
+                {
+                    "Server": r["server"],
+                    "Status": (f"⚠️ {r['warning']}" if r["warning"] else "✅") if r["ok"] else f"❌ {r['error']}",
+                    "Connect (ms)": round(r["connect_ms"], 1) if r["connect_ms"] is not None else None,
+                    "Handshake (ms)": round(r["handshake_ms"], 1) if r["handshake_ms"] is not None else None,
+                    "Configs": ", ".join(r["configs"])
+                }
+                for r in results
+            ],
+            use_container_width=True
+        )
+
+def render_export_tab(generator, store):
+    st.subheader("📦 Export Profiles")
+    st.write("Download every saved configuration as vMix destinations and OBS profiles in one zip, ready to import on each machine.")
+    
+    formats = st.multiselect(
+        "Include",
+        list(profile_export.FORMATS),
+        default=list(profile_export.FORMATS),
+        format_func=lambda f: {"vmix": "vMix destinations (XML)", "obs": "OBS profiles (service.json)"}[f]
+    )
+    
+    if st.button("Build Export Bundle", disabled=not formats):
+        with st.spinner("Writing bundle..."):
+            bundle, counts = profile_export.export_bytes(store, generator, formats)
+        st.success("✅ " + ", ".join(f"{count} configuration(s) for {fmt}" for fmt, count in counts.items()))
+        st.download_button(
+            "⬇️ Download rtmp_profiles.zip",
+            data=bundle,
+            file_name="rtmp_profiles.zip",
+            mime="application/zip"
+        )
+
+def render_simulcast_tab(generator, store, index):
+    st.subheader("🛰️ Simulcast")
+    st.write("Plan one encoder feeding several saved destinations, and check the combined bitrate fits your upload bandwidth.")
+    
+    query = st.text_input("🔍 Find destinations", key="simulcast_search", placeholder="Name contains...")
+    # Only matches for the search are sent to the browser. Picks stay as
+    # options so they survive a new search, unless they were deleted.
+    selected = [name for name in st.session_state.get("simulcast_names", []) if name in index]
+    st.session_state.simulcast_names = selected
+    matches = [name for name in index.search(query, limit=SIMULCAST_OPTIONS + len(selected)) if name not in selected]
+    names = st.multiselect(
+        "Destinations (in priority order)", selected + matches[:SIMULCAST_OPTIONS], key="simulcast_names",
+        help=f"Shows the first {SIMULCAST_OPTIONS} matches; search to narrow them down"
+    )
+    if not names:
+        st.info("Pick two or more saved configurations to stream to at once")
+        return
+    
+    qualities = {}
+    columns = st.columns(min(len(names), 4))
+    for i, name in enumerate(names):
+        with columns[i % len(columns)]:
+            qualities[name] = st.selectbox(
+                name, simulcast.LADDER, index=simulcast.LADDER.index(simulcast.DEFAULT_PROFILE), key=f"simulcast_quality_{name}"
+            )
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        uplink_kbps = st.number_input("Upload bandwidth (kbps, 0 = don't check)", min_value=0, value=0, step=1000)
+    with col2:
+        headroom = st.slider("Usable share of the upload", 0.5, 1.0, simulcast.DEFAULT_HEADROOM, 0.05)
+    with col3:
+        auto_downscale = st.checkbox("Lower qualities to fit", value=True)
+    
+    configs = [config for config in (store.load(name) for name in names) if config is not None]
+    try:
+        destinations = simulcast.destinations_from_configs(generator, configs, qualities)
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        return
+    plan = simulcast.plan_simulcast(destinations, uplink_kbps or None, headroom, auto_downscale=auto_downscale)
+    
+    budget = f" of {plan['budget_kbps']} kbps budget" if plan["budget_kbps"] is not None else ""
+    summary = (f"{plan['total_kbps']} kbps upload{budget}, {len(plan['encodes'])} encode(s), "
+               f"encoder load {plan['encoder_load']} x 1080p30")
+    if plan["fits"]:
+        st.success(f"✅ {summary}")
+    else:
+        st.error(f"❌ {summary}")
+    for warning in plan["warnings"]:
+        st.warning(f"⚠️ {warning}")
+    
+    st.dataframe(
+        [
+            {
+                "Destination": output["name"],
+                "Platform": output["platform"].capitalize(),
+                "Quality": output["profile"],
+                "Requested": output["requested_profile"],
+                "Video (kbps)": output["video_kbps"],
+                "Audio (kbps)": output["audio_kbps"],
+                "Upload (kbps)": output["wire_kbps"]
+            }
+            for output in plan["outputs"]
+        ],
+        use_container_width=True
+    )
+    
+    ffmpeg_tab, vmix_tab = st.tabs(["ffmpeg (tee)", "vMix"])
+    with ffmpeg_tab:
+        input_url = st.text_input("ffmpeg input", value="INPUT", key="simulcast_input")
+        st.code(simulcast.ffmpeg_shell(plan, input_url), language="bash")
+    with vmix_tab:
+        st.code(simulcast.vmix_destinations(plan), language="xml")
+
+def render_rotation_tab(generator, store):
+    st.subheader("🔑 Rotate Stream Keys")
+    st.write("Upload a CSV or JSONL mapping with a new_key column and either a name or an old_key column. "
+             "Every key is checked first; if any row fails, nothing is changed.")
+    
+    upload = st.file_uploader("Key mapping", type=["csv", "jsonl", "ndjson"], key="rotation_mapping")
+    if upload is None:
+        return
+    # Planning scans the whole store, so it is redone only for a new file or a changed store
+    plan_key = (upload.file_id, store.version())
+    if st.session_state.get("rotation_plan_key") != plan_key:
+        try:
+            mapping = key_rotation.read_mapping(upload, key_rotation.detect_format(upload.name))
+        except (ValueError, UnicodeDecodeError) as e:
+            st.error(f"❌ Can't read {upload.name}: {e}")
+            return
+        st.session_state.rotation_plan = key_rotation.plan_rotation(store, generator, mapping)
+        st.session_state.rotation_plan_key = plan_key
+    plan = st.session_state.rotation_plan
+    if plan["errors"]:
+        st.error(f"❌ {len(plan['errors'])} problem(s) in {plan['rows']} row(s); nothing will be rotated until they are fixed")
+        st.dataframe(plan["errors"], use_container_width=True)
+        return
+    if not plan["updates"]:
+        st.info(f"All {plan['unchanged']} matched configuration(s) already use their new keys")
+        return
+    
+    st.write(f"**{len(plan['updates'])}** configuration(s) will get a new key"
+             + (f", {plan['unchanged']} already current" if plan["unchanged"] else ""))
+    st.dataframe(
+        [
+            {
+                "Configuration": config["name"],
+                "Platform": config["platform"].capitalize(),
+                "New Key": config["stream_key"][:4] + "*" * max(len(config["stream_key"]) - 4, 0)
+            }
+            for config in plan["updates"]
+        ],
+        use_container_width=True
+    )
+    if st.button(f"Rotate {len(plan['updates'])} Key(s)", type="primary"):
+        with st.spinner("Saving..."):
+            rotated = store.save_rotation(plan["updates"])
+        st.success(f"✅ Rotated {rotated} stream key(s)")
+
+# Streamlit App
+def main():
+    st.set_page_config(
+        page_title="vMix RTMP URL Generator",
+        page_icon="🎥",
+        layout="wide"
+    )
+    
+    st.title("🎥 vMix RTMP URL Generator")
+    st.write("Generate RTMP URLs and configuration for vMix Streaming")
+    
+    generator = get_generator()
+    store = get_store()
+    
+    generate_tab, probe_tab, simulcast_tab, rotation_tab, export_tab = st.tabs(
+        ["🎥 Generate", "📡 Ingest Health", "🛰️ Simulcast", "🔑 Rotate Keys", "📦 Export"]
+    )
+    with generate_tab, RERUN_SECONDS.time("generate"):
+        render_generator(generator, store)
+    with probe_tab, RERUN_SECONDS.time("ingest_health"):
+        render_probe_tab(generator, store)
+    with simulcast_tab, RERUN_SECONDS.time("simulcast"):
+        render_simulcast_tab(generator, store, get_config_index())
+    with rotation_tab, RERUN_SECONDS.time("rotate_keys"):
+        render_rotation_tab(generator, store)
+    with export_tab, RERUN_SECONDS.time("export"):
+        render_export_tab(generator, store)
     
     # Sidebar with saved configurations and instructions
     st.sidebar.title("vMix Instructions")
@@ -217,20 +476,8 @@ def main():
     """)
     
     # Show saved configurations
-    st.sidebar.title("💾 Saved Configs")
-    config_dir = Path("/app/configs")
-    if config_dir.exists():
-        config_files = list(config_dir.glob("*.json"))
-        if config_files:
-            for config_file in config_files:
-                with open(config_file, 'r') as f:
-                    config = json.load(f)
-                if st.sidebar.button(f"📁 {config['name']}"):
-                    st.session_state.loaded_config = config
-                    # Auto-fill form with loaded config
-                    st.rerun()
-        else:
-            st.sidebar.info("No saved configurations")
+    with RERUN_SECONDS.time("sidebar"):
+        render_saved_configs(generator, store, get_config_index())
     
     # Load configuration if selected
     if 'loaded_config' in st.session_state:
@@ -254,5 +501,25 @@ def main():
             # Set form values (you'd need to use session state to pre-fill the form)
             st.info("To use this config, manually copy the values above")
 
+def rerun():
+    start_status_server()
+    # --profile[=PATH] after "streamlit run app.py --" profiles every rerun;
+    # ?profile in the page URL profiles just that one, reported on stderr
+    # (a URL must not choose where the server writes files)
+    profile, _ = metrics.split_profile_flag(sys.argv[1:])
+    if profile is None and "profile" in st.query_params:
+        profile = ""
+    start = time.perf_counter()
+    try:
+        if profile is None:
+            main()
+        else:
+            with metrics.profiled(profile or None):
+                main()
+    finally:
+        elapsed = time.perf_counter() - start
+        RERUN_SECONDS.observe(elapsed, "total")
+        health.MONITOR.record_rerun(elapsed)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    rerun()
\ No newline at end of file
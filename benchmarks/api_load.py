@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Load-test the headless API with keep-alive clients.
+
+Starts api_server in a subprocess (or targets --url) and drives it with
+concurrent HTTP/1.1 keep-alive connections, reporting throughput and
+latency percentiles.
+
+Usage:
+    python benchmarks/api_load.py --connections 50 --duration 10
+    python benchmarks/api_load.py --url http://localhost:8510 --path /configs --method GET
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+from common import ROOT, percentile
+
+DEFAULT_BODY = {"platform": "twitch", "stream_key": "live_123456789_abcdefghij"}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_port(host, port, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.05)
+    raise RuntimeError(f"API server did not start on {host}:{port}")
+
+
+async def client(host, port, request, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if not head.startswith(b"HTTP/1.1 2"):
+                errors.append(head.split(b"\r\n", 1)[0])
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, method, path, body, connections, duration, token=None):
+    payload = json.dumps(body).encode() if body is not None else b""
+    authorization = f"Authorization: Bearer {token}\r\n" if token else ""
+    request = (
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\n{authorization}"
+        f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n"
+    ).encode() + payload
+
+    await wait_for_port(host, port)
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(host, port, request, deadline, latencies, errors)
+        for _ in range(connections)
+    ))
+    return time.perf_counter() - start, sorted(latencies), errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Existing API base URL (default: start a local server)")
+    parser.add_argument("--method", default="POST")
+    parser.add_argument("--path", default="/generate")
+    parser.add_argument("--body", default=json.dumps(DEFAULT_BODY), help="JSON request body ('' for none)")
+    parser.add_argument("--connections", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--token", default=os.environ.get("API_TOKEN"), help="Bearer token (default: $API_TOKEN)")
+    args = parser.parse_args()
+
+    server = None
+    config_dir = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        host, port = "127.0.0.1", free_port()
+        config_dir = tempfile.TemporaryDirectory()
+        server = subprocess.Popen(
+            [sys.executable, str(ROOT / "api_server.py"), "--host", host, "--port", str(port)],
+            env={**os.environ, "CONFIG_DIR": config_dir.name},
+            stdout=subprocess.DEVNULL
+        )
+
+    try:
+        body = json.loads(args.body) if args.body else None
+        elapsed, latencies, errors = asyncio.run(
+            run_load(host, port, args.method.upper(), args.path, body, args.connections, args.duration, args.token)
+        )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+            config_dir.cleanup()
+
+    print(f"{args.method.upper()} {args.path}  {args.connections} connections  {elapsed:.1f}s")
+    print(f"Requests:   {len(latencies):,} ({len(errors)} non-2xx)")
+    print(f"Throughput: {len(latencies) / elapsed:,.0f} req/s")
+    print(f"Latency:    p50 {percentile(latencies, 50) * 1000:.2f} ms   "
+          f"p99 {percentile(latencies, 99) * 1000:.2f} ms   max {latencies[-1] * 1000 if latencies else 0:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Throughput of columnar (Arrow) URL generation against the row path.
+
+Writes a Parquet file of N rows mixing Twitch, YouTube, Facebook and custom
+configs (with a share of invalid rows), then generates URLs for it twice:
+row by row through RTMPGenerator.generate_many, converting each record
+batch to dicts and back, and with columnar.generate_parquet. Both write
+a Parquet file of the results.
+
+Usage:
+    python benchmarks/columnar_generate.py --rows 10000000
+    python benchmarks/columnar_generate.py --rows 1000000 --skip-rows
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import common  # noqa: F401  (puts the repo root on sys.path)
+from columnar import DEFAULT_BATCH_SIZE, generate_parquet
+from rtmp_core import RTMPGenerator
+
+CHUNK = 1_000_000
+
+
+def make_chunk(start, count, invalid_every):
+    platforms, keys, servers, apps = [], [], [], []
+    for i in range(start, start + count):
+        kind = i % 4
+        if kind == 0:
+            platforms.append("twitch"), keys.append(f"live_{i}_abcdef"), servers.append(""), apps.append("")
+        elif kind == 1:
+            platforms.append("youtube"), keys.append(f"{i % 10000:04d}-abcd-efgh-ijkl"), servers.append(""), apps.append("")
+        elif kind == 2:
+            platforms.append("facebook"), keys.append(f"{100000000 + i}?ds=1"), servers.append(""), apps.append("")
+        else:
+            platforms.append("custom"), keys.append(f"key-{i}"), servers.append(f"ingest{i % 50}.example.com:1935"), apps.append("live")
+        if invalid_every and i % invalid_every == 0:
+            keys[-1] = ""
+    return pa.table({"platform": platforms, "stream_key": keys, "server_url": servers, "app_name": apps})
+
+
+def write_input(path, rows, invalid_every):
+    writer = None
+    for start in range(0, rows, CHUNK):
+        table = make_chunk(start, min(CHUNK, rows - start), invalid_every)
+        if writer is None:
+            writer = pq.ParquetWriter(path, table.schema)
+        writer.write_table(table)
+    writer.close()
+
+
+def row_path(input_path, output_path, generator, batch_size):
+    """The pre-columnar way: dicts through generate_many, then back to Arrow"""
+    writer = None
+    rows = errors = 0
+    for batch in pq.ParquetFile(input_path).iter_batches(batch_size=batch_size):
+        results = [
+            {**row, "rtmp_url": row.get("rtmp_url"), "error": row.get("error")}
+            for row in generator.generate_many(batch.to_pylist())
+        ]
+        for row in results:
+            row.pop("errors", None)
+        table = pa.Table.from_pylist(results)
+        if writer is None:
+            writer = pq.ParquetWriter(output_path, table.schema)
+        writer.write_table(table)
+        rows += table.num_rows
+        errors += table.num_rows - table["error"].null_count
+    writer.close()
+    return {"rows": rows, "errors": errors}
+
+
+def timed(label, func, rows):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.2f} s   {rows / elapsed:12,.0f} rows/s   ({result['errors']:,} errors)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--invalid-every", type=int, default=1000, help="Blank the key of every Nth row (0: none)")
+    parser.add_argument("--skip-rows", action="store_true", help="Only time the columnar path")
+    args = parser.parse_args()
+
+    generator = RTMPGenerator()
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "input.parquet")
+        write_input(input_path, args.rows, args.invalid_every)
+        print(f"{args.rows:,} rows, {os.path.getsize(input_path) / 1e6:.1f} MB Parquet, batch size {args.batch_size:,}")
+
+        columnar_time = timed(
+            "columnar.generate_parquet",
+            lambda: generate_parquet(input_path, os.path.join(tmp, "columnar.parquet"), generator, args.batch_size),
+            args.rows
+        )
+        if not args.skip_rows:
+            row_time = timed(
+                "row by row (generate_many)",
+                lambda: row_path(input_path, os.path.join(tmp, "rows.parquet"), generator, args.batch_size),
+                args.rows
+            )
+            print(f"speed-up: {row_time / columnar_time:.1f}x")
+
+            # Same URLs and errors either way
+            columnar_result = pq.read_table(os.path.join(tmp, "columnar.parquet"), columns=["rtmp_url", "error"])
+            row_result = pq.read_table(os.path.join(tmp, "rows.parquet"), columns=["rtmp_url", "error"])
+            print("outputs match" if columnar_result.equals(row_result) else "❌ outputs differ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Helpers shared by the benchmark scripts"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from config_store import get_config_store
+
+
+def make_configs(count, platform="custom"):
+    for i in range(count):
+        yield {
+            "name": f"config-{i:06d}",
+            "platform": platform,
+            "stream_key": f"key-{i}",
+            "server_url": "live.example.com",
+            "app_name": "live",
+            "rtmp_url": f"rtmp://live.example.com/live/key-{i}",
+            "for_vmix": True
+        }
+
+
+def populate(config_dir, backend, count):
+    store = get_config_store(backend, config_dir)
+    store.save_many(list(make_configs(count)))
+    return store
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def check(label, ok, detail=""):
+    """Print an ok/FAIL line for a sanity check and return ok"""
+    print(f"{'ok  ' if ok else 'FAIL'} {label}{f'  ({detail})' if detail else ''}")
+    return ok
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Multi-process stress test for concurrent config saves.
+
+Writer processes (each with several threads) save overlapping config names
+while reader processes keep parsing the store. Any partially written file
+or failed read is counted as a torn read. Exits non-zero if a reader ever
+saw a torn config or the final store is inconsistent.
+
+Usage:
+    python benchmarks/concurrent_writes.py --backend json --writers 4 --saves 2000
+"""
+import argparse
+import json
+import multiprocessing
+import sys
+import tempfile
+import threading
+import time
+
+import common  # noqa: F401  (puts the repo root on sys.path)
+from config_store import get_config_store
+
+
+def make_config(name, writer, seq):
+    return {
+        "name": name,
+        "platform": "custom",
+        "stream_key": f"key-{writer}-{seq}",
+        "server_url": "live.example.com",
+        "app_name": "live",
+        "rtmp_url": f"rtmp://live.example.com/live/key-{writer}-{seq}",
+        # Vary the size so a torn write would show up as truncated JSON
+        "padding": "x" * (seq * 37 % 4096)
+    }
+
+
+def writer(backend, config_dir, writer_id, saves, names, threads):
+    store = get_config_store(backend, config_dir)
+
+    def work(thread_id):
+        for seq in range(thread_id, saves, threads):
+            store.save(make_config(f"cfg-{seq % names:05d}", writer_id, seq))
+
+    workers = [threading.Thread(target=work, args=(t,)) for t in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    store.flush()
+
+
+def reader(backend, config_dir, stop, results):
+    torn = reads = 0
+    if backend == "json":
+        from pathlib import Path
+        paths = Path(config_dir)
+        while not stop.is_set():
+            for path in paths.glob("*.json"):
+                try:
+                    with open(path) as f:
+                        config = json.load(f)
+                    torn += "rtmp_url" not in config
+                    reads += 1
+                except FileNotFoundError:
+                    pass
+                except json.JSONDecodeError:
+                    torn += 1
+    else:
+        store = get_config_store(backend, config_dir)
+        while not stop.is_set():
+            for config in store.load_all():
+                torn += "rtmp_url" not in config
+                reads += 1
+    results.put((reads, torn))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", default="json", choices=["json", "sqlite"])
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4, help="Saving threads per writer process")
+    parser.add_argument("--readers", type=int, default=2)
+    parser.add_argument("--saves", type=int, default=2000, help="Saves per writer process")
+    parser.add_argument("--names", type=int, default=200, help="Distinct config names shared by all writers")
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as config_dir:
+        # Create the store (and SQLite schema) before the processes race for it
+        get_config_store(args.backend, config_dir)
+
+        stop = ctx.Event()
+        results = ctx.Queue()
+        readers = [
+            ctx.Process(target=reader, args=(args.backend, config_dir, stop, results))
+            for _ in range(args.readers)
+        ]
+        writers = [
+            ctx.Process(target=writer, args=(args.backend, config_dir, w, args.saves, args.names, args.threads))
+            for w in range(args.writers)
+        ]
+        for proc in readers:
+            proc.start()
+
+        start = time.perf_counter()
+        for proc in writers:
+            proc.start()
+        for proc in writers:
+            proc.join()
+        elapsed = time.perf_counter() - start
+
+        stop.set()
+        reads = torn = 0
+        for _ in readers:
+            r, t = results.get()
+            reads += r
+            torn += t
+        for proc in readers:
+            proc.join()
+
+        final = get_config_store(args.backend, config_dir).load_all()
+        writer_failures = sum(proc.exitcode != 0 for proc in writers)
+
+    total = args.writers * args.saves
+    print(f"Backend:   {args.backend}")
+    print(f"Saves:     {total:,} in {elapsed:.2f}s ({total / elapsed:,.0f}/s) "
+          f"from {args.writers} process(es) x {args.threads} thread(s)")
+    print(f"Reads:     {reads:,} config reads, {torn} torn")
+    print(f"Final:     {len(final)} configs (expected {min(args.names, args.saves)})")
+
+    ok = torn == 0 and writer_failures == 0 and len(final) == min(args.names, args.saves)
+    print("✅ No partial reads" if ok else "❌ Consistency check failed")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
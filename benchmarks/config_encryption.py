@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Store throughput with stream-key encryption on vs off.
+
+Populates two temporary stores with the same configs, one plain and one
+with a passphrase, and times saving, listing (list_index), load_all,
+iter_all and a vMix/OBS export against each. Also reports the one-off
+key derivation and confirms that a second store in the same process
+reuses the cached key.
+
+Usage:
+    python benchmarks/config_encryption.py --configs 100000
+    python benchmarks/config_encryption.py --configs 100000 --backend json
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from common import make_configs
+from config_store import get_config_store
+from key_crypto import derive_key, get_cipher
+from profile_export import FORMATS, export_bundle
+from rtmp_core import RTMPGenerator
+
+PASSPHRASE = "benchmark passphrase"
+
+
+def best_of(func, runs):
+    elapsed = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        elapsed = min(elapsed, time.perf_counter() - start)
+    return elapsed
+
+
+def export(store, generator, path):
+    with open(path, "wb") as f:
+        export_bundle(store, f, generator, FORMATS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--configs", type=int, default=100_000)
+    parser.add_argument("--backend", default=os.environ.get("CONFIG_BACKEND", "sqlite"), choices=["json", "sqlite"])
+    parser.add_argument("--runs", type=int, default=3, help="Report the best of N runs")
+    parser.add_argument("--skip-export", action="store_true")
+    args = parser.parse_args()
+
+    generator = RTMPGenerator()
+    configs = list(make_configs(args.configs))
+    with tempfile.TemporaryDirectory() as tmp:
+        plain_dir, encrypted_dir = os.path.join(tmp, "plain"), os.path.join(tmp, "encrypted")
+
+        start = time.perf_counter()
+        get_cipher(PASSPHRASE, encrypted_dir)
+        derived = time.perf_counter() - start
+        start = time.perf_counter()
+        get_cipher(PASSPHRASE, encrypted_dir)
+        cached = time.perf_counter() - start
+        print(f"key derivation: {derived * 1000:.1f} ms first, {cached * 1e6:.1f} us cached "
+              f"({derive_key.cache_info().currsize} key(s) derived)")
+
+        stores = {
+            "off": get_config_store(args.backend, plain_dir, passphrase=None),
+            "on": get_config_store(args.backend, encrypted_dir, passphrase=PASSPHRASE),
+        }
+        cases = [
+            ("save_many", lambda store: store.save_many(configs)),
+            ("list_index", lambda store: store.list_index()),
+            ("load_all", lambda store: store.load_all()),
+            ("iter_all", lambda store: sum(1 for _ in store.iter_all())),
+        ]
+        if not args.skip_export:
+            cases.append(("export", lambda store: export(store, generator, os.path.join(tmp, "bundle.zip"))))
+
+        print(f"{args.configs:,} configs, {args.backend} backend, best of {args.runs}")
+        print(f"{'case':<12} {'off':>10} {'on':>10} {'on/off':>8} {'configs/s (on)':>16}")
+        for label, func in cases:
+            off = best_of(lambda: func(stores["off"]), args.runs)
+            on = best_of(lambda: func(stores["on"]), args.runs)
+            print(f"{label:<12} {off:9.3f}s {on:9.3f}s {on / off:7.2f}x {args.configs / on:16,.0f}")
+
+        assert stores["on"].load_all() == stores["off"].load_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Memory footprint of saved configs as a dict list vs a ConfigCollection.
+
+Each representation is built in a fresh subprocess and the growth in RSS
+is reported, along with the time to build it and to read every rtmp_url.
+
+Usage:
+    python benchmarks/config_memory.py --count 1000000
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+from common import make_configs
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * 4096 / (1024 * 1024)
+
+
+def config_stream(generator, count):
+    # Mix platforms the way a real store would, and keep the for_vmix flag
+    # that app.py adds, so interning has realistic input.
+    platforms = ("twitch", "youtube", "facebook", "custom")
+    for i, config in enumerate(make_configs(count)):
+        platform = platforms[i % 4]
+        config["platform"] = platform
+        if platform != "custom":
+            config["server_url"] = config["app_name"] = ""
+            config["rtmp_url"] = generator.generate_rtmp(platform, config["stream_key"])
+        yield config
+
+
+def measure(mode, count):
+    from config_records import ConfigCollection
+    from rtmp_core import RTMPGenerator
+
+    generator = RTMPGenerator()
+
+    before = rss_mb()
+    start = time.perf_counter()
+    if mode == "dicts":
+        configs = list(config_stream(generator, count))
+    else:
+        configs = ConfigCollection(config_stream(generator, count))
+    built = time.perf_counter() - start
+    after = rss_mb()
+
+    start = time.perf_counter()
+    total = 0
+    for config in configs:
+        total += len(config["rtmp_url"])
+    scanned = time.perf_counter() - start
+    return {"mode": mode, "count": count, "rss_mb": after - before, "build_s": built, "scan_urls_s": scanned}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--mode", choices=["dicts", "collection"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(measure(args.mode, args.count)))
+        return
+
+    results = []
+    for mode in ("dicts", "collection"):
+        proc = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--count", str(args.count)],
+            capture_output=True, text=True, check=True
+        )
+        results.append(json.loads(proc.stdout))
+
+    print(f"{'representation':<16} {'configs':>10} {'RSS MB':>9} {'bytes/cfg':>10} {'build s':>8} {'url scan s':>11}")
+    for r in results:
+        print(f"{r['mode']:<16} {r['count']:>10,} {r['rss_mb']:>9.1f} {r['rss_mb'] * 1048576 / r['count']:>10.0f} "
+              f"{r['build_s']:>8.2f} {r['scan_urls_s']:>11.2f}")
+    print(f"\nCollection uses {results[1]['rss_mb'] / results[0]['rss_mb']:.0%} of the dict list's memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Incremental reload of a json config directory vs a full rescan.
+
+Fills a temporary json store with --configs configs and starts a
+ConfigWatcher on it. A second store object stands in for another process
+(the CLI container) and writes through the same directory. The script
+reports how long the initial load takes, how long one external save
+takes to become visible, and how long a full rescan (list_index +
+load_all) takes. It exits non-zero if the timed save never shows up.
+The watcher's behaviour is covered by tests/test_config_watch.py.
+
+Usage:
+    python benchmarks/config_watch.py --configs 10000
+"""
+import argparse
+import sys
+import tempfile
+import time
+
+from common import check, populate
+import config_watch
+from config_store import get_config_store
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--configs", type=int, default=10_000)
+    parser.add_argument("--debounce", type=float, default=config_watch.DEFAULT_DEBOUNCE)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        populate(tmp, "json", args.configs)
+        store = get_config_store("json", tmp)
+        other = get_config_store("json", tmp)
+
+        start = time.perf_counter()
+        watcher = config_watch.ConfigWatcher(store, args.debounce).start()
+        initial = time.perf_counter() - start
+
+        # One external change: incremental apply vs full rescan
+        name = "config-000000"
+        start = time.perf_counter()
+        other.save(dict(watcher.get(name), stream_key="timed"))
+        seen = wait_for(lambda: watcher.get(name)["stream_key"] == "timed")
+        incremental = time.perf_counter() - start
+        start = time.perf_counter()
+        store.list_index()
+        store.load_all()
+        rescan = time.perf_counter() - start
+        watcher.stop()
+
+    ok = check("the timed external save was applied", seen)
+    print(f"\n{args.configs} configs: initial load {initial * 1000:.0f} ms; one external save visible after "
+          f"{incremental * 1000:.0f} ms (debounce {args.debounce * 1000:.0f} ms, 1 file parsed); "
+          f"full rescan {rescan * 1000:.0f} ms ({2 * args.configs} files parsed)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
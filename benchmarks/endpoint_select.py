@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Cost of EndpointSelector against fake endpoints with injected latency.
+
+The selector is given a fake probe in place of rtmp_probe.probe_many, so
+nothing touches the network. Each of --endpoints fake endpoints answers
+after its own delay. The script times the first select(), which probes
+every endpoint concurrently, against the serial sum of the delays. It
+then times select() and build_fastest() while the measurements are
+cached, next to a plain generator.build(). It exits non-zero if probing
+turned out to be serial. Selection, caching and fallback behaviour are
+covered by tests/test_endpoint_select.py.
+
+Usage:
+    python benchmarks/endpoint_select.py --endpoints 8 --calls 10000
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from common import check
+from ingest_select import EndpointSelector, build_fastest
+from rtmp_core import RTMPGenerator
+
+
+class FakeEndpoints:
+    """Stands in for probe_many: each endpoint answers after latencies[endpoint] seconds"""
+
+    def __init__(self, latencies):
+        self.latencies = dict(latencies)
+
+    async def _probe_one(self, endpoint):
+        latency = self.latencies[endpoint]
+        await asyncio.sleep(latency)
+        # Split like a real probe: a third connect, the rest handshake
+        return {"server": endpoint, "ok": True, "connect_ms": latency * 1000 / 3,
+                "handshake_ms": latency * 1000 * 2 / 3, "error": None}
+
+    async def __call__(self, endpoints, concurrency, timeout):
+        return await asyncio.gather(*(self._probe_one(endpoint) for endpoint in endpoints))
+
+
+def per_call(function, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--endpoints", type=int, default=8)
+    parser.add_argument("--calls", type=int, default=10_000)
+    args = parser.parse_args()
+
+    endpoints = [f"ingest-{i}.example" for i in range(args.endpoints)]
+    fake = FakeEndpoints({endpoint: 0.01 * (i + 1) for i, endpoint in enumerate(endpoints)})
+    selector = EndpointSelector(probe=fake)
+
+    start = time.perf_counter()
+    selector.select(endpoints)
+    cold = time.perf_counter() - start
+    serial = sum(fake.latencies.values())
+    ok = check("endpoints are probed concurrently", cold < serial,
+               f"{cold * 1000:.0f} ms for {serial * 1000:.0f} ms of serial latency")
+
+    generator = RTMPGenerator()
+    twitch = generator.platforms["twitch"]["endpoints"]
+    fake.latencies.update({twitch[0]: 0.03, twitch[1]: 0.005})
+    build_fastest(generator, "twitch", "live_1_abc", selector)
+
+    cached = per_call(lambda: selector.select(endpoints), args.calls)
+    fastest = per_call(lambda: build_fastest(generator, "twitch", "live_1_abc", selector), args.calls)
+    plain = per_call(lambda: generator.build("twitch", "live_1_abc"), args.calls)
+
+    print(f"\n{args.endpoints} endpoints: first select {cold * 1000:.0f} ms "
+          f"(slowest endpoint {max(fake.latencies.values()) * 1000:.0f} ms)")
+    print(f"cached select          {cached * 1e6:8.1f} µs per call")
+    print(f"cached build_fastest   {fastest * 1e6:8.1f} µs per call")
+    print(f"generator.build        {plain * 1e6:8.1f} µs per call")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Time and peak memory of the vMix/OBS bulk export at scale.
+
+Compares profile_export.export_bundle (streamed from the store) with
+building the same archive from load_all() in an in-memory buffer, which
+is what a naive export would do. First it checks that export_bytes(),
+which the web UI hands to st.download_button, returns bytes holding a
+complete archive; the script exits non-zero if not.
+
+Usage:
+    python benchmarks/export_bundle.py --configs 100000
+    python benchmarks/export_bundle.py --configs 100000 --memory   # tracemalloc peaks (slow)
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+from common import populate
+from profile_export import FORMATS, VMIX_PATH, _write_obs, _write_vmix, export_bundle, export_bytes
+from rtmp_core import RTMPGenerator
+
+
+def naive_export(store, generator):
+    configs = store.load_all()
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        _write_vmix(archive, generator, configs)
+        _write_obs(archive, generator, configs)
+    return buffer.getbuffer().nbytes
+
+
+def check_download(generator, count=50):
+    """export_bytes() must give download_button plain bytes of a readable zip"""
+    with tempfile.TemporaryDirectory() as config_dir:
+        store = populate(config_dir, "sqlite", count)
+        data, counts = export_bytes(store, generator)
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        names = archive.namelist()
+        intact = archive.testzip() is None
+    ok = (isinstance(data, bytes) and intact and VMIX_PATH in names
+          and len(names) == 1 + 2 * count and counts == {"vmix": count, "obs": count})
+    print(f"{'ok  ' if ok else 'FAIL'} export_bytes gives download_button a complete zip ({len(names)} entries)")
+    return ok
+
+
+def measure(label, func, memory, runs):
+    if memory:
+        tracemalloc.start()
+    elapsed = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        size = func()
+        elapsed = min(elapsed, time.perf_counter() - start)
+    line = f"{label:<24} {elapsed:8.2f} s   archive {size / 1e6:7.1f} MB"
+    if memory:
+        line += f"   peak {tracemalloc.get_traced_memory()[1] / 1e6:8.1f} MB"
+        tracemalloc.stop()
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--configs", type=int, default=100_000)
+    parser.add_argument("--backend", default=os.environ.get("CONFIG_BACKEND", "sqlite"), choices=["json", "sqlite"])
+    parser.add_argument("--runs", type=int, default=3, help="Report the best of N runs")
+    parser.add_argument("--memory", action="store_true", help="Also report peak traced memory")
+    args = parser.parse_args()
+
+    generator = RTMPGenerator()
+    if not check_download(generator):
+        return 1
+    with tempfile.TemporaryDirectory() as config_dir:
+        store = populate(config_dir, args.backend, args.configs)
+        path = os.path.join(config_dir, "bundle.zip")
+
+        def streamed():
+            with open(path, "wb") as f:
+                export_bundle(store, f, generator, FORMATS)
+            return os.path.getsize(path)
+
+        print(f"{args.configs:,} configs, {args.backend} backend")
+        measure("streamed to file", streamed, args.memory, args.runs)
+        measure("load_all + BytesIO", lambda: naive_export(store, generator), args.memory, args.runs)
+        measure("export_bytes", lambda: len(export_bytes(store, generator)[0]), args.memory, args.runs)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""CPU and memory cost of one web healthcheck, before vs after.
+
+Before: the old compose healthcheck, a fresh `python -c "import requests;
+requests.get(page)"` fetching a Streamlit-sized HTML page. After: the
+static healthcheck binary (compiled here from healthcheck.c) probing
+/readyz, which checks the config store and index in-process.
+
+Both targets are served by the same in-process status server, with a store
+of --configs configs attached the way app.py attaches it. Each probe runs
+--probes times. The report gives the probe process's CPU time (from wait4),
+its peak RSS and the server's CPU time per probe. Peak RSS is VmHWM, read
+while the server handles the probe's request. wait4's ru_maxrss can't be
+used, because it inherits this process's footprint across the exec.
+
+Usage:
+    python benchmarks/healthcheck_cost.py --probes 20
+"""
+import argparse
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import ROOT, percentile, populate
+import health
+import metrics
+from config_index import ConfigIndex
+
+# Roughly the size of the HTML shell Streamlit serves at /
+PAGE = b"<!doctype html><html><head>" + b"<script></script>" * 80 + b"</head><body></body></html>"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def compile_probe(tmp):
+    compiler = shutil.which("cc") or shutil.which("gcc")
+    if compiler is None:
+        return None
+    binary = os.path.join(tmp, "healthcheck")
+    source = str(ROOT / "healthcheck.c")
+    for flags in (["-Os", "-static", "-s"], ["-Os", "-s"]):
+        if subprocess.run([compiler, *flags, "-o", binary, source], capture_output=True).returncode == 0:
+            return binary
+    return None
+
+
+class Prober:
+    def __init__(self):
+        self.pid = None
+        self.peak_kb = 0
+
+    def sample(self, route):
+        """Wrap a route to record the probing process's VmHWM when it is called"""
+        def sampled():
+            try:
+                with open(f"/proc/{self.pid}/status") as f:
+                    for line in f:
+                        if line.startswith("VmHWM:"):
+                            self.peak_kb = int(line.split()[1])
+            except (OSError, TypeError):
+                pass
+            return route()
+        return sampled
+
+    def run(self, argv):
+        self.peak_kb = 0
+        server_cpu = time.process_time()
+        start = time.perf_counter()
+        proc = subprocess.Popen(argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.pid = proc.pid
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        return {
+            "ok": proc.returncode == 0,
+            "wall_ms": (time.perf_counter() - start) * 1000,
+            "cpu_ms": (usage.ru_utime + usage.ru_stime) * 1000,
+            "rss_mb": self.peak_kb / 1024,
+            "server_cpu_ms": (time.process_time() - server_cpu) * 1000,
+        }
+
+
+def report(label, results):
+    def p50(field):
+        return percentile(sorted(r[field] for r in results), 50)
+
+    failed = sum(not r["ok"] for r in results)
+    print(f"{label:<34} {p50('wall_ms'):8.1f} {p50('cpu_ms'):8.1f} {p50('rss_mb'):8.1f} "
+          f"{p50('server_cpu_ms'):10.2f}   {failed} failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--probes", type=int, default=20)
+    parser.add_argument("--configs", type=int, default=10_000)
+    parser.add_argument("--backend", default="sqlite", choices=["json", "sqlite"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = populate(os.path.join(tmp, "configs"), args.backend, args.configs)
+        health.MONITOR.attach(store, ConfigIndex.from_store(store))
+        health.MONITOR.record_rerun(0.05)
+
+        port = free_port()
+        prober = Prober()
+        routes = dict(health.routes(), **{"": lambda: (200, "text/html", PAGE)})
+        server = metrics.serve(port, "127.0.0.1", {path: prober.sample(route) for path, route in routes.items()})
+
+        probes = [(
+            "python + requests GET / (before)",
+            [sys.executable, "-c", f"import requests; requests.get('http://127.0.0.1:{port}/')"]
+        )]
+        binary = compile_probe(tmp)
+        if binary:
+            probes.append(("static healthcheck /readyz (after)", [binary, str(port), "/readyz"]))
+        else:
+            print("No C compiler found; skipping the static probe")
+
+        print(f"{args.configs:,} configs ({args.backend}), median of {args.probes} probes")
+        print(f"{'probe':<34} {'wall ms':>8} {'cpu ms':>8} {'rss MB':>8} {'server ms':>10}")
+        for label, argv in probes:
+            prober.run(argv)  # warm the page cache
+            report(label, [prober.run(argv) for _ in range(args.probes)])
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
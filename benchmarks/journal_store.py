@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Cold start of the journal config store against the other backends.
+
+Fills each backend with --configs configs in batches of --batch. It then
+times opening a new store object plus list_index() and load_all(). The
+journal is timed twice: compacting as usual, and with compaction
+disabled so it replays every record. Crash recovery is covered by
+tests/test_journal_store.py.
+
+Usage:
+    python benchmarks/journal_store.py --configs 100000
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from common import make_configs
+from config_store import JournalConfigStore, get_config_store
+
+
+def configs(count, prefix="config"):
+    return [dict(config, name=f"{prefix}-{i:06d}") for i, config in enumerate(make_configs(count))]
+
+
+def open_store(backend, config_dir):
+    if backend == "journal":
+        return JournalConfigStore(config_dir, migrate=False)
+    if backend == "journal, no snapshot":
+        return JournalConfigStore(config_dir, migrate=False, compact_min_bytes=1 << 40)
+    return get_config_store(backend, config_dir)
+
+
+def cold_start(backend, config_dir):
+    start = time.perf_counter()
+    store = open_store(backend, config_dir)
+    opened = time.perf_counter() - start
+    store.list_index()
+    listed = time.perf_counter() - start
+    store.load_all()
+    return opened, listed, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--configs", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--skip-json", action="store_true", help="Skip the slow one-file-per-config backend")
+    args = parser.parse_args()
+
+    print(f"Cold start with {args.configs} configs (open / +list_index / +load_all):")
+    data = configs(args.configs)
+    backends = ["journal", "journal, no snapshot", "sqlite"] + ([] if args.skip_json else ["json"])
+    with tempfile.TemporaryDirectory() as tmp:
+        for number, backend in enumerate(backends):
+            config_dir = Path(tmp) / str(number)
+            store = open_store(backend, config_dir)
+            start = time.perf_counter()
+            for i in range(0, len(data), args.batch):
+                store.save_many(data[i:i + args.batch])
+            filled = time.perf_counter() - start
+            timings = cold_start(backend, config_dir)
+            extra = f"  (filled in {filled:.1f} s)"
+            if backend.startswith("journal"):
+                snapshots = store._snapshots()
+                snapshot = snapshots[0].stat().st_size if snapshots else 0
+                tail = store._segments()[-1].stat().st_size
+                extra += f"  snapshot {snapshot / 1e6:.1f} MB, tail {tail / 1e6:.2f} MB"
+            print(f"  {backend:<20} {timings[0]:6.2f} s / {timings[1]:6.2f} s / {timings[2]:6.2f} s{extra}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
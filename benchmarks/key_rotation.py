@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Throughput of bulk stream-key rotation vs re-saving configs one by one.
+
+Fills a temporary store of each backend with --configs configs and
+rotates every key from one mapping. Half the mapping's rows match by
+config name and half by old key. Planning (one scan, validation, URL
+regeneration) and the single save_rotation() write are timed
+separately.
+
+For comparison, --baseline configs are re-saved one at a time with
+save_config(), the path the web form takes, and the rate is
+extrapolated. The script exits non-zero if a timed rotation didn't
+rotate every key. All-or-nothing behaviour and json crash safety are
+covered by tests/test_key_rotation.py.
+
+Usage:
+    python benchmarks/key_rotation.py --configs 10000
+"""
+import argparse
+import sys
+import tempfile
+import time
+
+from common import check, populate
+from key_rotation import plan_rotation
+from rtmp_core import RTMPGenerator
+
+
+def mapping_for(count, suffix):
+    rows = []
+    for i in range(count):
+        if i % 2:
+            rows.append({"name": "", "old_key": f"key-{i}", "new_key": f"key-{i}-{suffix}"})
+        else:
+            rows.append({"name": f"config-{i:06d}", "old_key": "", "new_key": f"key-{i}-{suffix}"})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--configs", type=int, default=10_000)
+    parser.add_argument("--baseline", type=int, default=1000, help="Configs to re-save one by one for comparison")
+    parser.add_argument("--backends", nargs="+", default=["sqlite", "journal", "json"])
+    args = parser.parse_args()
+
+    passed = True
+    timings = []
+    for backend in args.backends:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = populate(tmp, backend, args.configs)
+            generator = RTMPGenerator(store)
+
+            mapping = mapping_for(args.configs, "new")
+            start = time.perf_counter()
+            plan = plan_rotation(store, generator, mapping)
+            planned = time.perf_counter() - start
+            start = time.perf_counter()
+            rotated = store.save_rotation(plan["updates"])
+            written = time.perf_counter() - start
+
+            configs = store.load_all()
+            passed &= check(f"{backend}: every key rotated with a new rtmp_url",
+                            rotated == args.configs and not plan["errors"] and all(
+                                config["stream_key"].endswith("-new")
+                                and config["rtmp_url"].endswith("/" + config["stream_key"])
+                                for config in configs
+                            ))
+
+            start = time.perf_counter()
+            for config in configs[:args.baseline]:
+                generator.save_config(config["name"], config["platform"], config["stream_key"] + "-form",
+                                      config["server_url"], config["app_name"])
+            one_by_one = (time.perf_counter() - start) / min(args.baseline, len(configs))
+
+            total = planned + written
+            timings.append(f"  {backend:<8} plan {planned:5.2f} s + write {written:5.2f} s = {total:5.2f} s "
+                           f"({args.configs / total:8.0f} rotations/s); one by one {one_by_one * 1000:6.2f} ms each "
+                           f"(~{one_by_one * args.configs:6.1f} s for {args.configs})")
+
+    print(f"\n{args.configs} rotations (plan + one write; vs re-saving each config with save_config):")
+    print("\n".join(timings))
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
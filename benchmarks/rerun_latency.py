@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Measure app.py rerun latency with a large saved-config store.
+
+Each scenario is run twice: "uncached" clears the Streamlit caches before
+every rerun (the pre-caching behaviour of rebuilding the generator and
+rereading every config), "cached" reuses them the way a live session does.
+
+Measured with Streamlit 1.51.0, 10 reruns, p50 ms uncached / cached.
+"before" is the tree before caching (cb5d00b), "caching" the caching
+change alone (3b57ab2), "now" the tree with the paged, indexed sidebar
+(user-012) on top of the cache:
+
+    json          before        caching       now
+      100       76 /   80     55 /   64     86 /  46
+     1000      496 /  485    454 /  424    411 /  81
+    10000     5160 / 4460   5032 / 4393   3078 /  51
+    sqlite
+      100       58 /   58     75 /   69     46 /  53
+     1000      324 /  327    402 /  299     50 /  48
+    10000     3683 / 3633   3545 / 3894     68 /  47
+
+Caching alone did not move rerun time: the sidebar still rendered one
+st.button per saved config, which swamps the config reads. Reruns only
+became flat once the sidebar stopped rendering every config. The
+uncached json runs still reparse the whole directory.
+
+Usage:
+    python benchmarks/rerun_latency.py --configs 100 1000 10000 --runs 20
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from common import ROOT, populate
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+
+def time_reruns(runs, clear_caches):
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=600)
+    at.run()
+
+    timings = []
+    for _ in range(runs):
+        if clear_caches:
+            st.cache_data.clear()
+            st.cache_resource.clear()
+        start = time.perf_counter()
+        at.run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--configs", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--backend", default="sqlite", choices=["sqlite", "json"])
+    args = parser.parse_args()
+
+    print(f"{'configs':>8} {'mode':>9} {'p50 ms':>9} {'max ms':>9}")
+    for count in args.configs:
+        with tempfile.TemporaryDirectory() as config_dir:
+            os.environ["CONFIG_DIR"] = config_dir
+            os.environ["CONFIG_BACKEND"] = args.backend
+            populate(config_dir, args.backend, count)
+            for mode, clear_caches in (("uncached", True), ("cached", False)):
+                timings = time_reruns(args.runs, clear_caches)
+                print(f"{count:>8} {mode:>9} {statistics.median(timings):>9.1f} {max(timings):>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Saved-config sidebar render time and search latency at scale.
+
+Compares the paginated, index-backed sidebar of app.py with the previous
+one-button-per-config listing (rendered from the same store), and times
+ConfigIndex prefix/substring searches.
+
+Usage:
+    python benchmarks/sidebar_render.py --configs 10000
+    python benchmarks/sidebar_render.py --configs 10000 --index-only
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from common import ROOT, populate
+
+LEGACY_SIDEBAR = """
+import streamlit as st
+from config_store import get_config_store
+
+st.sidebar.title("Saved Configs")
+for name, platform in get_config_store().list_index():
+    st.sidebar.button(f"📁 {name}", key=name)
+"""
+
+
+def time_index(store, runs):
+    from config_index import PREFIX, SUBSTRING, ConfigIndex
+
+    start = time.perf_counter()
+    index = ConfigIndex.from_store(store)
+    print(f"index build            {(time.perf_counter() - start) * 1000:9.2f} ms  ({len(index)} entries)")
+
+    for label, query, mode in (
+        ("prefix 'config-0001'", "config-0001", PREFIX),
+        ("substring '999'", "999", SUBSTRING),
+        ("substring (no match)", "zzz", SUBSTRING),
+        ("empty query, page 1", "", SUBSTRING),
+    ):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            index.page(query, mode=mode, page=1)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{label:<22} {statistics.median(timings):9.3f} ms")
+
+    start = time.perf_counter()
+    store.save({"name": "config-new", "platform": "twitch", "stream_key": "k"})
+    index.search("new")
+    print(f"save + search new      {(time.perf_counter() - start) * 1000:9.3f} ms  (incremental, no rescan)")
+
+
+def time_app(label, at, runs):
+    import streamlit as st
+
+    timings = []
+    at.run()
+    for _ in range(runs):
+        st.cache_data.clear()
+        start = time.perf_counter()
+        at.run()
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f"{label:<22} p50 {statistics.median(timings):9.1f} ms   buttons rendered: {len(at.sidebar.button)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--configs", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--index-only", action="store_true", help="Skip the Streamlit AppTest measurements")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        os.environ["CONFIG_DIR"] = config_dir
+        store = populate(config_dir, os.environ.get("CONFIG_BACKEND", "sqlite"), args.configs)
+        time_index(store, args.runs)
+        if args.index_only:
+            return
+
+        from streamlit.testing.v1 import AppTest
+        time_app("legacy full listing", AppTest.from_string(LEGACY_SIDEBAR, default_timeout=600), args.runs)
+        time_app("paginated sidebar", AppTest.from_file(str(ROOT / "app.py"), default_timeout=600), args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Offline checks and timing of the simulcast planner.
+
+Runs plan_simulcast() over fixed scenarios without touching the network or
+a config store, and exits non-zero if any plan differs from the expected
+qualities, totals or warnings. It then times planning and ffmpeg rendering
+for --destinations destinations on a budget that forces downscaling, since
+the Streamlit tab replans on every rerun.
+
+Usage:
+    python benchmarks/simulcast_plan.py --destinations 20
+"""
+import argparse
+import sys
+import time
+
+from common import percentile
+import simulcast
+
+
+def destination(name, platform, profile):
+    return {
+        "name": name,
+        "platform": platform,
+        "server": f"{platform}.example.com",
+        "app_name": "live",
+        "stream_key": f"key-{name}",
+        "rtmp_url": f"rtmp://{platform}.example.com/live/key-{name}",
+        "profile": profile
+    }
+
+
+def qualities(plan):
+    return [output["profile"] for output in plan["outputs"]]
+
+
+def scenarios():
+    three = [
+        destination("yt", "youtube", "1080p60"),
+        destination("twitch", "twitch", "1080p60"),
+        destination("fb", "facebook", "1080p30"),
+    ]
+
+    plan = simulcast.plan_simulcast(three)
+    yield "no budget", plan, {
+        "qualities": ["1080p60", "1080p60", "1080p30"],
+        "total_kbps": simulcast.wire_kbps("1080p60") * 2 + simulcast.wire_kbps("1080p30"),
+        "encodes": 2,
+        "fits": True
+    }
+
+    plan = simulcast.plan_simulcast(three, uplink_kbps=25000)
+    yield "fits 25 Mbps", plan, {"qualities": ["1080p60", "1080p60", "1080p30"], "fits": True}
+
+    # 20000 * 0.8 = 16000 kbps: the two 1080p60 outputs step down, twitch (lower priority) first
+    plan = simulcast.plan_simulcast(three, uplink_kbps=20000)
+    yield "downscale to 20 Mbps", plan, {"qualities": ["1080p30", "1080p30", "1080p30"], "fits": True, "encodes": 1}
+
+    # 9600 kbps: the highest bitrate always steps first, ties going to the later destination
+    plan = simulcast.plan_simulcast(three, uplink_kbps=12000)
+    yield "downscale to 12 Mbps", plan, {"qualities": ["720p30", "720p30", "480p30"], "fits": True}
+
+    plan = simulcast.plan_simulcast(three, uplink_kbps=12000, auto_downscale=False)
+    yield "warn only", plan, {"qualities": ["1080p60", "1080p60", "1080p30"], "fits": False, "warnings": 1}
+
+    plan = simulcast.plan_simulcast(three, uplink_kbps=1000)
+    yield "impossible uplink", plan, {"qualities": ["360p30"] * 3, "fits": False, "warnings": 1}
+
+    plan = simulcast.plan_simulcast([destination("twitch", "twitch", "1080p60")], uplink_kbps=100000)
+    yield "twitch cap respected", plan, {"qualities": ["1080p60"], "warnings": 0}
+
+    plan = simulcast.plan_simulcast(three + [destination("extra", "custom", "720p30")], encoder_capacity=2)
+    yield "encoder and vMix limits", plan, {"encodes": 3, "warnings": 2}
+
+
+def check(name, plan, expected):
+    failures = []
+    if "qualities" in expected and qualities(plan) != expected["qualities"]:
+        failures.append(f"qualities {qualities(plan)} != {expected['qualities']}")
+    if "total_kbps" in expected and plan["total_kbps"] != expected["total_kbps"]:
+        failures.append(f"total {plan['total_kbps']} != {expected['total_kbps']}")
+    if "encodes" in expected and len(plan["encodes"]) != expected["encodes"]:
+        failures.append(f"{len(plan['encodes'])} encodes != {expected['encodes']}")
+    if "fits" in expected and plan["fits"] != expected["fits"]:
+        failures.append(f"fits {plan['fits']} != {expected['fits']}")
+    if "warnings" in expected and len(plan["warnings"]) != expected["warnings"]:
+        failures.append(f"warnings {plan['warnings']}")
+    if plan["budget_kbps"] is not None and plan["fits"] and plan["total_kbps"] > plan["budget_kbps"]:
+        failures.append("fits but over budget")
+    status = "ok  " if not failures else "FAIL"
+    print(f"{status} {name:<26} {plan['total_kbps']:6} kbps  {', '.join(qualities(plan))}")
+    for failure in failures:
+        print(f"     {failure}")
+    return not failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--destinations", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    passed = all([check(name, plan, expected) for name, plan, expected in scenarios()])
+
+    platforms = ["youtube", "twitch", "facebook", "custom"]
+    many = [destination(f"d{i}", platforms[i % len(platforms)], "1080p60") for i in range(args.destinations)]
+    # Room for roughly a 720p30 each, so most outputs step down several rungs
+    uplink = args.destinations * simulcast.wire_kbps("720p30") / simulcast.DEFAULT_HEADROOM
+    samples = []
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        plan = simulcast.plan_simulcast(many, uplink_kbps=uplink)
+        simulcast.ffmpeg_command(plan)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    print(f"\n{args.destinations} destinations, {len(plan['encodes'])} encodes, {plan['total_kbps']} of "
+          f"{plan['budget_kbps']} kbps: plan + ffmpeg p50 {percentile(samples, 50) * 1000:.2f} ms, "
+          f"p95 {percentile(samples, 95) * 1000:.2f} ms")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
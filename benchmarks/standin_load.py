@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Many concurrent synthetic publishers against one local stand-in server.
+
+Every publisher gets its own custom-platform config generated by
+RTMPGenerator (one stream key each, all pointing at the stand-in) and
+publishes at the same bitrate. Reports connect/publish success, the
+receive rates the stand-in measured per publisher and the publishers'
+own stall and jitter figures. Exits non-zero if any publisher failed.
+
+Usage:
+    python benchmarks/standin_load.py --publishers 300 --bitrate 500 --duration 10
+    python benchmarks/standin_load.py --publishers 100 --bandwidth-kbps 1000 --bitrate 2000
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+from common import percentile
+from rtmp_core import RTMPGenerator
+from rtmp_publisher import publish
+from rtmp_standin import StandInServer
+
+
+def summarize(label, values, unit):
+    values = sorted(values)
+    if values:
+        print(f"{label:<26} min {values[0]:9.1f}   p50 {statistics.median(values):9.1f}   "
+              f"p95 {percentile(values, 95):9.1f}   max {values[-1]:9.1f} {unit}")
+
+
+async def run(args):
+    generator = RTMPGenerator()
+    server = StandInServer(latency=args.latency, bandwidth_kbps=args.bandwidth_kbps)
+    async with server:
+        rows = [
+            {"name": f"load-{i:04d}", "platform": "custom", "stream_key": f"load-{i:04d}",
+             "server_url": server.address, "app_name": "live"}
+            for i in range(args.publishers)
+        ]
+        configs = [row for row in generator.generate_many(rows) if "error" not in row]
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(
+            publish(*generator.target(config), bitrate_kbps=args.bitrate,
+                    duration=args.duration, timeout=args.timeout)
+            for config in configs
+        ))
+        elapsed = time.perf_counter() - start
+        await asyncio.sleep(0.1)
+        publishers = server.publishers()
+
+    ok = [r for r in results if r["ok"]]
+    failed = len(results) - len(ok)
+    print(f"Publishers:   {len(ok)}/{len(results)} published at {args.bitrate} kbps for {args.duration:g}s "
+          f"(wall {elapsed:.1f}s)")
+    if args.latency or args.bandwidth_kbps:
+        print(f"Injected:     latency {args.latency * 1000:.0f} ms per command, "
+              f"cap {args.bandwidth_kbps or 'none'} kbps per publisher")
+    total_kbps = sum(p["media_bytes"] for p in publishers) * 8 / 1000 / max(elapsed, args.duration)
+    print(f"Stand-in:     {server.handshakes} handshakes, {server.publishes} publishes, {total_kbps:,.0f} kbps aggregate")
+    summarize("received kbps (stand-in)", [p["kbps"] for p in publishers], "kbps")
+    summarize("achieved kbps (publisher)", [r["achieved_kbps"] for r in ok], "kbps")
+    summarize("publish setup", [r["connect_ms"] + r["handshake_ms"] + r["publish_ms"] for r in ok], "ms")
+    summarize("stall time", [r["stall_ms"] for r in ok], "ms")
+    summarize("jitter", [r["jitter_ms"] for r in ok], "ms")
+    summarize("max late", [r["max_late_ms"] for r in ok], "ms")
+    sustained = sum(r["sustained"] for r in ok)
+    print(f"Sustained:    {sustained}/{len(ok)} publishers within 5% of the target bitrate")
+    for result in results:
+        if not result["ok"]:
+            print(f"❌ {result['error']}")
+            break
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--publishers", type=int, default=200)
+    parser.add_argument("--bitrate", type=int, default=500, help="Target kbps per publisher")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--timeout", type=float, default=30.0, help="Connect/handshake/publish timeout per publisher")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the stand-in waits before each command response")
+    parser.add_argument("--bandwidth-kbps", type=int, default=0, help="Stand-in receive cap per publisher")
+    args = parser.parse_args()
+    sys.exit(1 if asyncio.run(run(args)) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Check that importing the CLI stays within its cold-start budget.
+
+Runs `python -X importtime -c "import cli_app"` in fresh interpreters and
+takes the best cumulative import time of cli_app. It fails if that exceeds
+the budget, or if any dependency that should load lazily was imported at
+start-up. Exits non-zero on failure so it can gate CI.
+
+Usage:
+    python benchmarks/startup_budget.py --budget-ms 50
+"""
+import argparse
+import subprocess
+import sys
+
+from common import ROOT
+
+LAZY_MODULES = (
+    "asyncio",
+    "multiprocessing",
+    "sqlite3",
+    "pyperclip",
+    "streamlit",
+    "pandas",
+    "pyarrow",
+)
+
+
+def measure(module):
+    """Return (cumulative microseconds for module, set of imported module names)"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    cumulative = None
+    imported = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        if not cumulative_us.strip().isdigit():
+            continue
+        imported.add(name.strip())
+        if name.strip() == module:
+            cumulative = int(cumulative_us)
+    return cumulative, imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="cli_app")
+    parser.add_argument("--budget-ms", type=float, default=50.0)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    timings = []
+    eager = set()
+    for _ in range(args.runs):
+        cumulative, imported = measure(args.module)
+        timings.append(cumulative)
+        eager |= {name.split(".")[0] for name in imported} & set(LAZY_MODULES)
+
+    best_ms = min(timings) / 1000
+    print(f"import {args.module}: best {best_ms:.1f} ms over {args.runs} run(s), budget {args.budget_ms:g} ms")
+
+    failed = False
+    if best_ms > args.budget_ms:
+        print(f"❌ Import time exceeds budget by {best_ms - args.budget_ms:.1f} ms")
+        failed = True
+    if eager:
+        print(f"❌ Imported eagerly: {', '.join(sorted(eager))}")
+        failed = True
+    if not failed:
+        print("✅ Within budget")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Benchmark suite for generation, save, load and sidebar render at scale.
+
+Every (case, size) pair runs in a fresh subprocess against a temporary
+config directory, so peak RSS is attributable to that case alone and runs
+never touch /app/configs or the network. Results are written as JSON for
+comparing releases.
+
+Usage:
+    python benchmarks/suite.py --sizes 100 10000 100000 --output bench.json
+    python benchmarks/suite.py --compare old.json --output new.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import ROOT, make_configs, percentile, populate
+
+CASES = ("generate", "save", "load", "sidebar")
+
+
+def case_generate(config_dir, backend, size):
+    from rtmp_core import RTMPGenerator
+
+    generator = RTMPGenerator()
+    timings = []
+    for config in make_configs(size):
+        start = time.perf_counter_ns()
+        generator.generate_rtmp(config["platform"], config["stream_key"], config["server_url"], config["app_name"])
+        timings.append(time.perf_counter_ns() - start)
+    return size, timings
+
+
+def case_save(config_dir, backend, size):
+    from rtmp_core import RTMPGenerator
+    from config_store import get_config_store
+
+    generator = RTMPGenerator(get_config_store(backend, config_dir))
+    timings = []
+    for config in make_configs(size):
+        start = time.perf_counter_ns()
+        generator.save_config(config["name"], config["platform"], config["stream_key"], config["server_url"], config["app_name"])
+        timings.append(time.perf_counter_ns() - start)
+    return size, timings
+
+
+def case_load(config_dir, backend, size, repeats=5):
+    from rtmp_core import RTMPGenerator
+
+    generator = RTMPGenerator(populate(config_dir, backend, size))
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        generator.load_configs()
+        timings.append(time.perf_counter_ns() - start)
+    return size * repeats, timings
+
+
+def case_sidebar(config_dir, backend, size, repeats=5):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    populate(config_dir, backend, size)
+    at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=600)
+    timings = []
+    for _ in range(repeats):
+        # Measure a listing render from scratch, not a cache hit
+        st.cache_data.clear()
+        st.cache_resource.clear()
+        start = time.perf_counter_ns()
+        at.run()
+        timings.append(time.perf_counter_ns() - start)
+    return size * repeats, timings
+
+
+def run_case(case, size, backend):
+    """Run a single case in this process and return its result dict"""
+    with tempfile.TemporaryDirectory() as config_dir:
+        os.environ["CONFIG_DIR"] = config_dir
+        os.environ["CONFIG_BACKEND"] = backend
+        items, timings = globals()[f"case_{case}"](config_dir, backend, size)
+    # Throughput counts only the timed operations, not setup such as populating the store
+    elapsed = sum(timings) / 1e9
+
+    timings.sort()
+    return {
+        "case": case,
+        "size": size,
+        "backend": backend,
+        "ops": len(timings),
+        "items_per_sec": items / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(timings, 50) / 1e6,
+        "p99_ms": percentile(timings, 99) / 1e6,
+        # ru_maxrss is KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def spawn_case(case, size, backend):
+    proc = subprocess.run(
+        [sys.executable, __file__, "--run-case", case, "--sizes", str(size), "--backend", backend],
+        capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        return {"case": case, "size": size, "backend": backend, "error": proc.stderr.strip().splitlines()[-1:]}
+    return json.loads(proc.stdout)
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+def print_results(results, baseline=None):
+    previous = {}
+    for result in (baseline or {}).get("results", []):
+        previous[(result["case"], result["size"], result["backend"])] = result
+
+    print(f"{'case':<8} {'size':>7} {'items/s':>12} {'p50 ms':>9} {'p99 ms':>9} {'RSS MB':>8}  vs baseline p50")
+    for result in results:
+        if "error" in result:
+            print(f"{result['case']:<8} {result['size']:>7}  ❌ {' '.join(result['error'])}")
+            continue
+        line = (
+            f"{result['case']:<8} {result['size']:>7} {result['items_per_sec']:>12,.0f} "
+            f"{result['p50_ms']:>9.3f} {result['p99_ms']:>9.3f} {result['peak_rss_mb']:>8.1f}"
+        )
+        old = previous.get((result["case"], result["size"], result["backend"]))
+        if old and old.get("p50_ms"):
+            line += f"  {result['p50_ms'] / old['p50_ms']:.2f}x"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--backend", default="sqlite", choices=["sqlite", "json"])
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Previous results JSON to compare p50 latency against")
+    parser.add_argument("--run-case", choices=CASES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        print(json.dumps(run_case(args.run_case, args.sizes[0], args.backend)))
+        return
+
+    results = [
+        spawn_case(case, size, args.backend)
+        for size in args.sizes
+        for case in args.cases
+    ]
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Per-call cost of compiled URL builders vs the original str.format path.
+
+Usage:
+    python benchmarks/url_builders.py --calls 1000000
+"""
+import argparse
+import sys
+import time
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from rtmp_core import RTMPGenerator
+
+
+def legacy_generate_rtmp(platforms, platform, stream_key, server_url="", app_name=""):
+    """generate_rtmp as it was before builders were compiled"""
+    if platform not in platforms:
+        return "Invalid platform selected"
+    template = platforms[platform]["template"]
+    if platform == "custom":
+        rtmp_url = template.format(server_url=server_url, app_name=app_name, stream_key=stream_key)
+    else:
+        rtmp_url = template.format(stream_key=stream_key)
+    return rtmp_url
+
+
+def legacy_with_split(platforms, platform, stream_key, server_url="", app_name=""):
+    """Legacy URL generation plus the rsplit cli_app.py used for the OBS server field"""
+    rtmp_url = legacy_generate_rtmp(platforms, platform, stream_key, server_url, app_name)
+    server_part = rtmp_url.rsplit('/', 1)[0] if platform != "custom" else f"rtmp://{server_url}/{app_name}"
+    return rtmp_url, server_part
+
+
+def bench(label, fn, platform, calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        fn(platform, "live_123456789_abcdefghij", "live.example.com", "live")
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {platform:<9} {elapsed * 1e9 / calls:>8.1f} ns/call  {calls / elapsed:>12,.0f} calls/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    generator = RTMPGenerator()
+    platforms = generator.platforms
+
+    for platform in ("twitch", "custom"):
+        bench("legacy str.format", partial(legacy_generate_rtmp, platforms), platform, args.calls)
+        bench("generate_rtmp (compiled)", generator.generate_rtmp, platform, args.calls)
+        bench("legacy format + rsplit", partial(legacy_with_split, platforms), platform, args.calls)
+        bench("build (url, server, app)", generator.build, platform, args.calls)
+
+
+if __name__ == "__main__":
+    main()
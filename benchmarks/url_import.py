@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Throughput of RTMP URL parsing and bulk import.
+
+Writes a CSV of generated URLs (a mix of Twitch, YouTube, Facebook keys
+with ?ds=1, and custom servers with nested apps, plus duplicates), then
+compares parsing it row by row with URLParser.parse against the
+vectorised bulk_import path, and optionally times the full import into a
+store.
+
+Usage:
+    python benchmarks/url_import.py --rows 1000000
+    python benchmarks/url_import.py --rows 200000 --save --backend sqlite
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+
+import common  # noqa: F401  (puts the repo root on sys.path)
+from bulk_import import content_hashes, import_urls, parse_table, read_table
+from config_store import get_config_store
+from rtmp_core import RTMPGenerator
+
+
+def make_urls(count, duplicate_ratio, seed=1):
+    rng = random.Random(seed)
+    urls = []
+    for i in range(count):
+        if urls and rng.random() < duplicate_ratio:
+            urls.append(rng.choice(urls))
+            continue
+        kind = i % 4
+        if kind == 0:
+            urls.append(f"rtmp://live.twitch.tv/app/live_{i}_{rng.getrandbits(40):x}")
+        elif kind == 1:
+            urls.append(f"rtmp://a.rtmp.youtube.com/live2/{i:04d}-abcd-efgh-{rng.getrandbits(16):04x}")
+        elif kind == 2:
+            urls.append(f"rtmp://live-api-s.facebook.com:80/rtmp/{100000000 + i}?ds=1&a={rng.getrandbits(20)}")
+        else:
+            urls.append(f"rtmp://ingest{i % 50}.example.com:1935/live/region{i % 7}/key-{i}")
+    return urls
+
+
+def timed(label, func, rows):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<30} {elapsed:8.2f} s   {rows / elapsed:12,.0f} rows/s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--duplicates", type=float, default=0.1, help="Fraction of rows repeating an earlier URL")
+    parser.add_argument("--save", action="store_true", help="Also time the full import into a store")
+    parser.add_argument("--backend", default="sqlite", choices=["json", "sqlite"])
+    args = parser.parse_args()
+
+    generator = RTMPGenerator()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "urls.csv")
+        urls = make_urls(args.rows, args.duplicates)
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["rtmp_url"])
+            writer.writerows([url] for url in urls)
+        del urls
+        print(f"{args.rows:,} rows, {os.path.getsize(path) / 1e6:.1f} MB CSV")
+
+        def scalar():
+            parsed = set()
+            with open(path, newline="") as f:
+                for row in csv.DictReader(f):
+                    parsed.add(generator.parse_url(row["rtmp_url"]))
+            return len(parsed)
+
+        unique = timed("csv + URLParser.parse + set", scalar, args.rows)
+        table = timed("pyarrow read_csv", lambda: read_table(path), args.rows)
+        frame = timed("vectorised parse", lambda: parse_table(table, generator.url_parser), args.rows)
+        hashes = timed("content hash", lambda: content_hashes(frame), args.rows)
+        print(f"unique destinations: {unique:,} (scalar)  {(~hashes.duplicated()).sum():,} (vectorised)")
+
+        if args.save:
+            store = get_config_store(args.backend, os.path.join(tmp, "configs"))
+            summary = timed(f"full import ({args.backend})", lambda: import_urls(path, store, generator.url_parser), args.rows)
+            print(f"imported {summary['imported']:,}, skipped {summary['duplicates']:,} duplicate(s); "
+                  f"store now holds {store.count():,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Vectorised bulk import of existing RTMP URLs into the config store.
+
+Input files (CSV, Parquet, JSONL or one URL per line) are read with
+pyarrow. Every URL is split in one pass by Arrow's regex kernel using
+url_parser.URL_PATTERN, and (server, app) pairs are matched against the
+registry with a single index_in lookup. pandas then hashes each row's
+content (platform, normalized server, app, key) so duplicate destinations
+in the file are dropped before saving in batches. Rows without a name get
+one derived from that hash, so re-importing the same export overwrites the
+earlier configs instead of adding copies.
+
+pandas and pyarrow are only imported from here, so the rest of the CLI
+never pays for them.
+"""
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from url_parser import DEFAULT_PORT_SUFFIX, URL_PATTERN
+
+FORMATS = ("csv", "parquet", "jsonl", "txt")
+CONTENT_FIELDS = ["platform", "server_key", "app_name", "stream_key"]
+SAVE_BATCH = 5000
+
+
+def detect_format(path):
+    for fmt, suffixes in (("parquet", (".parquet", ".pq")), ("jsonl", (".jsonl", ".ndjson")), ("csv", (".csv",))):
+        if path.endswith(suffixes):
+            return fmt
+    return "txt"
+
+
+def read_table(path, fmt=None, column="rtmp_url"):
+    """Read a file of URLs into an Arrow table with rtmp_url (and name, if present)"""
+    fmt = fmt or detect_format(path)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        table = pq.read_table(path)
+    elif fmt == "jsonl":
+        import pyarrow.json as pj
+        table = pj.read_json(path)
+    else:
+        import pyarrow.csv as pcsv
+        if fmt == "csv":
+            table = pcsv.read_csv(path, convert_options=pcsv.ConvertOptions(strings_can_be_null=True))
+        else:
+            table = pcsv.read_csv(
+                path,
+                read_options=pcsv.ReadOptions(column_names=[column]),
+                parse_options=pcsv.ParseOptions(delimiter="\x1f", quote_char=False),
+                convert_options=pcsv.ConvertOptions(column_types={column: pa.string()})
+            )
+    if column not in table.column_names:
+        raise ValueError(f"No {column!r} column in {path} (columns: {', '.join(table.column_names)})")
+
+    columns = {"rtmp_url": table[column].cast(pa.string())}
+    if "name" in table.column_names and column != "name":
+        columns["name"] = table["name"].cast(pa.string())
+    return pa.table(columns)
+
+
+def parse_table(table, url_parser):
+    """Split every URL; returns a DataFrame with platform/server/app/key and a valid flag"""
+    urls = pc.utf8_trim_whitespace(table["rtmp_url"])
+    parts = pc.extract_regex(urls, URL_PATTERN)
+    server = pc.struct_field(parts, "server")
+    app_name = pc.struct_field(parts, "app")
+    stream_key = pc.struct_field(parts, "key")
+
+    # Same normalization as url_parser.normalize_server, as Arrow kernels
+    server_key = pc.replace_substring_regex(pc.utf8_lower(server), DEFAULT_PORT_SUFFIX + "$", "")
+    lookup = pc.binary_join_element_wise(server_key, app_name, "\n")
+    known = [f"{server}\n{app}" for server, app in url_parser.destinations]
+    platform_names = pa.array(list(url_parser.destinations.values()))
+    positions = pc.index_in(lookup, value_set=pa.array(known, pa.string()))
+    platform = pc.fill_null(pc.take(platform_names, positions), "custom")
+
+    frame = pa.table({
+        "rtmp_url": urls,
+        "platform": platform,
+        "server_url": server,
+        "server_key": server_key,
+        "app_name": app_name,
+        "stream_key": stream_key
+    }).to_pandas()
+    if "name" in table.column_names:
+        frame["name"] = table["name"].to_pandas()
+    frame["valid"] = frame["stream_key"].notna()
+    return frame
+
+
+def content_hashes(frame):
+    """64-bit hash of each row's destination, stable across runs"""
+    return pd.util.hash_pandas_object(frame[CONTENT_FIELDS], index=False)
+
+
+def _configs(frame):
+    fields = ["name", "platform", "stream_key", "server_url", "app_name", "rtmp_url"]
+    for row in frame[fields].itertuples(index=False, name=None):
+        yield dict(zip(fields, row))
+
+
+def import_urls(path, store, url_parser, fmt=None, column="rtmp_url", dry_run=False):
+    """Parse, deduplicate and save a file of RTMP URLs; returns counts and sample errors"""
+    frame = parse_table(read_table(path, fmt, column), url_parser)
+    invalid = frame[~frame["valid"]]
+    frame = frame[frame["valid"]]
+
+    hashes = content_hashes(frame)
+    duplicate = hashes.duplicated().to_numpy()
+    frame, hashes = frame[~duplicate], hashes[~duplicate]
+
+    derived = frame["platform"] + "-" + hashes.map("{:016x}".format)
+    if "name" in frame.columns:
+        names = frame["name"].str.strip()
+        frame = frame.assign(name=names.where(names.notna() & (names != ""), derived))
+    else:
+        frame = frame.assign(name=derived)
+    # Two different destinations sharing a name: keep the first, like duplicates
+    renamed = frame["name"].duplicated().to_numpy()
+    frame = frame[~renamed]
+
+    if not dry_run:
+        batch = []
+        for config in _configs(frame):
+            batch.append(config)
+            if len(batch) >= SAVE_BATCH:
+                store.save_many(batch)
+                batch = []
+        if batch:
+            store.save_many(batch)
+
+    return {
+        "rows": len(invalid) + len(duplicate),
+        "invalid": len(invalid),
+        "duplicates": int(duplicate.sum()),
+        "name_conflicts": int(renamed.sum()),
+        "imported": len(frame),
+        "platforms": frame["platform"].value_counts().to_dict(),
+        "errors": [
+            {"row": int(index) + 1, "rtmp_url": url, "error": "Not an RTMP URL of the form rtmp://server/app/key"}
+            for index, url in invalid["rtmp_url"].head(20).items()
+        ]
+    }
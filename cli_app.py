@@ -1,84 +1,419 @@
 #!/usr/bin/env python3
 import json
-import os
-from pathlib import Path
-
-class RTMPGenerator:
-    def __init__(self):
-        self.platforms = {
-            "twitch": {
-                "template": "rtmp://live.twitch.tv/app/{stream_key}",
-                "help": "Get stream key from Twitch Dashboard -> Settings -> Stream",
-                "server": "rtmp://live.twitch.tv/app",
-                "example_key": "live_123456789_abcdefghij"
-            },
-            "youtube": {
-                "template": "rtmp://a.rtmp.youtube.com/live2/{stream_key}",
-                "help": "Get stream key from YouTube Studio -> Go Live -> Create Stream",
-                "server": "rtmp://a.rtmp.youtube.com/live2",
-                "example_key": "xxxx-xxxx-xxxx-xxxx"
-            },
-            "facebook": {
-                "template": "rtmp://live-api-s.facebook.com:80/rtmp/{stream_key}",
-                "help": "Get stream key from Facebook Live API",
-                "server": "rtmp://live-api-s.facebook.com:80/rtmp",
-                "example_key": "123456789012345?ds=1"
-            },
-            "custom": {
-                "template": "rtmp://{server_url}/{app_name}/{stream_key}",
-                "help": "Enter custom RTMP server details",
-                "server": "rtmp://your-server.com/app",
-                "example_key": "your_stream_key"
-            }
-        }
-    
-    def generate_rtmp(self, platform, stream_key, server_url="", app_name=""):
-        if platform not in self.platforms:
-            return "Invalid platform selected"
-        
-        template = self.platforms[platform]["template"]
-        
-        if platform == "custom":
-            rtmp_url = template.format(
-                server_url=server_url,
-                app_name=app_name,
-                stream_key=stream_key
-            )
+import sys
+
+import metrics
+from rtmp_core import RTMPGenerator
+
+def read_batch_rows(f, fmt):
+    """Stream rows from a CSV (with header) or JSONL file object"""
+    if fmt == "csv":
+        import csv
+        yield from csv.DictReader(f)
+    else:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+def run_batch(argv):
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        prog="cli_app.py batch",
+        description="Generate RTMP URLs for many stream keys non-interactively"
+    )
+    parser.add_argument("input", nargs="?", default="-", help="CSV or JSONL file (default: stdin)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Input format (default: from file extension, else jsonl)")
+    parser.add_argument("--output", default="-", help="JSONL output file (default: stdout)")
+    parser.add_argument("--save", action="store_true", help="Save each valid row as a configuration using its 'name'")
+    parser.add_argument("--workers", type=int, default=0, help="Process pool size for validation (default: in-process)")
+    parser.add_argument("--fastest-ingest", action="store_true", help="Probe platform ingest endpoints once and use the fastest")
+    args = parser.parse_args(argv)
+    
+    fmt = args.format or ("csv" if args.input.endswith(".csv") else "jsonl")
+    infile = sys.stdin if args.input == "-" else open(args.input, newline="")
+    outfile = sys.stdout if args.output == "-" else open(args.output, "w")
+    
+    generator = RTMPGenerator()
+    if args.fastest_ingest:
+        for platform, endpoint in generator.use_fastest_endpoints().items():
+            print(f"Using {endpoint} for {platform}", file=sys.stderr)
+    results = generator.generate_many(read_batch_rows(infile, fmt), workers=args.workers)
+    if args.save:
+        results = generator.save_many(results)
+    
+    total = failed = 0
+    try:
+        for result in results:
+            total += 1
+            failed += "error" in result
+            outfile.write(json.dumps(result) + "\n")
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+        if outfile is not sys.stdout:
+            outfile.close()
+    
+    print(f"Processed {total} row(s), {failed} failed", file=sys.stderr)
+    return 1 if failed else 0
+
+def run_validate(argv):
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        prog="cli_app.py validate",
+        description="Check stream keys and server details without generating URLs"
+    )
+    parser.add_argument("input", nargs="?", default="-", help="CSV or JSONL file (default: stdin)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Input format (default: from file extension, else jsonl)")
+    parser.add_argument("--workers", type=int, default=0, help="Process pool size for validation (default: in-process)")
+    args = parser.parse_args(argv)
+    
+    fmt = args.format or ("csv" if args.input.endswith(".csv") else "jsonl")
+    infile = sys.stdin if args.input == "-" else open(args.input, newline="")
+    
+    generator = RTMPGenerator()
+    total = failed = 0
+    try:
+        # Only invalid rows are printed, one JSON object per line
+        for row_number, errors in generator.validator.validate_many(read_batch_rows(infile, fmt), workers=args.workers):
+            total += 1
+            if errors:
+                failed += 1
+                print(json.dumps({"row": row_number, "errors": errors}))
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+    
+    print(f"Validated {total} row(s), {failed} invalid", file=sys.stderr)
+    return 1 if failed else 0
+
+def print_probe_results(results):
+    for result in sorted(results, key=lambda r: (not r["ok"], r["handshake_ms"] or 0)):
+        if result["ok"]:
+            print(f"✅ {result['server']:<40} connect {result['connect_ms']:7.1f} ms   handshake {result['handshake_ms']:7.1f} ms")
         else:
-            rtmp_url = template.format(stream_key=stream_key)
-        
-        return rtmp_url
+            print(f"❌ {result['server']:<40} {result['error']}")
+        if result.get("warning"):
+            print(f"   ⚠️ {result['warning']}")
+        if result.get("configs"):
+            print(f"   Used by: {', '.join(result['configs'])}")
+
+def run_probe(argv):
+    import argparse
+    import rtmp_probe
     
-    def save_config(self, config_name, platform, stream_key, server_url="", app_name=""):
-        config_dir = Path("/app/configs")
-        config_dir.mkdir(exist_ok=True)
-        
-        config = {
-            "name": config_name,
-            "platform": platform,
-            "stream_key": stream_key,
-            "server_url": server_url,
-            "app_name": app_name,
-            "rtmp_url": self.generate_rtmp(platform, stream_key, server_url, app_name)
-        }
-        
-        config_file = config_dir / f"{config_name}.json"
-        with open(config_file, 'w') as f:
-            json.dump(config, f, indent=2)
-        
-        return config_file
+    parser = argparse.ArgumentParser(
+        prog="cli_app.py probe",
+        description="Check reachability and RTMP handshake latency of ingest servers"
+    )
+    parser.add_argument("servers", nargs="*", help="host[:port] to probe (default: servers of all saved configs)")
+    parser.add_argument("--concurrency", type=int, default=rtmp_probe.DEFAULT_CONCURRENCY)
+    parser.add_argument("--timeout", type=float, default=rtmp_probe.DEFAULT_TIMEOUT, help="Seconds per connect and per handshake")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
     
-    def load_configs(self):
-        config_dir = Path("/app/configs")
-        configs = []
-        if config_dir.exists():
-            for config_file in config_dir.glob("*.json"):
-                with open(config_file, 'r') as f:
-                    configs.append(json.load(f))
-        return configs
+    if args.servers:
+        results = rtmp_probe.run(rtmp_probe.probe_many(args.servers, args.concurrency, args.timeout))
+    else:
+        generator = RTMPGenerator()
+        results = rtmp_probe.probe_configs(generator, generator.load_configs(), args.concurrency, args.timeout)
+    
+    if args.json:
+        print(json.dumps(results, indent=2))
+    elif results:
+        print_probe_results(results)
+    else:
+        print("No servers to probe.")
+    return 0 if all(r["ok"] for r in results) else 1
+
+def print_publish_result(result):
+    if not result["ok"]:
+        print(f"❌ {result['server']:<40} {result['error']}")
+        return
+    verdict = "✅" if result["sustained"] else "⚠️ "
+    print(f"{verdict} {result['server']:<40} achieved {result['achieved_kbps']:8.1f} kbps of {result['target_kbps']} kbps "
+          f"over {result['duration_s']:.1f} s")
+    print(f"   connect {result['connect_ms']:.1f} ms   handshake {result['handshake_ms']:.1f} ms   publish {result['publish_ms']:.1f} ms")
+    print(f"   stalls {result['stalls']} ({result['stall_ms']:.1f} ms)   jitter {result['jitter_ms']:.2f} ms   "
+          f"max late {result['max_late_ms']:.1f} ms")
+
+def run_publish(argv):
+    import argparse
+    import rtmp_publisher
+    
+    parser = argparse.ArgumentParser(
+        prog="cli_app.py publish",
+        description="Push synthetic audio/video to a destination and check it sustains a bitrate"
+    )
+    parser.add_argument("name", nargs="?", help="Saved configuration to publish to")
+    parser.add_argument("--platform", default="custom", help="Platform for an unsaved destination (default: custom)")
+    parser.add_argument("--key", help="Stream key for an unsaved destination")
+    parser.add_argument("--server", default="", help="host[:port] for the custom platform")
+    parser.add_argument("--app", default="", help="Application name for the custom platform")
+    parser.add_argument("--bitrate", type=int, default=rtmp_publisher.DEFAULT_BITRATE_KBPS, help="Target bitrate in kbps")
+    parser.add_argument("--duration", type=float, default=rtmp_publisher.DEFAULT_DURATION, help="Seconds to publish for")
+    parser.add_argument("--timeout", type=float, default=rtmp_publisher.DEFAULT_TIMEOUT, help="Seconds for connect, handshake and publish")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+    
+    generator = RTMPGenerator()
+    if args.name:
+        config = generator.store.load(args.name)
+        if config is None:
+            print(f"No saved configuration named {args.name!r}", file=sys.stderr)
+            return 2
+    elif args.key:
+        config = {"platform": args.platform, "stream_key": args.key, "server_url": args.server, "app_name": args.app}
+        errors = generator.validator.validate(args.platform, args.key, args.server, args.app)
+        if errors:
+            parser.error(errors[0]["message"])
+    else:
+        parser.error("give a saved configuration name or --key")
+    
+    result = rtmp_publisher.publish_config(
+        generator, config, bitrate_kbps=args.bitrate, duration=args.duration, timeout=args.timeout
+    )
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_publish_result(result)
+    return 0 if result["ok"] and result["sustained"] else 1
+
+def run_export(argv):
+    import argparse
+    import profile_export
+    
+    parser = argparse.ArgumentParser(
+        prog="cli_app.py export",
+        description="Export saved configurations as a zip of vMix and OBS import files"
+    )
+    parser.add_argument("output", help="Zip file to write ('-' for stdout)")
+    parser.add_argument("--formats", nargs="+", choices=profile_export.FORMATS, default=list(profile_export.FORMATS),
+                        help="Bundles to include (default: all)")
+    args = parser.parse_args(argv)
+    
+    generator = RTMPGenerator()
+    if args.output == "-":
+        counts = profile_export.export_bundle(generator.store, sys.stdout.buffer, generator, args.formats)
+    else:
+        with open(args.output, "wb") as f:
+            counts = profile_export.export_bundle(generator.store, f, generator, args.formats)
+    
+    for fmt, count in counts.items():
+        print(f"✅ {count} configuration(s) exported for {fmt}", file=sys.stderr)
+    return 0
+
+def run_import(argv):
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        prog="cli_app.py import",
+        description="Import existing full RTMP URLs as saved configurations"
+    )
+    parser.add_argument("input", help="CSV, Parquet, JSONL or plain text (one URL per line) file")
+    parser.add_argument("--format", choices=["csv", "parquet", "jsonl", "txt"], help="Input format (default: from file extension, else txt)")
+    parser.add_argument("--column", default="rtmp_url", help="Column holding the URLs (default: rtmp_url)")
+    parser.add_argument("--dry-run", action="store_true", help="Parse and deduplicate without saving")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args(argv)
+    
+    import bulk_import
+    
+    generator = RTMPGenerator()
+    summary = bulk_import.import_urls(
+        args.input, generator.store, generator.url_parser, args.format, args.column, args.dry_run
+    )
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 1 if summary["invalid"] else 0
+    
+    for error in summary["errors"]:
+        print(f"❌ Row {error['row']}: {error['error']} ({error['rtmp_url']!r})")
+    platforms = ", ".join(f"{name}: {count}" for name, count in summary["platforms"].items())
+    action = "Would import" if args.dry_run else "Imported"
+    print(f"✅ {action} {summary['imported']} of {summary['rows']} row(s) ({platforms})")
+    print(f"   {summary['duplicates']} duplicate(s), {summary['name_conflicts']} name conflict(s), {summary['invalid']} invalid")
+    return 1 if summary["invalid"] else 0
+
+def run_columnar(argv):
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        prog="cli_app.py columnar",
+        description="Generate RTMP URLs for every row of a Parquet file into a new Parquet file"
+    )
+    parser.add_argument("input", help="Parquet file with platform, stream_key, server_url and app_name columns")
+    parser.add_argument("output", help="Parquet file to write (input columns plus rtmp_url, server, app, error)")
+    parser.add_argument("--batch-size", type=int, default=1_000_000, help="Rows per record batch (default: 1000000)")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args(argv)
+    
+    import columnar
+    
+    summary = columnar.generate_parquet(args.input, args.output, RTMPGenerator(), args.batch_size)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 1 if summary["errors"] else 0
+    
+    platforms = ", ".join(f"{name}: {count}" for name, count in summary["platforms"].items())
+    print(f"✅ Generated {summary['rows'] - summary['errors']} of {summary['rows']} row(s) into {args.output} ({platforms})")
+    if summary["errors"]:
+        print(f"❌ {summary['errors']} row(s) failed; see the error column")
+    return 1 if summary["errors"] else 0
+
+def print_simulcast_plan(plan):
+    for output in plan["outputs"]:
+        note = f" (asked for {output['requested_profile']})" if output["downscaled"] else ""
+        print(f"📡 {output['name']:<24} {output['platform']:<10} {output['profile']:<8} {output['wire_kbps']:6} kbps{note}")
+    budget = f" of {plan['budget_kbps']} kbps budget" if plan["budget_kbps"] is not None else ""
+    print(f"   {len(plan['encodes'])} encode(s), load {plan['encoder_load']} x 1080p30, "
+          f"{plan['total_kbps']} kbps uplink{budget}")
+    for warning in plan["warnings"]:
+        print(f"⚠️  {warning}")
+
+def run_simulcast(argv):
+    import argparse
+    import simulcast
+    
+    parser = argparse.ArgumentParser(
+        prog="cli_app.py simulcast",
+        description="Plan one encoder feeding several saved destinations within an uplink budget"
+    )
+    parser.add_argument("destinations", nargs="+", metavar="NAME[=QUALITY]",
+                        help=f"Saved configurations, optionally with a quality ({', '.join(simulcast.LADDER)})")
+    parser.add_argument("--quality", choices=simulcast.LADDER, default=simulcast.DEFAULT_PROFILE,
+                        help=f"Quality for destinations without one (default: {simulcast.DEFAULT_PROFILE})")
+    parser.add_argument("--uplink-kbps", type=int, help="Declared upload capacity in kbps")
+    parser.add_argument("--measure-uplink", metavar="NAME",
+                        help="Measure the uplink by publishing the plan's bitrate to this saved configuration")
+    parser.add_argument("--headroom", type=float, default=simulcast.DEFAULT_HEADROOM,
+                        help=f"Fraction of the uplink the plan may use (default: {simulcast.DEFAULT_HEADROOM})")
+    parser.add_argument("--encoder-capacity", type=float, help="Encoder limit in 1080p30 encodes")
+    parser.add_argument("--no-downscale", action="store_true", help="Only warn instead of lowering qualities")
+    parser.add_argument("--input", default="INPUT", help="ffmpeg input for the printed command")
+    parser.add_argument("--vmix", action="store_true", help="Print vMix destinations XML instead of the ffmpeg command")
+    parser.add_argument("--json", action="store_true", help="Print the plan as JSON")
+    args = parser.parse_args(argv)
+    
+    generator = RTMPGenerator()
+    configs, qualities = [], {}
+    for entry in args.destinations:
+        name, _, quality = entry.partition("=")
+        if quality and quality not in simulcast.PROFILES:
+            parser.error(f"unknown quality {quality!r} for {name!r}")
+        config = generator.store.load(name)
+        if config is None:
+            print(f"No saved configuration named {name!r}", file=sys.stderr)
+            return 2
+        configs.append(config)
+        if quality:
+            qualities[name] = quality
+    try:
+        destinations = simulcast.destinations_from_configs(generator, configs, qualities, args.quality)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    
+    uplink_kbps = args.uplink_kbps
+    if args.measure_uplink:
+        config = generator.store.load(args.measure_uplink)
+        if config is None:
+            print(f"No saved configuration named {args.measure_uplink!r}", file=sys.stderr)
+            return 2
+        # Ask for what the unscaled plan needs; a link that sustains it needs no downscaling
+        wanted = simulcast.plan_simulcast(destinations)["total_kbps"] / args.headroom
+        result = simulcast.measure_uplink(generator, config, round(wanted))
+        print_publish_result(result)
+        if not result["ok"]:
+            return 1
+        uplink_kbps = round(result["achieved_kbps"]) if not result["sustained"] else max(uplink_kbps or 0, round(wanted))
+    
+    plan = simulcast.plan_simulcast(
+        destinations, uplink_kbps, args.headroom, args.encoder_capacity, not args.no_downscale
+    )
+    if args.json:
+        plan["ffmpeg"] = simulcast.ffmpeg_command(plan, args.input)
+        print(json.dumps(plan, indent=2))
+    else:
+        print_simulcast_plan(plan)
+        print()
+        print(simulcast.vmix_destinations(plan) if args.vmix else simulcast.ffmpeg_shell(plan, args.input))
+    return 0 if plan["fits"] else 1
+
+def run_rotate(argv):
+    import argparse
+    import key_rotation
+    
+    parser = argparse.ArgumentParser(
+        prog="cli_app.py rotate",
+        description="Replace the stream keys of many saved configurations in one all-or-nothing write"
+    )
+    parser.add_argument("mapping", help="CSV or JSONL with a new_key column and a name or old_key column ('-' for stdin)")
+    parser.add_argument("--format", choices=key_rotation.FORMATS, help="Mapping format (default: from file extension, else csv)")
+    parser.add_argument("--dry-run", action="store_true", help="Check the mapping without saving")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args(argv)
+    
+    fmt = args.format or key_rotation.detect_format(args.mapping)
+    if args.mapping == "-":
+        mapping = key_rotation.read_mapping(sys.stdin, fmt)
+    else:
+        with open(args.mapping, newline="", encoding="utf-8-sig") as f:
+            mapping = key_rotation.read_mapping(f, fmt)
+    
+    generator = RTMPGenerator()
+    result = key_rotation.rotate_keys(generator.store, generator, mapping, args.dry_run)
+    names = [config["name"] for config in result.pop("updates")]
+    if args.json:
+        # Config names only: the summary must not repeat the new keys
+        print(json.dumps(dict(result, configs=names), indent=2))
+        return 1 if result["errors"] else 0
+    
+    for error in result["errors"]:
+        print(f"❌ Row {error['row']}: {error['error']}")
+    if result["errors"]:
+        print(f"❌ Nothing rotated: {len(result['errors'])} problem(s) in {result['rows']} row(s)")
+        return 1
+    action = "Would rotate" if args.dry_run else "Rotated"
+    print(f"✅ {action} {len(names)} stream key(s) from {result['rows']} row(s), {result['unchanged']} already current")
+    return 0
+
+SUBCOMMANDS = {
+    "batch": run_batch,
+    "validate": run_validate,
+    "probe": run_probe,
+    "publish": run_publish,
+    "export": run_export,
+    "import": run_import,
+    "columnar": run_columnar,
+    "simulcast": run_simulcast,
+    "rotate": run_rotate,
+}
 
 def main():
+    # --profile[=PATH] anywhere on the command line profiles the whole run
+    profile, sys.argv[1:] = metrics.split_profile_flag(sys.argv[1:])
+    if profile is None:
+        run()
+    else:
+        with metrics.profiled(profile or None):
+            run()
+
+def run():
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        sys.exit(SUBCOMMANDS[sys.argv[1]](sys.argv[2:]))
+    
     generator = RTMPGenerator()
+    index = None
+    try:
+        # A json config directory is parsed once here and then followed
+        if generator.watch_configs() is not None:
+            from config_index import ConfigIndex
+            index = ConfigIndex.from_watcher(generator.watcher)
+    except ImportError:
+        print("⚠️ watchdog is not installed; saved configurations are rescanned on every view", file=sys.stderr)
     
     print("🎥 RTMP URL Generator for OBS")
     print("=" * 40)
@@ -87,15 +422,18 @@ def main():
         print("\nOptions:")
         print("1. Generate new RTMP URL")
         print("2. View saved configurations")
-        print("3. Exit")
+        print("3. Probe ingest servers")
+        print("4. Exit")
         
-        choice = input("\nSelect option (1-3): ").strip()
+        choice = input("\nSelect option (1-4): ").strip()
         
         if choice == "1":
             generate_rtmp_url(generator)
         elif choice == "2":
-            view_saved_configs(generator)
+            view_saved_configs(generator, index)
         elif choice == "3":
+            probe_saved_configs(generator)
+        elif choice == "4":
             print("Goodbye!")
             break
         else:
@@ -125,17 +463,34 @@ def generate_rtmp_url(generator):
         server_url = input("Enter RTMP server URL (e.g., live.example.com): ").strip()
         app_name = input("Enter application name (e.g., live): ").strip()
     
+    errors = generator.validator.validate(platform, stream_key, server_url, app_name)
+    if errors:
+        for error in errors:
+            print(f"⚠️  {error['message']}")
+        if any(error["code"] == "missing" for error in errors):
+            return
+        if input("Continue anyway? (y/n): ").lower().strip() != 'y':
+            return
+    
     # Generate RTMP URL
-    rtmp_url = generator.generate_rtmp(platform, stream_key, server_url, app_name)
+    if len(generator.platforms[platform].get("endpoints", [])) > 1:
+        fastest = input("Pick the fastest ingest server? (y/n): ").lower().strip()
+        if fastest == 'y':
+            print("📡 Measuring ingest servers...")
+            endpoint = generator.use_fastest_endpoints([platform])[platform]
+            print(f"Using {endpoint}")
+        else:
+            generator.reset_endpoint(platform)
+    
+    rtmp_url, server, app = generator.build(platform, stream_key, server_url, app_name)
     
     print(f"\n✅ RTMP URL Generated!")
     print(f"Platform: {platform.upper()}")
     print(f"Full RTMP URL: {rtmp_url}")
     
     # Show OBS setup
-    server_part = rtmp_url.rsplit('/', 1)[0] if platform != "custom" else f"rtmp://{server_url}/{app_name}"
     print(f"\n📹 OBS Setup:")
-    print(f"Server: {server_part}")
+    print(f"Server: rtmp://{server}/{app}")
     print(f"Stream Key: {stream_key}")
     
     # Save configuration
@@ -145,16 +500,57 @@ def generate_rtmp_url(generator):
         config_file = generator.save_config(config_name, platform, stream_key, server_url, app_name)
         print(f"✅ Configuration saved to: {config_file}")
 
-def view_saved_configs(generator):
+CLI_PAGE_SIZE = 20
+
+def view_saved_configs(generator, index=None):
+    from config_index import ConfigIndex
+    
+    if index is None:
+        index = ConfigIndex.from_store(generator.store)
+    else:
+        index.sync()
+    if not len(index):
+        print("\nNo saved configurations found.")
+        return
+    
+    query = input(f"\nSearch {len(index)} configuration(s) (blank for all): ").strip()
+    page = 1
+    while True:
+        entries, total = index.page(query, page=page, per_page=CLI_PAGE_SIZE)
+        if not entries:
+            print("\nNo configurations match your search.")
+            return
+        
+        pages = -(-total // CLI_PAGE_SIZE)
+        first = (page - 1) * CLI_PAGE_SIZE + 1
+        print(f"\n📁 Saved Configurations ({first}-{first + len(entries) - 1} of {total}):")
+        # Only the configs on this page are read from the store
+        for i, (name, platform) in enumerate(entries, first):
+            config = generator.watcher.get(name) if generator.watcher else generator.store.load(name)
+            print(f"\n{i}. {name} ({platform})")
+            if config:
+                print(f"   RTMP URL: {config['rtmp_url']}")
+        
+        if pages == 1:
+            return
+        choice = input(f"\nPage {page}/{pages} - (n)ext, (p)revious, anything else to go back: ").lower().strip()
+        if choice == 'n' and page < pages:
+            page += 1
+        elif choice == 'p' and page > 1:
+            page -= 1
+        else:
+            return
+
+def probe_saved_configs(generator):
     configs = generator.load_configs()
     if not configs:
         print("\nNo saved configurations found.")
         return
     
-    print("\n📁 Saved Configurations:")
-    for i, config in enumerate(configs, 1):
-        print(f"\n{i}. {config['name']} ({config['platform']})")
-        print(f"   RTMP URL: {config['rtmp_url']}")
+    import rtmp_probe
+    
+    print("\n📡 Probing ingest servers...")
+    print_probe_results(rtmp_probe.probe_configs(generator, configs))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""Columnar URL generation over Arrow tables and Parquet files.
+
+For very large batches the per-row builders are replaced by Arrow compute
+kernels. Each platform's template is split into literal and field parts
+(url_builders.template_parts) and evaluated for all of that platform's
+rows at once with binary_join_element_wise, and the per-platform results
+are scattered back into place with replace_with_mask. Validation mirrors
+KeyValidator with vectorised checks and the same key patterns, so the
+output matches generate_many: rows that fail carry every error message,
+joined the way format_errors joins them, and null URL columns.
+
+Parquet input is processed in record batches and written back
+incrementally, so memory is bounded by the batch size rather than the
+file.
+"""
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from key_validation import APP_PATTERN, SERVER_PATTERN
+from rtmp_core import BATCH_ALIASES, BATCH_FIELDS
+from url_builders import split_template, template_parts
+
+DEFAULT_BATCH_SIZE = 1_000_000
+OUTPUT_FIELDS = ("rtmp_url", "server", "app", "error")
+
+
+def _column(table, field):
+    names = [field] + [alias for alias, target in BATCH_ALIASES.items() if target == field]
+    for name in names:
+        if name in table.column_names:
+            values = table[name].combine_chunks().cast(pa.string())
+            return pc.utf8_trim_whitespace(pc.fill_null(values, ""))
+    return pa.array([""] * table.num_rows, pa.string())
+
+
+def _evaluate(template, columns, mask):
+    """Evaluate template for the rows selected by mask"""
+    parts = template_parts(template)
+    if not any(is_field for is_field, _ in parts):
+        return pa.repeat(pa.scalar(template), pc.sum(mask).as_py())
+    pieces = [pc.filter(columns[text], mask) if is_field else pa.scalar(text) for is_field, text in parts]
+    return pc.binary_join_element_wise(*pieces, "")
+
+
+def _errors(checks, length):
+    """Messages of every failing check per row, in order and joined with "; ",
+    null where all pass.
+
+    A message is a string or, where it quotes the row, a string array.
+    """
+    error = pa.nulls(length, pa.string())
+    if not checks:
+        return error
+    rejected = checks[0][0]
+    for failed, _ in checks[1:]:
+        rejected = pc.or_(rejected, failed)
+    if not pc.any(rejected).as_py():
+        return error
+    # Messages are only built for the (usually few) rejected rows
+    joined = pa.array([""] * pc.sum(rejected).as_py(), pa.string())
+    for failed, message in checks:
+        if isinstance(message, str):
+            message = pa.scalar("; " + message)
+        else:
+            message = pc.binary_join_element_wise("; ", pc.filter(message, rejected), "")
+        joined = pc.binary_join_element_wise(joined, pc.if_else(pc.filter(failed, rejected), message, ""), "")
+    # Every rejected row has at least one message; drop its leading "; "
+    return pc.replace_with_mask(error, rejected, pc.utf8_slice_codeunits(joined, 2))
+
+
+def _mismatch(values, pattern, mask):
+    """True where mask is set and values does not fully match pattern.
+
+    The regex only runs over the masked rows, so each platform's key
+    pattern costs its own share of the batch rather than the whole of it.
+    """
+    failed = pa.array(np.zeros(len(values), dtype=bool))
+    if not pc.any(mask).as_py():
+        return failed
+    matched = pc.match_substring_regex(pc.filter(values, mask), f"^(?:{pattern})$")
+    return pc.replace_with_mask(failed, mask, pc.invert(matched))
+
+
+def _validation_checks(generator, columns):
+    platform, key = columns["platform"], columns["stream_key"]
+    server, app = columns["server_url"], columns["app_name"]
+    has_key = pc.not_equal(key, "")
+    is_custom = pc.equal(platform, "custom")
+    known = pc.is_in(platform, value_set=pa.array(list(generator.platforms)))
+    # An unknown platform is the row's only error, as in KeyValidator.validate
+    checks = [(pc.and_(known, pc.invert(has_key)), "Missing stream key")]
+    if not pc.all(known).as_py():
+        checks.insert(0, (pc.invert(known), pc.binary_join_element_wise("Invalid platform: '", platform, "'", "")))
+    for name, pattern in generator.validator.patterns.items():
+        example = generator.platforms[name].get("example_key", "")
+        checks.append((
+            _mismatch(key, pattern.pattern, pc.and_(pc.equal(platform, name), has_key)),
+            f"Stream key doesn't look like a {name.capitalize()} key (expected e.g. {example})"
+        ))
+    has_server, has_app = pc.not_equal(server, ""), pc.not_equal(app, "")
+    checks += [
+        (pc.and_(is_custom, pc.invert(has_server)), "Custom platform requires a server URL"),
+        (_mismatch(server, SERVER_PATTERN, pc.and_(is_custom, has_server)),
+         "Server must be host or host:port, without rtmp:// or a path"),
+        (pc.and_(is_custom, pc.invert(has_app)), "Custom platform requires an application name"),
+        (_mismatch(app, APP_PATTERN, pc.and_(is_custom, has_app)),
+         "Application name must not contain spaces, '?' or '#'"),
+    ]
+    return checks
+
+
+def generate_table(table, generator):
+    """Return table with rtmp_url, server, app and error columns appended.
+
+    Input columns with those names (e.g. the "server" alias) are replaced.
+    """
+    length = table.num_rows
+    columns = {field: _column(table, field) for field in BATCH_FIELDS}
+    error = _errors(_validation_checks(generator, columns), length)
+    ok = pc.is_null(error)
+
+    outputs = {field: pa.nulls(length, pa.string()) for field in ("rtmp_url", "server", "app")}
+    for platform, builder in generator.builders.items():
+        mask = pc.and_(ok, pc.equal(columns["platform"], platform))
+        if not pc.any(mask).as_py():
+            continue
+        # The builder's template includes any endpoint override
+        server_template, app_template = split_template(builder.template)
+        for field, template in (("rtmp_url", builder.template), ("server", server_template), ("app", app_template)):
+            outputs[field] = pc.replace_with_mask(outputs[field], mask, _evaluate(template, columns, mask))
+
+    for field in OUTPUT_FIELDS:
+        if field in table.column_names:
+            table = table.drop_columns([field])
+    for field, values in outputs.items():
+        table = table.append_column(field, values)
+    return table.append_column("error", error)
+
+
+def generate_parquet(input_path, output_path, generator, batch_size=DEFAULT_BATCH_SIZE):
+    """Generate URLs for every row of a Parquet file into a new Parquet file; returns a summary"""
+    import pyarrow.parquet as pq
+
+    source = pq.ParquetFile(input_path)
+    writer = None
+    rows = errors = 0
+    platforms = {}
+    try:
+        for batch in source.iter_batches(batch_size=batch_size):
+            result = generate_table(pa.Table.from_batches([batch]), generator)
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, result.schema)
+            writer.write_table(result)
+
+            rows += result.num_rows
+            errors += result.num_rows - result["error"].null_count
+            for entry in pc.value_counts(_column(result, "platform")).to_pylist():
+                platforms[entry["values"]] = platforms.get(entry["values"], 0) + entry["counts"]
+        if writer is None:
+            pq.write_table(generate_table(source.schema_arrow.empty_table(), generator), output_path)
+    finally:
+        if writer is not None:
+            writer.close()
+    return {"rows": rows, "errors": errors, "platforms": platforms}
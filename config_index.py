@@ -0,0 +1,184 @@
+"""In-memory name/platform index for searching and paging saved configs.
+
+Built once from the store's (name, platform) listing and kept up to date
+incrementally: the index subscribes to its store, so saves and deletes made
+through it are applied directly instead of triggering a rescan. Changes
+made by other processes are picked up by sync(), which compares the
+store's version token and rebuilds only when it moved unexpectedly. An
+index built from_watcher() instead gets those changes from the watcher's
+filesystem events, one config at a time (see config_watch).
+"""
+import threading
+import time
+from bisect import bisect_left, insort
+from itertools import islice
+
+PREFIX = "prefix"
+SUBSTRING = "substring"
+
+
+class ConfigIndex:
+    def __init__(self, entries=()):
+        self._lock = threading.Lock()
+        self._platforms = {}
+        self._sorted = []
+        self._haystack = None
+        self._version = None
+        self._store = None
+        self._watcher = None
+        # time.monotonic() when the index last matched its store
+        self.synced_at = None
+        self._reset(entries)
+
+    @classmethod
+    def from_store(cls, store):
+        index = cls()
+        index.attach(store)
+        return index
+
+    @classmethod
+    def from_watcher(cls, watcher):
+        """Index a watched store from the watcher's cache instead of rescanning it"""
+        index = cls()
+        index._store = watcher.store
+        index._watcher = watcher
+        watcher.store.add_listener(index._on_store_event)
+        version = watcher.store.version()
+        entries = watcher.list_index()
+        with index._lock:
+            index._reset(entries)
+            index._version = version
+            index.synced_at = time.monotonic()
+        return index
+
+    def _reset(self, entries):
+        self._platforms = dict(entries)
+        # (lowercase name, name) so searches are case-insensitive but results
+        # keep their original spelling and a stable order
+        self._sorted = sorted((name.lower(), name) for name in self._platforms)
+        self._haystack = None
+        self._line_starts = []
+
+    def attach(self, store):
+        self._store = store
+        store.add_listener(self._on_store_event)
+        self.rebuild()
+
+    def rebuild(self):
+        version = self._store.version()
+        entries = self._store.list_index()
+        with self._lock:
+            self._reset(entries)
+            self._version = version
+            self.synced_at = time.monotonic()
+
+    def sync(self):
+        """Catch up with changes made behind the index's back; returns True if there were any"""
+        if self._store is None:
+            return False
+        if self._watcher is not None:
+            # Whatever the watcher has seen arrives here as store events
+            saved, deleted = self._watcher.apply()
+            self._version = self._store.version()
+            self.synced_at = time.monotonic()
+            return bool(saved or deleted)
+        if self._store.version() == self._version:
+            self.synced_at = time.monotonic()
+            return False
+        self.rebuild()
+        return True
+
+    def is_fresh(self):
+        """True if nothing changed the store since the index last caught up"""
+        return self._store is not None and self._store.version() == self._version
+
+    def _on_store_event(self, event, payload):
+        with self._lock:
+            if event == "save":
+                for config in payload:
+                    self._add(config["name"], config["platform"])
+            elif event == "delete":
+                self._remove(payload)
+            self._version = self._store.version()
+            self.synced_at = time.monotonic()
+
+    def _add(self, name, platform):
+        if name not in self._platforms:
+            insort(self._sorted, (name.lower(), name))
+            self._haystack = None
+        self._platforms[name] = platform
+
+    def _remove(self, name):
+        if self._platforms.pop(name, None) is None:
+            return
+        key = (name.lower(), name)
+        position = bisect_left(self._sorted, key)
+        if position < len(self._sorted) and self._sorted[position] == key:
+            del self._sorted[position]
+        self._haystack = None
+
+    def add(self, name, platform):
+        with self._lock:
+            self._add(name, platform)
+
+    def remove(self, name):
+        with self._lock:
+            self._remove(name)
+
+    def __len__(self):
+        return len(self._platforms)
+
+    def __contains__(self, name):
+        return name in self._platforms
+
+    def platform(self, name):
+        return self._platforms.get(name)
+
+    def _prefix_matches(self, query):
+        start = bisect_left(self._sorted, (query,))
+        for position in range(start, len(self._sorted)):
+            lowered, name = self._sorted[position]
+            if not lowered.startswith(query):
+                break
+            yield name
+
+    def _substring_matches(self, query):
+        # One newline-joined string of all names lets str.find do the
+        # scanning in C; it is rebuilt lazily after the index changes.
+        if self._haystack is None:
+            self._haystack = "\n".join(lowered.replace("\n", " ") for lowered, _ in self._sorted) + "\n"
+            self._line_starts = []
+            offset = 0
+            for lowered, _ in self._sorted:
+                self._line_starts.append(offset)
+                offset += len(lowered) + 1
+        haystack, starts = self._haystack, self._line_starts
+        position = haystack.find(query)
+        while position != -1:
+            row = bisect_left(starts, position + 1) - 1
+            yield self._sorted[row][1]
+            # Continue after this name so it is only reported once
+            position = haystack.find(query, starts[row] + len(self._sorted[row][0]) + 1)
+
+    def search(self, query="", platform=None, mode=SUBSTRING, limit=None):
+        """Names matching query (case-insensitive) and platform, in name order.
+
+        With limit, the scan stops after that many matches.
+        """
+        query = query.strip().lower()
+        with self._lock:
+            if not query:
+                names = (name for _, name in self._sorted)
+            elif mode == PREFIX:
+                names = self._prefix_matches(query)
+            else:
+                names = self._substring_matches(query)
+            if platform:
+                names = (name for name in names if self._platforms[name] == platform)
+            return list(islice(names, limit))
+
+    def page(self, query="", platform=None, mode=SUBSTRING, page=1, per_page=25):
+        """Return (entries, total) for one page of search results"""
+        names = self.search(query, platform, mode)
+        start = (max(page, 1) - 1) * per_page
+        return [(name, self._platforms.get(name, "")) for name in names[start:start + per_page]], len(names)
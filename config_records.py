@@ -0,0 +1,172 @@
+"""Compact, columnar in-memory representation of saved configs.
+
+A list of config dicts repeats every key and stores an rtmp_url string that
+is fully determined by the other fields. ConfigCollection keeps one column
+per field instead: platform, server and app name are interned into small
+integer codes held in arrays, and rtmp_url is only built when accessed.
+Indexing returns a ConfigRecord view that supports record["name"] like the
+dicts it replaces.
+
+server_url and app_name are kept exactly as saved (fixed platforms are
+usually saved with them empty), so to_dict() returns what was stored; the
+registry defaults are only used to build rtmp_url.
+"""
+from array import array
+
+from rtmp_core import PLATFORMS
+
+FIELDS = ("name", "platform", "stream_key", "server_url", "app_name", "rtmp_url")
+
+
+class _Interner:
+    __slots__ = ("values", "codes")
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class ConfigRecord:
+    """Read-only view of one row of a ConfigCollection"""
+
+    __slots__ = ("_collection", "_index")
+
+    def __init__(self, collection, index):
+        self._collection = collection
+        self._index = index
+
+    @property
+    def name(self):
+        return self._collection.names[self._index]
+
+    @property
+    def platform(self):
+        c = self._collection
+        return c._platforms.values[c.platform_codes[self._index]]
+
+    @property
+    def stream_key(self):
+        return self._collection.keys[self._index]
+
+    @property
+    def server_url(self):
+        c = self._collection
+        return c._servers.values[c.server_codes[self._index]]
+
+    @property
+    def app_name(self):
+        c = self._collection
+        return c._apps.values[c.app_codes[self._index]]
+
+    @property
+    def rtmp_url(self):
+        return self._collection.rtmp_url(self._index)
+
+    def __getitem__(self, field):
+        if field in FIELDS:
+            return getattr(self, field)
+        return self._collection.extras(self._index)[field]
+
+    def get(self, field, default=None):
+        try:
+            return self[field]
+        except KeyError:
+            return default
+
+    def to_dict(self):
+        config = {field: getattr(self, field) for field in FIELDS}
+        config.update(self._collection.extras(self._index))
+        return config
+
+    def __repr__(self):
+        return f"ConfigRecord({self.name!r}, {self.platform!r})"
+
+
+class ConfigCollection:
+    """Array-backed collection of saved configs"""
+
+    def __init__(self, configs=()):
+        self.names = []
+        self.keys = []
+        self.platform_codes = array('H')
+        self.server_codes = array('I')
+        self.app_codes = array('I')
+        self.extra_codes = array('I')
+        self._platforms = _Interner()
+        self._servers = _Interner()
+        self._apps = _Interner()
+        # Extra fields such as for_vmix are nearly always identical, so whole
+        # extra-field sets are interned; code 0 means "no extras".
+        self._extras = _Interner()
+        self._extras.code(())
+        # URLs that can't be rebuilt from the other fields (hand-edited files)
+        self._url_overrides = {}
+        self._unhashable_extras = {}
+        for config in configs:
+            self.append(config)
+
+    def append(self, config):
+        index = len(self.names)
+        self.names.append(config["name"])
+        self.keys.append(config.get("stream_key", ""))
+        self.platform_codes.append(self._platforms.code(config["platform"]))
+        self.server_codes.append(self._servers.code(config.get("server_url", "")))
+        self.app_codes.append(self._apps.code(config.get("app_name", "")))
+
+        extras = tuple(sorted(
+            ((k, v) for k, v in config.items() if k not in FIELDS),
+            key=lambda item: item[0]
+        ))
+        try:
+            self.extra_codes.append(self._extras.code(extras))
+        except TypeError:
+            # Unhashable extra values (lists, dicts) are rare; keep them per row
+            self.extra_codes.append(0)
+            self._unhashable_extras[index] = dict(extras)
+
+        rtmp_url = config.get("rtmp_url")
+        if rtmp_url is not None and rtmp_url != self.rtmp_url(index):
+            self._url_overrides[index] = rtmp_url
+
+    def rtmp_url(self, index):
+        override = self._url_overrides.get(index)
+        if override is not None:
+            return override
+        defaults = PLATFORMS.get(self._platforms.values[self.platform_codes[index]], {})
+        return (
+            "rtmp://" + (self._servers.values[self.server_codes[index]] or defaults.get("server", ""))
+            + "/" + (self._apps.values[self.app_codes[index]] or defaults.get("app_name", ""))
+            + "/" + self.keys[index]
+        )
+
+    def extras(self, index):
+        if index in self._unhashable_extras:
+            return dict(self._unhashable_extras[index])
+        return dict(self._extras.values[self.extra_codes[index]])
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.names)
+        if not 0 <= index < len(self.names):
+            raise IndexError(index)
+        return ConfigRecord(self, index)
+
+    def __iter__(self):
+        for index in range(len(self.names)):
+            yield ConfigRecord(self, index)
+
+    def platform_counts(self):
+        counts = [0] * len(self._platforms.values)
+        for code in self.platform_codes:
+            counts[code] += 1
+        return dict(zip(self._platforms.values, counts))
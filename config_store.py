@@ -0,0 +1,1079 @@
+#!/usr/bin/env python3
+"""Pluggable storage backends for saved RTMP configurations.
+
+The default backend keeps every config in a single SQLite file with a
+covering (name, platform) index, so listing saved configs never has to
+open or parse the per-config payloads. The original one-JSON-file-per-config
+layout is still available as the "json" backend, and is migrated into the
+SQLite store automatically the first time the database is created. The
+"journal" backend keeps an append-only log of mutations plus compacted
+snapshots, which makes a cold start one snapshot read and keeps the
+history of every config.
+
+Select a backend with CONFIG_BACKEND=sqlite|json|journal and a location with
+CONFIG_DIR (defaults to /app/configs). Setting CONFIG_PASSPHRASE encrypts
+stream keys at rest (see key_crypto).
+"""
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+from contextlib import contextmanager
+from pathlib import Path
+
+import metrics
+from key_crypto import SEALED_FIELD, get_cipher
+
+try:
+    import fcntl
+except ImportError:  # Windows: rely on atomic renames alone
+    fcntl = None
+
+DEFAULT_CONFIG_DIR = "/app/configs"
+DB_FILENAME = "configs.db"
+LOCK_FILENAME = ".lock"
+ROTATION_FILENAME = ".rotation"
+JOURNAL_DIRNAME = "journal"
+SEGMENT_PREFIX = "segment-"
+SNAPSHOT_PREFIX = "snapshot-"
+
+_queue_lock = threading.Lock()
+
+STORE_SECONDS = metrics.histogram(
+    "rtmp_config_store_seconds", "Config store operation latency", ("backend", "operation")
+)
+SAVED_CONFIGS = metrics.counter("rtmp_configs_saved_total", "Configs written to the store", ("backend",))
+SCAN_SIZE = metrics.histogram(
+    "rtmp_config_scan_size", "Configs visited by each full scan of the store", ("backend", "operation"),
+    buckets=metrics.SIZE_BUCKETS
+)
+
+
+class InvalidConfigName(ValueError):
+    """A config name that can't be stored safely"""
+
+
+def check_name(name):
+    """Raise InvalidConfigName unless name is safe to use as a file name.
+
+    The json backend joins names into paths, so separators, NUL and a
+    leading dot (".." or a hidden file) are refused by every backend alike.
+    """
+    if name is None or name == "":
+        raise InvalidConfigName("Missing configuration name")
+    if not isinstance(name, str):
+        raise InvalidConfigName(f"Configuration name must be a string, not {type(name).__name__}")
+    if "/" in name or "\\" in name or "\0" in name or name.startswith("."):
+        raise InvalidConfigName(f"Invalid configuration name {name!r}: no '/', '\\', NUL or leading '.'")
+    return name
+
+
+def get_config_dir():
+    return Path(os.environ.get("CONFIG_DIR", DEFAULT_CONFIG_DIR))
+
+
+class WriteBehindQueue:
+    """Group-commit queue: saves arriving close together share one batched write.
+
+    Callers get a Future per config. A single writer thread takes whatever
+    is queued (up to max_batch, optionally waiting max_delay for stragglers),
+    keeps only the last save per name and hands the batch to `flush`. Saves
+    that arrive while a batch is being written form the next batch, so a
+    burst costs one lock acquisition and directory sync instead of one per
+    config, without delaying a lone save.
+    """
+
+    def __init__(self, flush, max_batch=500, max_delay=0.0):
+        self._flush = flush
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="config-write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.drain)
+
+    def submit(self, config):
+        future = Future()
+        self._queue.put((config, future))
+        return future
+
+    def drain(self):
+        """Block until everything submitted so far has been written"""
+        self.submit(None).result()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        batch.append(self._queue.get(timeout=remaining))
+                    else:
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            latest = {}
+            for config, _ in batch:
+                if config is not None:
+                    latest[config["name"]] = config
+            try:
+                if latest:
+                    self._flush(list(latest.values()))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for _, future in batch:
+                    future.set_result(None)
+
+
+class ConfigStore:
+    """Interface shared by all config storage backends"""
+
+    backend = None
+    _write_queue = None
+    _cipher = None
+
+    def save(self, config, wait=True):
+        """Queue config for the next batched write; by default wait until it is durable"""
+        check_name(config.get("name"))
+        if self._write_queue is None:
+            with _queue_lock:
+                if self._write_queue is None:
+                    self._write_queue = WriteBehindQueue(self.save_many)
+        future = self._write_queue.submit(config)
+        if wait:
+            future.result()
+        return self.location(config["name"])
+
+    def flush(self):
+        if self._write_queue is not None:
+            self._write_queue.drain()
+
+    def add_listener(self, callback):
+        """Call callback(event, payload) after writes made through this store.
+
+        Events are ("save", [configs]) and ("delete", name).
+        """
+        if "_listeners" not in self.__dict__:
+            self._listeners = []
+        self._listeners.append(callback)
+
+    def _notify(self, event, payload):
+        for callback in self.__dict__.get("_listeners", ()):
+            callback(event, payload)
+
+    def save_many(self, configs):
+        """Write configs in one batch and return how many were written"""
+        for config in configs:
+            check_name(config.get("name"))
+        with STORE_SECONDS.time(self.backend, "save_many"):
+            written = self._write_many(configs)
+        SAVED_CONFIGS.inc(self.backend, amount=written)
+        self._notify("save", configs)
+        return written
+
+    def save_rotation(self, configs):
+        """Write configs with rotated keys as one all-or-nothing batch"""
+        for config in configs:
+            check_name(config.get("name"))
+        with STORE_SECONDS.time(self.backend, "save_rotation"):
+            written = self._write_rotation(configs)
+        SAVED_CONFIGS.inc(self.backend, amount=written)
+        self._notify("save", configs)
+        return written
+
+    def _write_rotation(self, configs):
+        # One SQLite transaction or one journal record is already
+        # all-or-nothing; the json backend overrides this
+        return self._write_many(configs)
+
+    def delete(self, name):
+        deleted = self._delete(name)
+        if deleted:
+            self._notify("delete", name)
+        return deleted
+
+    def rename(self, old, new):
+        """Give a config a new name; returns False if old doesn't exist"""
+        config = self.load(old)
+        if config is None:
+            return False
+        if self.load(new) is not None:
+            raise ValueError(f"A config named {new!r} already exists")
+        config["name"] = new
+        self.save_many([config])
+        self.delete(old)
+        return True
+
+    def _seal_many(self, configs):
+        if self._cipher is None:
+            return configs
+        return self._cipher.seal_many(configs)
+
+    def _open(self, config):
+        """Decrypt a config as read from storage"""
+        if self._cipher is not None:
+            return self._cipher.open(config)
+        if SEALED_FIELD in config:
+            raise ValueError(f"Config {config['name']!r} is encrypted; set CONFIG_PASSPHRASE to read it")
+        return config
+
+    def _write_many(self, configs):
+        raise NotImplementedError
+
+    def _delete(self, name):
+        raise NotImplementedError
+
+    def location(self, name):
+        raise NotImplementedError
+
+    def load(self, name):
+        with STORE_SECONDS.time(self.backend, "load"):
+            return self._load(name)
+
+    def load_all(self):
+        with STORE_SECONDS.time(self.backend, "load_all"):
+            configs = self._load_all()
+        SCAN_SIZE.observe(len(configs), self.backend, "load_all")
+        return configs
+
+    def iter_all(self):
+        """Yield every saved config without materialising the full list"""
+        # Only the scan size: the time between items is the caller's
+        scanned = 0
+        for config in self._iter_all():
+            scanned += 1
+            yield config
+        SCAN_SIZE.observe(scanned, self.backend, "iter_all")
+
+    def list_index(self):
+        """Return (name, platform) pairs for every saved config, sorted by name"""
+        with STORE_SECONDS.time(self.backend, "list_index"):
+            entries = self._list_index()
+        SCAN_SIZE.observe(len(entries), self.backend, "list_index")
+        return entries
+
+    def _load(self, name):
+        raise NotImplementedError
+
+    def _load_all(self):
+        return list(self._iter_all())
+
+    def _iter_all(self):
+        raise NotImplementedError
+
+    def _list_index(self):
+        raise NotImplementedError
+
+    def count(self):
+        return len(self.list_index())
+
+    def version(self):
+        """Cheap token that changes whenever the saved configs change"""
+        raise NotImplementedError
+
+    def ping(self):
+        """Cheapest check that the store can be read and written; raises on failure"""
+        raise NotImplementedError
+
+
+class JSONConfigStore(ConfigStore):
+    """Legacy layout: one {name}.json file per config.
+
+    Files are written to a temporary name and renamed into place while
+    holding an exclusive lock on the directory's .lock file, so readers in
+    any process only ever see complete files and concurrent writers in the
+    web and CLI containers don't interleave.
+
+    A save_rotation() also writes a .rotation manifest of its renames
+    before making any, and whoever next opens, writes or scans the
+    directory finishes a rotation that a crash interrupted. load_all() and
+    list_index() hold the lock shared, so they see a rotation wholly or not
+    at all. load() and iter_all() read file by file and are only atomic per
+    config.
+    """
+
+    backend = "json"
+
+    def __init__(self, config_dir=None, cipher=None):
+        self.config_dir = Path(config_dir) if config_dir else get_config_dir()
+        self._cipher = cipher
+        self._recover()
+
+    def _path(self, name):
+        return self.config_dir / f"{check_name(name)}.json"
+
+    def location(self, name):
+        return self._path(name)
+
+    def _stage(self, configs):
+        """Write every config to a temporary file; returns (tmp_path, path) pairs.
+
+        Every file is written before any is renamed into place, so a failed
+        write (a full disk, say) leaves the batch unapplied.
+        """
+        staged = []
+        # One file per name: a later duplicate in the batch wins
+        latest = list({config["name"]: config for config in configs}.values())
+        try:
+            for config in self._seal_many(latest):
+                path = self._path(config["name"])
+                staged.append((_staged_write(path, json.dumps(config, indent=2)), path))
+        except BaseException:
+            for tmp_path, _ in staged:
+                tmp_path.unlink(missing_ok=True)
+            raise
+        return staged
+
+    def _write_many(self, configs):
+        self.config_dir.mkdir(parents=True, exist_ok=True)
+        with _locked(self.config_dir / LOCK_FILENAME):
+            self._roll_forward()
+            for tmp_path, path in self._stage(configs):
+                os.replace(tmp_path, path)
+            _fsync_dir(self.config_dir)
+        return len(configs)
+
+    def _write_rotation(self, configs):
+        self.config_dir.mkdir(parents=True, exist_ok=True)
+        manifest = self.config_dir / ROTATION_FILENAME
+        with _locked(self.config_dir / LOCK_FILENAME):
+            self._roll_forward()
+            staged = self._stage(configs)
+            try:
+                renames = [[tmp_path.name, path.name] for tmp_path, path in staged]
+                os.replace(_staged_write(manifest, json.dumps(renames)), manifest)
+            except BaseException:
+                for tmp_path, _ in staged:
+                    tmp_path.unlink(missing_ok=True)
+                raise
+            _fsync_dir(self.config_dir)
+            # From here the rotation is committed: a crash is finished by _roll_forward()
+            self._roll_forward()
+        return len(configs)
+
+    def _roll_forward(self):
+        """Finish the renames of an interrupted rotation; call with the lock held"""
+        manifest = self.config_dir / ROTATION_FILENAME
+        try:
+            with open(manifest, 'r') as f:
+                renames = json.load(f)
+        except FileNotFoundError:
+            return
+        for tmp_name, filename in renames:
+            try:
+                os.replace(self.config_dir / tmp_name, self.config_dir / filename)
+            except FileNotFoundError:
+                # Renamed before the crash
+                pass
+        _fsync_dir(self.config_dir)
+        manifest.unlink()
+        _fsync_dir(self.config_dir)
+
+    def _recover(self):
+        if (self.config_dir / ROTATION_FILENAME).exists():
+            with _locked(self.config_dir / LOCK_FILENAME):
+                self._roll_forward()
+
+    @contextmanager
+    def _consistent(self):
+        """Hold the lock shared so no rotation is half applied while reading"""
+        self._recover()
+        with _locked(self.config_dir / LOCK_FILENAME, shared=True):
+            yield
+
+    def _load(self, name):
+        try:
+            with open(self._path(name), 'r') as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            return None
+        return self._open(config)
+
+    def _load_all(self):
+        if not self.config_dir.exists():
+            return []
+        with self._consistent():
+            stored = list(self._iter_stored())
+        return [self._open(config) for config in stored]
+
+    def _iter_all(self):
+        # Not under the lock: callers may save while iterating
+        self._recover()
+        for config in self._iter_stored():
+            yield self._open(config)
+
+    def _iter_stored(self):
+        if not self.config_dir.exists():
+            return
+        for config_file in sorted(self.config_dir.glob("*.json")):
+            try:
+                with open(config_file, 'r') as f:
+                    yield json.load(f)
+            except FileNotFoundError:
+                # Deleted between listing and reading
+                pass
+
+    def _list_index(self):
+        if not self.config_dir.exists():
+            return []
+        # Names and platforms are never encrypted
+        with self._consistent():
+            return [(c["name"], c["platform"]) for c in self._iter_stored()]
+
+    def _delete(self, name):
+        with _locked(self.config_dir / LOCK_FILENAME):
+            self._roll_forward()
+            try:
+                self._path(name).unlink()
+                return True
+            except FileNotFoundError:
+                return False
+
+    def version(self):
+        # Every save renames a file into place and every delete unlinks one,
+        # both of which move the directory mtime.
+        return _stat_token(self.config_dir)
+
+    def ping(self):
+        # The directory is created on first save, so its parent must do
+        directory = self.config_dir if self.config_dir.exists() else self.config_dir.parent
+        if not os.access(directory, os.W_OK | os.X_OK):
+            raise PermissionError(f"{directory} is not writable")
+
+
+class SQLiteConfigStore(ConfigStore):
+    """All configs in one SQLite file, listed through a covering index"""
+
+    backend = "sqlite"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS configs (
+            name TEXT PRIMARY KEY,
+            platform TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS configs_listing ON configs (name, platform);
+    """
+
+    def __init__(self, config_dir=None, db_path=None, migrate=True, cipher=None):
+        self.config_dir = Path(config_dir) if config_dir else get_config_dir()
+        self._cipher = cipher
+        self.db_path = Path(db_path) if db_path else self.config_dir / DB_FILENAME
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        is_new = not self.db_path.exists()
+
+        # Streamlit reruns the script on worker threads, so one connection is
+        # shared behind a lock rather than tied to the creating thread.
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+
+        if is_new and migrate:
+            migrate_json_configs(self.config_dir, self)
+
+    def location(self, name):
+        return self.db_path
+
+    def _write_many(self, configs):
+        rows = [
+            (c["name"], c["platform"], json.dumps(c), time.time())
+            for c in self._seal_many(configs)
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO configs (name, platform, payload, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    def _load(self, name):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM configs WHERE name = ?", (name,)
+            ).fetchone()
+        return self._open(json.loads(row[0])) if row else None
+
+    def _load_all(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT payload FROM configs ORDER BY name").fetchall()
+        return [self._open(json.loads(row[0])) for row in rows]
+
+    def _iter_all(self, chunk_size=1000):
+        # Pages through the primary key so the shared connection isn't held
+        # for the whole iteration and only one chunk of payloads is in memory
+        last = None
+        while True:
+            with self._lock:
+                if last is None:
+                    rows = self._conn.execute(
+                        "SELECT name, payload FROM configs ORDER BY name LIMIT ?", (chunk_size,)
+                    ).fetchall()
+                else:
+                    rows = self._conn.execute(
+                        "SELECT name, payload FROM configs WHERE name > ? ORDER BY name LIMIT ?",
+                        (last, chunk_size)
+                    ).fetchall()
+            if not rows:
+                return
+            for _, payload in rows:
+                yield self._open(json.loads(payload))
+            last = rows[-1][0]
+
+    def _list_index(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT name, platform FROM configs INDEXED BY configs_listing ORDER BY name"
+            ).fetchall()
+
+    def _delete(self, name):
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM configs WHERE name = ?", (name,))
+        return cursor.rowcount > 0
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM configs").fetchone()[0]
+
+    def version(self):
+        # In WAL mode commits land in the -wal file and only reach the main
+        # database at checkpoint time, so both files are part of the token.
+        wal_path = self.db_path.with_name(self.db_path.name + "-wal")
+        return _stat_token(self.db_path), _stat_token(wal_path)
+
+    def ping(self):
+        with self._lock:
+            self._conn.execute("SELECT 1 FROM configs LIMIT 1").fetchall()
+        if not os.access(self.db_path, os.W_OK):
+            raise PermissionError(f"{self.db_path} is not writable")
+
+    def close(self):
+        self._conn.close()
+
+
+class JournalCorruptError(ValueError):
+    """A journal record failed its checksum somewhere other than the torn tail"""
+
+
+class JournalConfigStore(ConfigStore):
+    """Append-only log of config mutations, compacted into snapshots.
+
+    Every write appends one record to the newest segment in
+    {config_dir}/journal/: a save or rotate of a batch of configs, a delete
+    or a rename. One record per batch makes each batch all-or-nothing. Each
+    record is a line of "crc32 json". The whole config set is held in
+    memory. Opening the store reads the newest snapshot and replays the
+    records after it. Once the tail grows past half the snapshot (and
+    COMPACT_MIN_BYTES), the writer snapshots the current state and starts a
+    new segment, so a cold start reads one snapshot plus a short tail.
+
+    Older segments are kept as history (see history()) until
+    HISTORY_SEGMENTS newer ones exist. Other processes' writes are picked
+    up before every read by replaying the bytes appended since. Writers
+    serialize on the same .lock file as the json backend. A crash can only
+    leave a torn final record, which the next writer truncates away.
+    """
+
+    backend = "journal"
+
+    COMPACT_MIN_BYTES = 4 * 1024 * 1024
+    HISTORY_SEGMENTS = 8
+
+    def __init__(self, config_dir=None, migrate=True, cipher=None, compact_min_bytes=None):
+        self.config_dir = Path(config_dir) if config_dir else get_config_dir()
+        self._cipher = cipher
+        self.journal_dir = self.config_dir / JOURNAL_DIRNAME
+        if compact_min_bytes is not None:
+            self.COMPACT_MIN_BYTES = compact_min_bytes
+        is_new = not self.journal_dir.exists()
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._configs = {}
+        self._seq = 0
+        self._snapshot_bytes = 0
+        self._segment = None
+        self._offset = 0
+        self._seen = None
+        with self._lock:
+            self._reload()
+
+        if is_new and migrate:
+            migrate_into_journal(self.config_dir, self)
+
+    # Reading the journal
+
+    def _segments(self):
+        return sorted(self.journal_dir.glob(f"{SEGMENT_PREFIX}*.log"))
+
+    def _snapshots(self):
+        return sorted(self.journal_dir.glob(f"{SNAPSHOT_PREFIX}*.json"), reverse=True)
+
+    def _reload(self, repair=False):
+        """Rebuild the in-memory state from the newest snapshot and the records after it"""
+        self._configs, self._seq, self._snapshot_bytes = {}, 0, 0
+        for path in self._snapshots():
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                snapshot = json.loads(data)
+            except (FileNotFoundError, ValueError):
+                # Pruned meanwhile, or damaged; an older snapshot plus more journal works too
+                continue
+            self._configs = {config["name"]: config for config in snapshot["configs"]}
+            self._seq = snapshot["seq"]
+            self._snapshot_bytes = len(data)
+            break
+
+        # Replay from the segment holding the first record after the snapshot
+        segments = self._segments()
+        start = [path for path in segments if _first_seq(path) <= self._seq + 1]
+        self._segment = start[-1] if start else (segments[0] if segments else None)
+        self._offset = 0
+        if self._segment is not None and _first_seq(self._segment) > self._seq + 1:
+            raise JournalCorruptError(
+                f"Journal in {self.journal_dir} has no records {self._seq + 1}-{_first_seq(self._segment) - 1}"
+            )
+        self._replay(repair)
+
+    def _replay(self, repair=False):
+        """Apply records appended since the last read; with repair, truncate a torn tail"""
+        if self._segment is None:
+            segments = self._segments()
+            if not segments:
+                self._seen = self.version()
+                return
+            self._segment, self._offset = segments[0], 0
+        while True:
+            # Taken before reading, so anything appended meanwhile is read next time
+            self._seen = self.version()
+            try:
+                with open(self._segment, 'rb') as f:
+                    f.seek(self._offset)
+                    data = f.read()
+            except FileNotFoundError:
+                # Pruned by another process's compaction: start over from its snapshot
+                return self._reload(repair)
+
+            position = 0
+            while True:
+                end = data.find(b"\n", position)
+                if end == -1:
+                    break
+                record = _decode_record(data[position:end])
+                if record is None:
+                    if _decode_tail(data[end + 1:]):
+                        raise JournalCorruptError(
+                            f"Damaged record in {self._segment} at byte {self._offset + position}"
+                        )
+                    break
+                if record["seq"] > self._seq:
+                    self._apply(record)
+                position = end + 1
+            self._offset += position
+
+            torn = position < len(data)
+            if torn:
+                if not repair:
+                    # Another process may be mid-append; read it next time
+                    return
+                with open(self._segment, 'r+b') as f:
+                    f.truncate(self._offset)
+                    f.flush()
+                    os.fsync(f.fileno())
+            later = [path for path in self._segments() if path > self._segment]
+            if not later:
+                return
+            self._segment, self._offset = later[0], 0
+
+    def _apply(self, record):
+        op = record["op"]
+        if op in ("save", "rotate"):
+            for config in record["configs"]:
+                self._configs[config["name"]] = config
+        elif op == "delete":
+            self._configs.pop(record["name"], None)
+        elif op == "rename":
+            self._configs.pop(record["from"], None)
+            self._configs[record["config"]["name"]] = record["config"]
+        else:
+            raise JournalCorruptError(f"Unknown journal operation {op!r}")
+        self._seq = record["seq"]
+
+    def _refresh(self):
+        if self.version() != self._seen:
+            self._replay()
+
+    # Writing the journal
+
+    @contextmanager
+    def _writing(self):
+        """Hold both locks with the state caught up to the end of the journal"""
+        with self._lock, _locked(self.config_dir / LOCK_FILENAME):
+            self._replay(repair=True)
+            yield
+
+    def _append(self, op, **fields):
+        record = dict(seq=self._seq + 1, at=time.time(), op=op, **fields)
+        if self._segment is None:
+            self._segment = self.journal_dir / _segment_name(record["seq"])
+            self._offset = 0
+        line = _encode_record(record)
+        fd = os.open(self._segment, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            written = os.write(fd, line)
+            if written != len(line):
+                raise OSError(f"Short write to {self._segment}")
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        if self._offset == 0:
+            _fsync_dir(self.journal_dir)
+        self._offset += len(line)
+        self._apply(record)
+        if self._offset > max(self.COMPACT_MIN_BYTES, self._snapshot_bytes // 2):
+            self._compact()
+        self._seen = self.version()
+        return record
+
+    def _write_many(self, configs, op="save"):
+        if self._cipher is None:
+            stored = [dict(config) for config in configs]
+        else:
+            stored = self._seal_many(configs)
+        with self._writing():
+            self._append(op, configs=stored)
+        return len(stored)
+
+    def _write_rotation(self, configs):
+        return self._write_many(configs, op="rotate")
+
+    def _delete(self, name):
+        with self._writing():
+            if name not in self._configs:
+                return False
+            self._append("delete", name=name)
+        return True
+
+    def rename(self, old, new):
+        """Rename a config in one journal record; returns False if old doesn't exist"""
+        check_name(new)
+        with self._writing():
+            if old not in self._configs:
+                return False
+            if new in self._configs:
+                raise ValueError(f"A config named {new!r} already exists")
+            config = self._open(dict(self._configs[old]))
+            config["name"] = new
+            # Sealed secrets are bound to the config name, so seal again
+            stored = self._seal_many([config])[0] if self._cipher else config
+            self._append("rename", config=stored, **{"from": old})
+        self._notify("delete", old)
+        self._notify("save", [config])
+        return True
+
+    def compact(self):
+        """Snapshot the current state now and start a new segment"""
+        with self._writing():
+            self._compact()
+
+    def _compact(self):
+        snapshot = json.dumps(
+            {"seq": self._seq, "at": time.time(), "configs": list(self._configs.values())},
+            separators=(",", ":")
+        ).encode()
+        path = self.journal_dir / f"{SNAPSHOT_PREFIX}{self._seq:012d}.json"
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(snapshot)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        # The next record starts a new segment. It is created empty now so
+        # other processes find it next to the snapshot.
+        self._segment = self.journal_dir / _segment_name(self._seq + 1)
+        self._segment.touch()
+        self._offset = 0
+        self._snapshot_bytes = len(snapshot)
+        _fsync_dir(self.journal_dir)
+
+        # The previous snapshot stays as a fallback; its records are still in
+        # the retained segments
+        for old in self._snapshots()[2:]:
+            old.unlink(missing_ok=True)
+        covered = [segment for segment in self._segments() if _first_seq(segment) <= self._seq]
+        for old in covered[:max(len(covered) - self.HISTORY_SEGMENTS, 0)]:
+            old.unlink(missing_ok=True)
+        for stale in self.journal_dir.glob(".*.tmp"):
+            if stale != tmp_path:
+                stale.unlink(missing_ok=True)
+
+    # ConfigStore interface
+
+    def location(self, name):
+        return self.journal_dir
+
+    def _load(self, name):
+        with self._lock:
+            self._refresh()
+            config = self._configs.get(name)
+        # Copies, so callers can't change the held state
+        return self._open(dict(config)) if config is not None else None
+
+    def _load_all(self):
+        with self._lock:
+            self._refresh()
+            configs = [self._configs[name] for name in sorted(self._configs)]
+        return [self._open(dict(config)) for config in configs]
+
+    def _iter_all(self):
+        return iter(self._load_all())
+
+    def _list_index(self):
+        with self._lock:
+            self._refresh()
+            return [(name, self._configs[name]["platform"]) for name in sorted(self._configs)]
+
+    def count(self):
+        with self._lock:
+            self._refresh()
+            return len(self._configs)
+
+    def history(self, name):
+        """Every retained journal record touching name, oldest first.
+
+        Returns dicts with seq, at (a Unix time), op and config (None for a
+        delete, or a rename away from name).
+        """
+        entries = []
+        for segment in self._segments():
+            try:
+                with open(segment, 'rb') as f:
+                    lines = f.read().split(b"\n")
+            except FileNotFoundError:
+                continue
+            for line in lines:
+                record = _decode_record(line) if line else None
+                if record is None:
+                    continue
+                op = record["op"]
+                if op in ("save", "rotate"):
+                    configs = [config for config in record["configs"] if config["name"] == name]
+                elif op == "delete":
+                    configs = [None] if record["name"] == name else []
+                else:
+                    configs = (
+                        [record["config"]] if record["config"]["name"] == name
+                        else [None] if record["from"] == name else []
+                    )
+                for config in configs:
+                    entries.append({
+                        "seq": record["seq"],
+                        "at": record["at"],
+                        "op": op,
+                        "config": self._open(dict(config)) if config is not None else None
+                    })
+        return entries
+
+    def version(self):
+        # New segments and snapshots move the directory mtime; appends grow
+        # the newest segment this store has read up to
+        segment_token = _stat_token(self._segment) if self._segment is not None else None
+        return _stat_token(self.journal_dir), segment_token
+
+    def ping(self):
+        with self._lock:
+            self._refresh()
+        if not os.access(self.journal_dir, os.W_OK | os.X_OK):
+            raise PermissionError(f"{self.journal_dir} is not writable")
+
+
+def _segment_name(first_seq):
+    return f"{SEGMENT_PREFIX}{first_seq:012d}.log"
+
+
+def _first_seq(path):
+    return int(path.stem[len(SEGMENT_PREFIX):])
+
+
+def _encode_record(record):
+    payload = json.dumps(record, separators=(",", ":")).encode()
+    return b"%08x %s\n" % (zlib.crc32(payload), payload)
+
+
+def _decode_record(line):
+    """The record in one journal line, or None if it is torn or damaged"""
+    if len(line) < 10 or line[8:9] != b" ":
+        return None
+    payload = line[9:]
+    try:
+        if int(line[:8], 16) != zlib.crc32(payload):
+            return None
+        return json.loads(payload)
+    except ValueError:
+        return None
+
+
+def _decode_tail(data):
+    """True if data, the bytes after a bad line, still hold an intact record"""
+    return any(_decode_record(line) is not None for line in data.split(b"\n") if line)
+
+
+def _stat_token(path):
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _staged_write(path, text):
+    """Durably write text next to path, returning the temporary path to rename into place"""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return tmp_path
+
+
+
+def _fsync_dir(path):
+    # Makes the renames themselves durable; one call covers the whole batch
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def _locked(lock_path, shared=False):
+    """Advisory lock on the config dir, exclusive for writers, shared by every process"""
+    if fcntl is None:
+        yield
+        return
+    with open(lock_path, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+BACKENDS = {
+    "sqlite": SQLiteConfigStore,
+    "json": JSONConfigStore,
+    "journal": JournalConfigStore,
+}
+
+
+def get_config_store(backend=None, config_dir=None, passphrase=None, **options):
+    """Open a backend with the CONFIG_PASSPHRASE cipher; options go to its constructor"""
+    backend = backend or os.environ.get("CONFIG_BACKEND", "sqlite")
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown config backend: {backend}")
+    config_dir = Path(config_dir) if config_dir else get_config_dir()
+    passphrase = passphrase or os.environ.get("CONFIG_PASSPHRASE")
+    cipher = get_cipher(passphrase, config_dir) if passphrase else None
+    return BACKENDS[backend](config_dir, cipher=cipher, **options)
+
+
+def migrate_json_configs(config_dir, store):
+    """Import legacy {name}.json files into store, skipping ones it already has"""
+    legacy = JSONConfigStore(config_dir, cipher=store._cipher)
+    existing = {name for name, _ in store.list_index()}
+    configs = []
+    for config in legacy.load_all():
+        if config.get("name") and config["name"] not in existing:
+            configs.append(config)
+    if not configs:
+        return 0
+    return store.save_many(configs)
+
+
+def migrate_into_journal(config_dir, store, batch_size=10_000):
+    """Import an existing SQLite database, or else legacy {name}.json files, into a new journal"""
+    config_dir = Path(config_dir)
+    if not (config_dir / DB_FILENAME).exists():
+        return migrate_json_configs(config_dir, store)
+    source = SQLiteConfigStore(config_dir, migrate=False, cipher=store._cipher)
+    migrated = 0
+    batch = []
+    try:
+        for config in source.iter_all():
+            batch.append(config)
+            if len(batch) >= batch_size:
+                migrated += store.save_many(batch)
+                batch = []
+        if batch:
+            migrated += store.save_many(batch)
+    finally:
+        source.close()
+    return migrated
+
+
+def encrypt_configs(store, batch_size=1000):
+    """Re-save every config so any still stored in plaintext get sealed"""
+    written = 0
+    batch = []
+    for config in store.iter_all():
+        batch.append(config)
+        if len(batch) >= batch_size:
+            written += store.save_many(batch)
+            batch = []
+    if batch:
+        written += store.save_many(batch)
+    return written
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("migrate", "encrypt", "compact"):
+        print("Usage: python config_store.py migrate|encrypt|compact [config_dir]")
+        sys.exit(1)
+
+    config_dir = Path(sys.argv[2]) if len(sys.argv) > 2 else get_config_dir()
+    if sys.argv[1] == "compact":
+        store = get_config_store("journal", config_dir)
+        store.compact()
+        print(f"✅ Compacted {store.count()} configuration(s) into a snapshot in {store.journal_dir}")
+        return
+    if sys.argv[1] == "encrypt":
+        if not os.environ.get("CONFIG_PASSPHRASE"):
+            print("❌ Set CONFIG_PASSPHRASE to encrypt stream keys")
+            sys.exit(1)
+        store = get_config_store(config_dir=config_dir)
+        encrypted = encrypt_configs(store)
+        print(f"✅ Encrypted {encrypted} configuration(s) in {store.config_dir}")
+        return
+
+    # Through get_config_store so CONFIG_PASSPHRASE encrypts the migrated keys
+    store = get_config_store("sqlite", config_dir, migrate=False)
+    migrated = migrate_json_configs(config_dir, store)
+    print(f"✅ Migrated {migrated} configuration(s) into {store.db_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""Keep a JSON config directory loaded, reparsing only the files that change.
+
+The "json" backend stores one {name}.json per config, so listing or
+loading every config means opening and parsing the whole directory.
+ConfigWatcher does that once and then follows the directory with watchdog.
+Created, modified and deleted files are collected and applied together
+after a short quiet period, so a batch save or a `git checkout` of the
+volume costs one pass over the files that actually changed. Each file's
+(inode, mtime, size) is remembered when it is parsed. An event for a file
+that still matches is skipped. That covers the events for writes made
+through the watched store, whose configs are cached from the save itself.
+
+Changes found on disk are announced to the store's listeners as ordinary
+"save" and "delete" events. A ConfigIndex attached to the same store
+therefore stays current without rebuilding.
+
+The SQLite backend lists configs from a covering index and never parses
+payloads to do so, so watch() only applies to the json backend.
+"""
+import os
+import threading
+import time
+
+import metrics
+
+DEFAULT_DEBOUNCE = 0.25
+# A directory that never goes quiet is still applied at least this often
+MAX_DEBOUNCE = 2.0
+SUFFIX = ".json"
+
+REPARSED = metrics.counter(
+    "rtmp_config_watch_reparsed_total", "Config files reparsed after filesystem events", ("result",)
+)
+
+
+def _file_token(path):
+    # Atomic saves rename a new inode into place, so the inode changes even
+    # when mtime and size happen to match
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class ConfigWatcher:
+    def __init__(self, store, debounce=DEFAULT_DEBOUNCE, max_debounce=MAX_DEBOUNCE):
+        self.store = store
+        self.config_dir = store.config_dir
+        self.debounce = debounce
+        self.max_debounce = max_debounce
+        self._lock = threading.Lock()
+        self._configs = {}
+        self._tokens = {}
+        self._pending = set()
+        self._pending_since = None
+        self._timer = None
+        self._observer = None
+        store.add_listener(self._on_store_event)
+
+    def _name(self, path):
+        # Temporary files from atomic saves end in .tmp and are ignored
+        filename = os.path.basename(path)
+        if filename.endswith(SUFFIX) and len(filename) > len(SUFFIX):
+            return filename[:-len(SUFFIX)]
+        return None
+
+    def load(self):
+        """Parse every config file once; returns how many were loaded"""
+        configs, tokens = {}, {}
+        if self.config_dir.exists():
+            for path in sorted(self.config_dir.glob(f"*{SUFFIX}")):
+                name = path.name[:-len(SUFFIX)]
+                # Stat before reading: a file replaced in between keeps the
+                # older token and is reparsed when its event arrives
+                token = _file_token(path)
+                try:
+                    config = self.store.load(name)
+                except ValueError:
+                    # Half-written by an editor; its next event retries it
+                    continue
+                if token is not None and config is not None:
+                    configs[name], tokens[name] = config, token
+        with self._lock:
+            self._configs, self._tokens = configs, tokens
+        return len(configs)
+
+    def start(self):
+        """Load the directory and follow it; raises ImportError without watchdog"""
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory or event.event_type in ("opened", "closed_no_write"):
+                    return
+                watcher.changed(event.src_path, getattr(event, "dest_path", "") or "")
+
+        self.config_dir.mkdir(parents=True, exist_ok=True)
+        # Watch first so nothing written during the initial load is missed
+        self._observer = Observer()
+        self._observer.daemon = True
+        self._observer.schedule(Handler(), str(self.config_dir), recursive=False)
+        self._observer.start()
+        self.load()
+        return self
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def changed(self, *paths):
+        """Record filesystem paths that changed and apply them once the directory goes quiet"""
+        names = {name for name in map(self._name, paths) if name}
+        if not names:
+            return
+        with self._lock:
+            self._pending |= names
+            now = time.monotonic()
+            if self._pending_since is None:
+                self._pending_since = now
+            if self._timer is not None:
+                # Restart the quiet period, unless changes have waited long enough
+                if now - self._pending_since >= self.max_debounce:
+                    return
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self.apply)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def apply(self):
+        """Reparse the pending files now; returns (saved names, deleted names)"""
+        with self._lock:
+            names, self._pending = self._pending, set()
+            self._pending_since = None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        saved, deleted = [], []
+        for name in sorted(names):
+            path = self.store.location(name)
+            token = _file_token(path)
+            if token is not None and token == self._tokens.get(name):
+                REPARSED.inc("unchanged")
+                continue
+            try:
+                config = self.store.load(name) if token is not None else None
+            except ValueError:
+                REPARSED.inc("invalid")
+                continue
+            with self._lock:
+                if config is None:
+                    if self._configs.pop(name, None) is not None:
+                        self._tokens.pop(name, None)
+                        deleted.append(name)
+                    continue
+                self._configs[name] = config
+                self._tokens[name] = token
+            REPARSED.inc("parsed")
+            saved.append(config)
+
+        if saved:
+            self.store._notify("save", saved)
+        for name in deleted:
+            self.store._notify("delete", name)
+        return [config["name"] for config in saved], deleted
+
+    def _on_store_event(self, event, payload):
+        # Writes through the store are cached as written; their file events
+        # then find a matching token and are skipped
+        with self._lock:
+            if event == "save":
+                for config in payload:
+                    name = config["name"]
+                    if self._configs.get(name) is config:
+                        continue
+                    self._configs[name] = config
+                    self._tokens[name] = _file_token(self.store.location(name))
+            elif event == "delete":
+                self._configs.pop(payload, None)
+                self._tokens.pop(payload, None)
+
+    def __len__(self):
+        return len(self._configs)
+
+    def get(self, name):
+        return self._configs.get(name)
+
+    def load_all(self):
+        """Every config, sorted by name, like ConfigStore.load_all().
+
+        The dicts are the watcher's cache, shared between callers; copy one
+        before changing it.
+        """
+        with self._lock:
+            return [self._configs[name] for name in sorted(self._configs)]
+
+    def list_index(self):
+        """(name, platform) pairs, sorted by name, like ConfigStore.list_index()"""
+        with self._lock:
+            return [(name, self._configs[name]["platform"]) for name in sorted(self._configs)]
+
+
+def watch(store, debounce=DEFAULT_DEBOUNCE):
+    """A started ConfigWatcher for a json store, or None for other backends"""
+    if store.backend != "json":
+        return None
+    return ConfigWatcher(store, debounce).start()
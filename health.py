@@ -0,0 +1,130 @@
+"""Liveness and readiness of the web UI, answered by the app process itself.
+
+Served next to /metrics on METRICS_PORT (8511):
+
+    GET /healthz   200 while the process can answer at all
+    GET /readyz    200 when the config store is usable, 503 when it isn't
+
+/readyz reports three things as JSON:
+- store: whether a trivial read and a writability check pass, and how
+  long they took
+- index: whether the sidebar index matches the store, and how long ago it
+  last did
+- rerun: how long the last Streamlit rerun took, and how long ago it
+  happened
+
+A stale index or a slow rerun marks the report "degraded" but keeps it
+ready, because the next rerun syncs the index anyway. Until the first
+browser session runs app.py there is no index or rerun to report, so the
+monitor opens its own store to check.
+
+The compose healthcheck calls healthcheck.c, a static binary, so a probe
+no longer starts a Python interpreter.
+"""
+import json
+import threading
+import time
+
+import metrics
+
+SLOW_RERUN_SECONDS = 2.0
+JSON_TYPE = "application/json"
+
+_server = None
+_server_lock = threading.Lock()
+
+
+class HealthMonitor:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.store = None
+        self.index = None
+        self.last_rerun = None
+        self.last_rerun_at = None
+
+    def attach(self, store, index):
+        """Report on the app's own store and sidebar index"""
+        self.store = store
+        self.index = index
+
+    def record_rerun(self, seconds):
+        self.last_rerun = seconds
+        self.last_rerun_at = time.monotonic()
+
+    def liveness(self):
+        return {"status": "ok", "uptime_s": round(time.monotonic() - self.started, 1)}
+
+    def _store(self):
+        if self.store is None:
+            from config_store import get_config_store
+            self.store = get_config_store()
+        return self.store
+
+    def check_store(self):
+        start = time.perf_counter()
+        try:
+            store = self._store()
+            store.ping()
+        except Exception as e:
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        return {
+            "ok": True,
+            "backend": store.backend,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 2)
+        }
+
+    def check_index(self):
+        if self.index is None:
+            return {"loaded": False}
+        synced_at = self.index.synced_at
+        return {
+            "loaded": True,
+            "fresh": self.index.is_fresh(),
+            "entries": len(self.index),
+            "synced_s_ago": None if synced_at is None else round(time.monotonic() - synced_at, 1)
+        }
+
+    def check_rerun(self):
+        if self.last_rerun is None:
+            return {"seen": False}
+        return {
+            "seen": True,
+            "last_ms": round(self.last_rerun * 1000, 1),
+            "s_ago": round(time.monotonic() - self.last_rerun_at, 1),
+            "slow": self.last_rerun > SLOW_RERUN_SECONDS
+        }
+
+    def readiness(self):
+        """Return (ready, report)"""
+        store, index, rerun = self.check_store(), self.check_index(), self.check_rerun()
+        if not store["ok"]:
+            status = "unavailable"
+        elif index.get("fresh") is False or rerun.get("slow"):
+            status = "degraded"
+        else:
+            status = "ok"
+        report = {"status": status, "store": store, "index": index, "rerun": rerun}
+        return store["ok"], report
+
+
+MONITOR = HealthMonitor()
+
+
+def routes(monitor=MONITOR):
+    def healthz():
+        return 200, JSON_TYPE, json.dumps(monitor.liveness()).encode()
+
+    def readyz():
+        ready, report = monitor.readiness()
+        return (200 if ready else 503), JSON_TYPE, json.dumps(report).encode()
+
+    return {"/healthz": healthz, "/readyz": readyz}
+
+
+def start(port, host="0.0.0.0"):
+    """Start /metrics, /healthz and /readyz once per process; returns the server"""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = metrics.serve(port, host, routes())
+        return _server
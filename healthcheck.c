@@ -0,0 +1,87 @@
+/*
+ * Minimal HTTP probe for container healthchecks.
+ *
+ *     healthcheck PORT [PATH] [HOST]      (defaults: /readyz, 127.0.0.1)
+ *
+ * Sends one HTTP/1.0 GET and exits 0 if the status is 2xx, 1 otherwise
+ * (including connection errors and a 3 second timeout). Built statically
+ * in the Dockerfile so a probe costs one tiny process instead of a Python
+ * interpreter.
+ */
+#include <arpa/inet.h>
+#include <netinet/in.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <sys/socket.h>
+#include <sys/time.h>
+#include <unistd.h>
+
+#define TIMEOUT_SECONDS 3
+
+int main(int argc, char **argv)
+{
+    if (argc < 2) {
+        fprintf(stderr, "usage: %s PORT [PATH] [HOST]\n", argv[0]);
+        return 2;
+    }
+    const char *path = argc > 2 ? argv[2] : "/readyz";
+    const char *host = argc > 3 ? argv[3] : "127.0.0.1";
+
+    struct sockaddr_in addr;
+    memset(&addr, 0, sizeof(addr));
+    addr.sin_family = AF_INET;
+    addr.sin_port = htons((unsigned short)atoi(argv[1]));
+    if (inet_pton(AF_INET, host, &addr.sin_addr) != 1) {
+        fprintf(stderr, "healthcheck: invalid IPv4 address %s\n", host);
+        return 2;
+    }
+
+    int fd = socket(AF_INET, SOCK_STREAM, 0);
+    if (fd < 0) {
+        perror("healthcheck: socket");
+        return 1;
+    }
+    struct timeval timeout = {TIMEOUT_SECONDS, 0};
+    setsockopt(fd, SOL_SOCKET, SO_RCVTIMEO, &timeout, sizeof(timeout));
+    setsockopt(fd, SOL_SOCKET, SO_SNDTIMEO, &timeout, sizeof(timeout));
+    if (connect(fd, (struct sockaddr *)&addr, sizeof(addr)) < 0) {
+        perror("healthcheck: connect");
+        return 1;
+    }
+
+    char request[512];
+    int length = snprintf(request, sizeof(request), "GET %s HTTP/1.0\r\nHost: %s\r\n\r\n", path, host);
+    if (length < 0 || length >= (int)sizeof(request) || write(fd, request, length) != length) {
+        fprintf(stderr, "healthcheck: failed to send request\n");
+        return 1;
+    }
+
+    /* Only the status line matters: "HTTP/1.x NNN ..." */
+    char response[64];
+    ssize_t received = 0;
+    while (received < (ssize_t)sizeof(response) - 1) {
+        ssize_t n = read(fd, response + received, sizeof(response) - 1 - received);
+        if (n <= 0)
+            break;
+        received += n;
+    }
+    response[received] = '\0';
+    /* Drain the body so the server isn't reset mid-write */
+    char discard[512];
+    while (read(fd, discard, sizeof(discard)) > 0)
+        ;
+    close(fd);
+
+    const char *status = strchr(response, ' ');
+    if (strncmp(response, "HTTP/", 5) != 0 || status == NULL) {
+        fprintf(stderr, "healthcheck: no HTTP response\n");
+        return 1;
+    }
+    int code = atoi(status + 1);
+    if (code < 200 || code >= 300) {
+        fprintf(stderr, "healthcheck: %s returned %d\n", path, code);
+        return 1;
+    }
+    return 0;
+}
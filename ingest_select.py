@@ -0,0 +1,95 @@
+"""Pick the lowest-latency ingest endpoint for a platform.
+
+Platforms list candidate ingest servers under "endpoints". An
+EndpointSelector probes them (TCP connect + RTMP handshake), caches each
+measurement for `ttl` seconds and ranks reachable endpoints by total RTT,
+so repeated generations only re-probe endpoints whose measurement expired.
+"""
+import threading
+import time
+
+import rtmp_probe
+from rtmp_protocol import run
+from url_builders import compile_for_endpoint
+
+DEFAULT_TTL = 300.0
+
+
+class EndpointSelector:
+    def __init__(self, ttl=DEFAULT_TTL, timeout=rtmp_probe.DEFAULT_TIMEOUT,
+                 probe=rtmp_probe.probe_many, clock=time.monotonic):
+        self.ttl = ttl
+        self.timeout = timeout
+        self._probe = probe
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._measurements = {}
+
+    def _fresh(self, endpoints):
+        now = self._clock()
+        with self._lock:
+            return {
+                endpoint: self._measurements[endpoint][1]
+                for endpoint in endpoints
+                if endpoint in self._measurements
+                and now - self._measurements[endpoint][0] < self.ttl
+            }
+
+    async def measure(self, endpoints):
+        """Return {endpoint: probe result}, probing only uncached or expired endpoints"""
+        endpoints = list(dict.fromkeys(endpoints))
+        results = self._fresh(endpoints)
+        stale = [endpoint for endpoint in endpoints if endpoint not in results]
+        if stale:
+            probed = await self._probe(stale, len(stale), self.timeout)
+            now = self._clock()
+            with self._lock:
+                for endpoint, result in zip(stale, probed):
+                    self._measurements[endpoint] = (now, result)
+                    results[endpoint] = result
+        return {endpoint: results[endpoint] for endpoint in endpoints}
+
+    async def rank(self, endpoints):
+        """Reachable endpoints ordered fastest first, as (endpoint, rtt_ms) pairs"""
+        measured = await self.measure(endpoints)
+        ranked = [
+            (endpoint, result["connect_ms"] + result["handshake_ms"])
+            for endpoint, result in measured.items()
+            if result["ok"]
+        ]
+        return sorted(ranked, key=lambda item: item[1])
+
+    def select(self, endpoints):
+        """Fastest reachable endpoint, or the first candidate if none responded"""
+        ranked = run(self.rank(endpoints))
+        return ranked[0][0] if ranked else endpoints[0]
+
+    def invalidate(self, endpoint=None):
+        with self._lock:
+            if endpoint is None:
+                self._measurements.clear()
+            else:
+                self._measurements.pop(endpoint, None)
+
+
+_default_selector = None
+
+
+def get_selector():
+    global _default_selector
+    if _default_selector is None:
+        _default_selector = EndpointSelector()
+    return _default_selector
+
+
+def platform_endpoints(generator, platform):
+    return generator.platforms[platform].get("endpoints") or []
+
+
+def build_fastest(generator, platform, stream_key, selector=None):
+    """Build (rtmp_url, server, app_name) against the platform's fastest endpoint"""
+    endpoints = platform_endpoints(generator, platform)
+    if len(endpoints) < 2:
+        return generator.build(platform, stream_key)
+    endpoint = (selector or get_selector()).select(endpoints)
+    return compile_for_endpoint(generator.platforms[platform]["template"], endpoint)(stream_key)
@@ -0,0 +1,133 @@
+"""At-rest encryption of the secret fields of saved configs.
+
+With CONFIG_PASSPHRASE set, the config store seals each config's
+stream_key and rtmp_url (which embeds the key) into a single AES-GCM token
+before writing it, and opens the token again on load. The config name is
+bound in as associated data, so a sealed token can't be copied onto a
+different config.
+
+The AES key is derived from the passphrase with scrypt and a random salt
+kept next to the configs (.keysalt). Derivation is deliberately slow, so
+it runs once per (passphrase, salt) per process and the resulting cipher
+is cached; after that sealing and opening a config is one AES-GCM call.
+Names and platforms stay in plaintext, so listing never decrypts.
+
+Configs saved before encryption was enabled have no token and load as
+they are; they are sealed the next time they are saved (or all at once
+with `python config_store.py encrypt`).
+"""
+import binascii
+import hashlib
+import os
+from functools import lru_cache
+from pathlib import Path
+
+SEALED_FIELD = "sealed"
+TOKEN_PREFIX = "v1:"
+NONCE_SIZE = 12
+
+SALT_FILENAME = ".keysalt"
+SALT_SIZE = 16
+# scrypt cost: ~0.1 s and 16 MiB, paid once per process
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+
+
+@lru_cache(maxsize=None)
+def derive_key(passphrase, salt):
+    return hashlib.scrypt(
+        passphrase.encode(), salt=salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P,
+        maxmem=256 * SCRYPT_N * SCRYPT_R, dklen=32
+    )
+
+
+def load_salt(config_dir):
+    """Read the store's salt, creating it on first use"""
+    path = Path(config_dir) / SALT_FILENAME
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(os.urandom(SALT_SIZE))
+    try:
+        # link() only succeeds if no other process created the salt first
+        os.link(tmp_path, path)
+    except FileExistsError:
+        pass
+    finally:
+        tmp_path.unlink()
+    return path.read_bytes()
+
+
+@lru_cache(maxsize=None)
+def _cipher(passphrase, salt):
+    return ConfigCipher(derive_key(passphrase, salt))
+
+
+def get_cipher(passphrase, config_dir):
+    """Cipher for the configs in config_dir, derived once per process"""
+    return _cipher(passphrase, load_salt(config_dir))
+
+
+class ConfigCipher:
+    def __init__(self, key):
+        # Imported here so stores without a passphrase never load cryptography
+        from cryptography.exceptions import InvalidTag
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+        self._aead = AESGCM(key)
+        self._invalid_tag = InvalidTag
+
+    def seal(self, config, nonce=None):
+        """Copy of config with its secret fields replaced by one sealed token"""
+        sealed = dict(config)
+        stream_key = sealed.pop("stream_key", "")
+        rtmp_url = sealed.pop("rtmp_url", "")
+        nonce = nonce or os.urandom(NONCE_SIZE)
+        data = self._aead.encrypt(nonce, _pack(stream_key, rtmp_url), config["name"].encode())
+        sealed[SEALED_FIELD] = TOKEN_PREFIX + binascii.b2a_base64(nonce + data, newline=False).decode()
+        return sealed
+
+    def open(self, config):
+        """Inverse of seal, in place; configs without a token are returned unchanged"""
+        token = config.pop(SEALED_FIELD, None)
+        if token is None:
+            return config
+        try:
+            if not token.startswith(TOKEN_PREFIX):
+                raise ValueError(token[:8])
+            data = binascii.a2b_base64(token[len(TOKEN_PREFIX):])
+            plaintext = self._aead.decrypt(data[:NONCE_SIZE], data[NONCE_SIZE:], config["name"].encode())
+        except (ValueError, binascii.Error, self._invalid_tag):
+            raise ValueError(
+                f"Can't decrypt config {config['name']!r}: wrong CONFIG_PASSPHRASE or damaged data"
+            ) from None
+        config["stream_key"], rtmp_url = _unpack(plaintext)
+        if rtmp_url:
+            config["rtmp_url"] = rtmp_url
+        return config
+
+    def seal_many(self, configs):
+        # One urandom call for the whole batch's nonces
+        nonces = os.urandom(NONCE_SIZE * len(configs))
+        seal = self.seal
+        return [
+            seal(config, nonces[i:i + NONCE_SIZE])
+            for i, config in zip(range(0, len(nonces), NONCE_SIZE), configs)
+        ]
+
+
+def _pack(stream_key, rtmp_url):
+    # Length-prefixed rather than JSON: a third of the cost, and any
+    # character may appear in either field
+    return f"{len(stream_key)}:{stream_key}{rtmp_url}".encode()
+
+
+def _unpack(plaintext):
+    text = plaintext.decode()
+    colon = text.index(":")
+    end = colon + 1 + int(text[:colon])
+    return text[colon + 1:end], text[end:]
@@ -0,0 +1,123 @@
+"""Bulk stream-key rotation across saved configs.
+
+When a platform forces key resets, a mapping file lists each new key
+against either a config name or the old key. A CSV (with a header) or
+JSONL file has a new_key column and either a name or an old_key column:
+
+    name,new_key
+    Main Twitch,live_123456789_newkey
+    old_key,new_key
+    xxxx-xxxx-xxxx-xxxx,yyyy-yyyy-yyyy-yyyy
+
+An old key matches every config that uses it. plan_rotation() resolves
+the whole mapping against one scan of the store. It validates each new
+key for its config's platform and regenerates the rtmp_urls with the
+compiled builders. rotate_keys() writes nothing if any row fails.
+Otherwise every update goes through ConfigStore.save_rotation() as one
+batch: one SQLite transaction, one journal record, or json files that
+are all staged before any is renamed into place.
+"""
+import csv
+import io
+import json
+
+FORMATS = ("csv", "jsonl")
+
+
+def detect_format(name):
+    return "jsonl" if name.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def read_mapping(f, fmt="csv"):
+    """Rows of {"name" or "old_key": ..., "new_key": ...} from a text or binary file object"""
+    wrapper = None
+    if isinstance(f, (io.BufferedIOBase, io.RawIOBase)):
+        # Uploads in the web UI are binary and may be read again on a later rerun
+        if f.seekable():
+            f.seek(0)
+        f = wrapper = io.TextIOWrapper(f, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "jsonl":
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+        return [
+            {field: (row.get(field) or "").strip() for field in ("name", "old_key", "new_key")}
+            for row in rows
+        ]
+    finally:
+        if wrapper is not None:
+            # Leave the caller's file open
+            wrapper.detach()
+
+
+def plan_rotation(store, generator, mapping):
+    """Resolve a mapping to updated configs; returns a dict with updates, errors and counts"""
+    # load_all, not iter_all: the json backend only reads a consistent set under its lock
+    configs = {config["name"]: config for config in store.load_all()}
+    by_key = {}
+    for config in configs.values():
+        by_key.setdefault(config.get("stream_key", ""), []).append(config["name"])
+
+    errors = []
+    new_keys = {}
+    for row_number, row in enumerate(mapping, 1):
+        new_key = row["new_key"]
+        if not row["name"] and not row["old_key"]:
+            errors.append({"row": row_number, "error": "Row needs a name or an old_key"})
+            continue
+        if not new_key:
+            errors.append({"row": row_number, "error": "Missing new_key"})
+            continue
+        if row["name"]:
+            names = [row["name"]] if row["name"] in configs else []
+        else:
+            names = by_key.get(row["old_key"], [])
+        if not names:
+            source = f"name {row['name']!r}" if row["name"] else "old_key"
+            errors.append({"row": row_number, "error": f"No saved config matches this {source}"})
+            continue
+        for name in names:
+            if new_keys.setdefault(name, (new_key, row_number))[0] != new_key:
+                errors.append({
+                    "row": row_number,
+                    "error": f"Config {name!r} is already given a different key by row {new_keys[name][1]}"
+                })
+
+    updates = []
+    unchanged = 0
+    for name, (new_key, row_number) in new_keys.items():
+        config = configs[name]
+        if config.get("stream_key") == new_key:
+            unchanged += 1
+            continue
+        key_errors = [
+            error for error in generator.validator.validate(
+                config["platform"], new_key, config.get("server_url", ""), config.get("app_name", "")
+            )
+            if error["field"] in ("platform", "stream_key")
+        ]
+        if key_errors:
+            errors.append({"row": row_number, "error": f"{name}: {key_errors[0]['message']}"})
+            continue
+        updates.append(dict(
+            config,
+            stream_key=new_key,
+            rtmp_url=generator.build_config(config, new_key)[0]
+        ))
+
+    return {
+        "rows": len(mapping),
+        "updates": updates,
+        "unchanged": unchanged,
+        "errors": sorted(errors, key=lambda error: error["row"])
+    }
+
+
+def rotate_keys(store, generator, mapping, dry_run=False):
+    """Plan and, unless any row fails or dry_run is set, apply every rotation in one write"""
+    plan = plan_rotation(store, generator, mapping)
+    plan["rotated"] = 0
+    if plan["updates"] and not plan["errors"] and not dry_run:
+        plan["rotated"] = store.save_rotation(plan["updates"])
+    return plan
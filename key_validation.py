@@ -0,0 +1,115 @@
+"""Per-platform validation of stream keys and custom server details.
+
+Each platform's "key_pattern" from the registry is compiled once into a
+KeyValidator. validate() returns a list of structured errors for a row:
+
+    {"field": "stream_key", "code": "format", "message": "..."}
+
+validate_many() runs that over an iterable of rows, optionally in a
+process pool for large CSV imports, and yields (row_number, errors) for
+every row so callers can report problems per line.
+
+Patterns spell out their character classes ([0-9], [A-Za-z0-9_], the six
+ASCII whitespace characters) rather than using the digit, word and space
+shorthands. columnar.py evaluates the same patterns with RE2, where those
+shorthands are ASCII only while Python's match Unicode; explicit classes
+make both accept exactly the same keys.
+"""
+import re
+from itertools import islice
+
+SERVER_PATTERN = r"(\[[0-9A-Fa-f:.]+\]|[A-Za-z0-9.-]+)(:[0-9]{1,5})?"
+APP_PATTERN = r"[^ \t\n\r\f\v?#]+(/[^ \t\n\r\f\v?#]+)*"
+
+
+def _error(field, code, message):
+    return {"field": field, "code": code, "message": message}
+
+
+class KeyValidator:
+    def __init__(self, platforms):
+        self.platforms = platforms
+        self.patterns = {
+            name: re.compile(info["key_pattern"])
+            for name, info in platforms.items()
+            if info.get("key_pattern")
+        }
+        self.server_pattern = re.compile(SERVER_PATTERN)
+        self.app_pattern = re.compile(APP_PATTERN)
+
+    def validate(self, platform, stream_key, server_url="", app_name=""):
+        """Return a list of error dicts; empty when the row is valid"""
+        if platform not in self.platforms:
+            return [_error("platform", "unknown", f"Invalid platform: {platform!r}")]
+
+        errors = []
+        if not stream_key:
+            errors.append(_error("stream_key", "missing", "Missing stream key"))
+        elif platform in self.patterns and not self.patterns[platform].fullmatch(stream_key):
+            example = self.platforms[platform].get("example_key", "")
+            errors.append(_error(
+                "stream_key", "format",
+                f"Stream key doesn't look like a {platform.capitalize()} key (expected e.g. {example})"
+            ))
+
+        if platform == "custom":
+            if not server_url:
+                errors.append(_error("server_url", "missing", "Custom platform requires a server URL"))
+            elif not self.server_pattern.fullmatch(server_url):
+                errors.append(_error("server_url", "format", "Server must be host or host:port, without rtmp:// or a path"))
+            if not app_name:
+                errors.append(_error("app_name", "missing", "Custom platform requires an application name"))
+            elif not self.app_pattern.fullmatch(app_name):
+                errors.append(_error("app_name", "format", "Application name must not contain spaces, '?' or '#'"))
+        return errors
+
+    def validate_row(self, row):
+        errors = [
+            _error(field, "type", f"{field} must be a string, not {type(row[field]).__name__}")
+            for field in ("platform", "stream_key", "server_url", "app_name")
+            if not isinstance(row.get(field, ""), str)
+        ]
+        if errors:
+            return errors
+        return self.validate(
+            row.get("platform", ""), row.get("stream_key", ""),
+            row.get("server_url", ""), row.get("app_name", "")
+        )
+
+    def validate_many(self, rows, workers=0, chunksize=1024):
+        """Yield (row_number, errors) for each row, numbering from 1"""
+        from rtmp_core import normalize_row
+
+        if not workers:
+            for number, row in enumerate(rows, 1):
+                yield number, self.validate_row(normalize_row(row))
+            return
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        rows = iter(rows)
+        number = 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            while True:
+                batch = list(islice(rows, chunksize * workers * 4))
+                if not batch:
+                    break
+                for errors in pool.map(_validate_row, batch, chunksize=chunksize):
+                    number += 1
+                    yield number, errors
+
+
+_worker_validator = None
+
+
+def _validate_row(row):
+    global _worker_validator
+    if _worker_validator is None:
+        from rtmp_core import PLATFORMS
+        _worker_validator = KeyValidator(PLATFORMS)
+    from rtmp_core import normalize_row
+    return _worker_validator.validate_row(normalize_row(row))
+
+
+def format_errors(errors):
+    return "; ".join(error["message"] for error in errors)
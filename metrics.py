@@ -0,0 +1,219 @@
+"""In-process counters and histograms with a Prometheus text endpoint.
+
+Modules declare their metrics at import time with counter() and
+histogram(). Both return the existing metric when the name is already
+registered, because Streamlit re-executes app.py on every rerun.
+render() produces the Prometheus text exposition format, and serve()
+publishes it from a background thread. That matters for the web container
+because Streamlit has no way to add routes of its own.
+
+profiled() and split_profile_flag() implement the --profile flag shared by
+the CLI and the web UI.
+"""
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025,
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+SIZE_BUCKETS = (0, 10, 100, 1000, 10_000, 100_000, 1_000_000)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        return self._values.get(label_values, 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            yield self.name, dict(zip(self.labels, label_values)), value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # {label values: [count per bucket..., count above the last bucket, sum]}
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, *label_values):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *label_values)
+
+    def _merged(self):
+        with self._lock:
+            return {label_values: list(series) for label_values, series in self._series.items()}
+
+    def count(self, *label_values):
+        series = self._merged().get(label_values)
+        return sum(series[:-1]) if series else 0
+
+    def samples(self):
+        for label_values, series in sorted(self._merged().items()):
+            labels = dict(zip(self.labels, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                yield f"{self.name}_bucket", dict(labels, le=_format_value(bound)), cumulative
+            yield f"{self.name}_sum", labels, series[-1]
+            yield f"{self.name}_count", labels, cumulative
+
+
+def _register(cls, name, *args, **kwargs):
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = cls(name, *args, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+        return metric
+
+
+def counter(name, help, labels=()):
+    return _register(Counter, name, help, labels)
+
+
+def histogram(name, help, labels=(), buckets=LATENCY_BUCKETS):
+    return _register(Histogram, name, help, labels, buckets)
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render():
+    """Every registered metric in the Prometheus text format"""
+    lines = []
+    with _registry_lock:
+        metrics = sorted(_registry.values(), key=lambda metric: metric.name)
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {_escape(metric.help)}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in metric.samples():
+            if labels:
+                label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+                name = f"{name}{{{label_text}}}"
+            lines.append(f"{name} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def serve(port, host="0.0.0.0", routes=None):
+    """Serve render() at /metrics, plus any extra routes, from a daemon thread.
+
+    routes maps a path to a callable returning (status, content type, body
+    bytes). Returns the server.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    routes = dict(routes or {})
+    routes["/metrics"] = lambda: (200, CONTENT_TYPE, render().encode())
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            route = routes.get(self.path.split("?")[0].rstrip("/"))
+            if route is None:
+                self.send_error(404)
+                return
+            status, content_type, body = route()
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except ConnectionError:
+                # The prober hung up early; nothing to tell it
+                pass
+
+        def log_message(self, format, *args):
+            # Probed and scraped every few seconds; keep it out of the app's log
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def split_profile_flag(argv):
+    """Remove --profile / --profile=PATH from argv.
+
+    Returns (profile, remaining args): profile is None without the flag,
+    "" for a report on stderr, or the path to write pstats data to.
+    """
+    profile = None
+    remaining = []
+    for arg in argv:
+        if arg == "--profile":
+            profile = ""
+        elif arg.startswith("--profile="):
+            profile = arg[len("--profile="):]
+        else:
+            remaining.append(arg)
+    return profile, remaining
+
+
+@contextmanager
+def profiled(path=None, limit=30):
+    """Run the block under cProfile, then write stats to path or a summary to stderr"""
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if path:
+            profiler.dump_stats(path)
+            print(f"📊 Profile written to {path} (view with python -m pstats {path})", file=sys.stderr)
+        else:
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(limit)
@@ -0,0 +1,130 @@
+"""Bulk export of saved configs as vMix and OBS import bundles.
+
+The zip archive is written entry by entry while the store is iterated, so
+only one config is held at a time. vMix destinations go into a single XML
+document streamed into the archive; every config also gets an OBS profile
+folder (basic.ini + service.json) that OBS can import via
+Profile -> Import. The archive itself can be a non-seekable stream such as
+stdout. What still grows with the store is the zip central directory
+(about half a KB per entry) that zipfile keeps until it closes.
+"""
+import hashlib
+import json
+import re
+import tempfile
+import time
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+VMIX = "vmix"
+OBS = "obs"
+FORMATS = (VMIX, OBS)
+
+VMIX_PATH = "vmix/destinations.xml"
+UNSAFE_FILENAME = re.compile(r"[^\w .-]+")
+
+
+def safe_filename(name):
+    """A path-safe version of a config name, kept unique with a short hash when changed"""
+    safe = UNSAFE_FILENAME.sub("_", name).strip(" .") or "config"
+    if safe != name:
+        safe += "-" + hashlib.sha1(name.encode()).hexdigest()[:8]
+    return safe
+
+
+def vmix_destination(name, platform, server, app_name, stream_key):
+    return (
+        f"  <Destination name={quoteattr(name)} platform={quoteattr(platform)}>\n"
+        f"    <URL>{escape(f'rtmp://{server}/{app_name}')}</URL>\n"
+        f"    <StreamName>{escape(stream_key)}</StreamName>\n"
+        f"  </Destination>\n"
+    )
+
+
+def obs_service(server, app_name, stream_key):
+    # No indent: json's C encoder only handles compact output
+    return json.dumps({
+        "type": "rtmp_custom",
+        "settings": {
+            "server": f"rtmp://{server}/{app_name}",
+            "key": stream_key,
+            "use_auth": False,
+            "bwtest": False
+        }
+    })
+
+
+def obs_profile_ini(name):
+    return f"[General]\nName={name}\n"
+
+
+def _write_vmix(archive, generator, configs):
+    exported = 0
+    info = zipfile.ZipInfo(VMIX_PATH, time.localtime()[:6])
+    info.compress_type = zipfile.ZIP_DEFLATED
+    with archive.open(info, "w") as f:
+        f.write(b'<?xml version="1.0" encoding="utf-8"?>\n<Destinations>\n')
+        for config in configs:
+            target = generator.target(config)
+            if target is not None:
+                f.write(vmix_destination(config["name"], config["platform"], *target).encode())
+                exported += 1
+        f.write(b"</Destinations>\n")
+    return exported
+
+
+def _write_obs(archive, generator, configs):
+    exported = 0
+    for config in configs:
+        target = generator.target(config)
+        if target is None:
+            continue
+        folder = f"obs/{safe_filename(config['name'])}"
+        archive.writestr(f"{folder}/basic.ini", obs_profile_ini(config["name"]))
+        archive.writestr(f"{folder}/service.json", obs_service(*target))
+        exported += 1
+    return exported
+
+
+class _WriteOnly:
+    """Hides seek/tell so zipfile writes strictly sequentially.
+
+    On a seekable file zipfile goes back to patch every local header, which
+    flushes the write buffer twice per entry; without seek it appends a
+    data descriptor after each entry instead.
+    """
+
+    def __init__(self, fileobj):
+        self._fileobj = fileobj
+
+    def write(self, data):
+        return self._fileobj.write(data)
+
+    def flush(self):
+        self._fileobj.flush()
+
+
+def export_bundle(store, fileobj, generator, formats=FORMATS):
+    """Write a zip of the store's configs to fileobj; returns {format: configs exported}"""
+    counts = {}
+    with zipfile.ZipFile(_WriteOnly(fileobj), "w", zipfile.ZIP_DEFLATED) as archive:
+        # zipfile allows one open entry at a time, so each format makes its
+        # own pass over the store rather than interleaving entries
+        if VMIX in formats:
+            counts[VMIX] = _write_vmix(archive, generator, store.iter_all())
+        if OBS in formats:
+            counts[OBS] = _write_obs(archive, generator, store.iter_all())
+    return counts
+
+
+def export_bytes(store, generator, formats=FORMATS):
+    """The bundle as bytes for st.download_button; returns (data, counts).
+
+    download_button only takes bytes, str or a few exact file types, and
+    keeps the data in memory either way. Building in a temporary file
+    means only the finished archive is held, not a buffer plus its copy.
+    """
+    with tempfile.TemporaryFile() as f:
+        counts = export_bundle(store, f, generator, formats)
+        f.seek(0)
+        return f.read(), counts
@@ -0,0 +1,324 @@
+"""Core of the RTMP URL generator shared by the web UI, CLI and API.
+
+Holds the platform registry, the compiled URL builders and access to the
+config store. Optional or heavy dependencies (sqlite3 via the config store,
+asyncio via ingest selection, multiprocessing for batch pools) are imported
+only by the methods that need them, keeping CLI start-up cheap.
+"""
+from itertools import islice
+from time import perf_counter
+
+import metrics
+from key_validation import KeyValidator, format_errors
+from url_builders import compile_for_endpoint, compile_platforms, compile_template
+from url_parser import URLParser
+
+PLATFORMS = {
+    "twitch": {
+        "template": "rtmp://live.twitch.tv/app/{stream_key}",
+        "help": "Get stream key from Twitch Dashboard -> Settings -> Stream",
+        "server": "live.twitch.tv",
+        "app_name": "app",
+        "example_key": "live_123456789_abcdefghij",
+        "key_pattern": r"live_[0-9]+_[A-Za-z0-9]+",
+        "endpoints": ["live.twitch.tv", "ingest.global-contribute.live-video.net"]
+    },
+    "youtube": {
+        "template": "rtmp://a.rtmp.youtube.com/live2/{stream_key}",
+        "help": "Get stream key from YouTube Studio -> Go Live -> Create Stream",
+        "server": "a.rtmp.youtube.com",
+        "app_name": "live2",
+        "example_key": "xxxx-xxxx-xxxx-xxxx",
+        "key_pattern": r"[A-Za-z0-9]{4}(-[A-Za-z0-9]{4}){3,4}",
+        "endpoints": ["a.rtmp.youtube.com"]
+    },
+    "facebook": {
+        "template": "rtmp://live-api-s.facebook.com:80/rtmp/{stream_key}",
+        "help": "Get stream key from Facebook Live API",
+        "server": "live-api-s.facebook.com:80",
+        "app_name": "rtmp",
+        "example_key": "123456789012345?ds=1",
+        "key_pattern": r"[0-9]{6,20}\?[A-Za-z0-9_=&.%-]+|FB-[0-9]+-[0-9]+-[A-Za-z0-9_-]+",
+        "endpoints": ["live-api-s.facebook.com:80"]
+    },
+    "custom": {
+        "template": "rtmp://{server_url}/{app_name}/{stream_key}",
+        "help": "Enter custom RTMP server details",
+        "server": "",
+        "app_name": "",
+        "example_key": "your_stream_key",
+        "key_pattern": r"[^ \t\n\r\f\v/]+"
+    }
+}
+
+BATCH_FIELDS = ("platform", "stream_key", "server_url", "app_name")
+BATCH_ALIASES = {"key": "stream_key", "server": "server_url", "app": "app_name"}
+
+GENERATE_SECONDS = metrics.histogram(
+    "rtmp_generate_batch_seconds", "Time to validate and generate one batch of rows in generate_many"
+)
+GENERATED_ROWS = metrics.counter("rtmp_generate_rows_total", "Rows passed through generate_many")
+SINGLE_SECONDS = metrics.histogram(
+    "rtmp_generate_single_seconds", "Time to generate one URL outside generate_many (UI, CLI and API requests)"
+)
+REJECTED_ROWS = metrics.counter(
+    "rtmp_generate_rejected_total", "Rows that failed validation before generation", ("platform",)
+)
+
+
+class RTMPGenerator:
+    def __init__(self, store=None):
+        self._store = store
+        # Per-instance copy so endpoint lists can be edited without touching PLATFORMS
+        self.platforms = {
+            name: dict(info, endpoints=list(info.get("endpoints", [])))
+            for name, info in PLATFORMS.items()
+        }
+        self.builders = compile_platforms(self.platforms)
+        self.validator = KeyValidator(self.platforms)
+        self.url_parser = URLParser(self.platforms)
+        self.endpoint_overrides = {}
+        self.watcher = None
+    
+    def generate_rtmp(self, platform, stream_key, server_url="", app_name=""):
+        builder = self.builders.get(platform)
+        if builder is None:
+            REJECTED_ROWS.inc("unknown")
+            return "Invalid platform selected"
+        
+        return builder(stream_key, server_url, app_name)[0]
+    
+    def build(self, platform, stream_key, server_url="", app_name=""):
+        """Return (rtmp_url, server, app_name) for a platform in one call"""
+        start = perf_counter()
+        built = self.builders[platform](stream_key, server_url, app_name)
+        SINGLE_SECONDS.observe(perf_counter() - start)
+        return built
+    
+    def build_config(self, config, stream_key=None):
+        """(rtmp_url, server, app_name) for a saved config, or None for unknown platforms.
+        
+        Fixed-platform builders ignore server_url, so a config saved against
+        one of the platform's other ingest endpoints is built for that
+        endpoint explicitly. stream_key overrides the saved key.
+        """
+        platform = config.get("platform")
+        builder = self.builders.get(platform)
+        if builder is None:
+            return None
+        server_url = config.get("server_url", "")
+        if server_url and server_url in self.platforms[platform].get("endpoints", ()):
+            builder = compile_for_endpoint(self.platforms[platform]["template"], server_url)
+        if stream_key is None:
+            stream_key = config.get("stream_key", "")
+        return builder(stream_key, server_url, config.get("app_name", ""))
+    
+    def target(self, config):
+        """(server, app_name, stream_key) a saved config publishes to, or None for unknown platforms"""
+        built = self.build_config(config)
+        if built is None:
+            return None
+        _, server, app_name = built
+        return server, app_name, config.get("stream_key", "")
+    
+    def use_endpoint(self, platform, endpoint):
+        """Generate URLs for platform against a specific ingest endpoint from now on"""
+        self.builders[platform] = compile_for_endpoint(self.platforms[platform]["template"], endpoint)
+        self.endpoint_overrides[platform] = endpoint
+    
+    def reset_endpoint(self, platform):
+        self.builders[platform] = compile_template(self.platforms[platform]["template"])
+        self.endpoint_overrides.pop(platform, None)
+    
+    def use_fastest_endpoints(self, platforms=None, selector=None):
+        """Switch every multi-endpoint platform to its lowest-latency endpoint"""
+        import ingest_select
+        
+        selector = selector or ingest_select.get_selector()
+        chosen = {}
+        for platform in platforms or list(self.platforms):
+            if len(self.platforms[platform].get("endpoints", [])) > 1:
+                chosen[platform] = selector.select(self.platforms[platform]["endpoints"])
+                self.use_endpoint(platform, chosen[platform])
+        return chosen
+    
+    def parse_url(self, url):
+        """Map a full RTMP URL back to (platform, server, app_name, stream_key)"""
+        return self.url_parser.parse(url)
+    
+    def get_server_info(self, platform):
+        """Get server and app name for vMix configuration"""
+        if platform in self.platforms:
+            return {
+                "server": self.platforms[platform]["server"],
+                "app_name": self.platforms[platform]["app_name"]
+            }
+        return {"server": "", "app_name": ""}
+    
+    @property
+    def store(self):
+        # Opened on first use so pure generation (batch workers) never touches
+        # storage, and sqlite3 is only imported on paths that need it
+        if self._store is None:
+            from config_store import get_config_store
+            self._store = get_config_store()
+        return self._store
+    
+    def generate_one(self, row):
+        """Validate and generate a single batch row, returning a result dict"""
+        start = perf_counter()
+        result = self._generate(row)
+        SINGLE_SECONDS.observe(perf_counter() - start)
+        return result
+    
+    def _generate(self, row):
+        # Untimed; generate_many records its own per-batch timing
+        row = normalize_row(row)
+        errors = self.validator.validate_row(row)
+        if errors:
+            row["error"] = format_errors(errors)
+            row["errors"] = errors
+            platform = row["platform"]
+            REJECTED_ROWS.inc(platform if isinstance(platform, str) and platform in self.platforms else "unknown")
+        else:
+            row["rtmp_url"] = self.generate_rtmp(
+                row["platform"], row["stream_key"], row["server_url"], row["app_name"]
+            )
+        return row
+    
+    def generate_many(self, rows, workers=0, chunksize=256):
+        """Lazily generate URLs for an iterable of rows.
+        
+        Rows are dicts or (platform, key, server, app[, name]) tuples. Results
+        are yielded in input order; rows that fail validation carry an
+        "error" key instead of "rtmp_url". With workers > 0 validation and
+        generation run in a process pool, still consuming input lazily.
+        Timing is recorded per batch of chunksize rows; reading the clock for
+        every URL would cost as much as building it. Single calls through
+        generate_one() and build() are timed individually instead.
+        """
+        rows = iter(rows)
+        if not workers:
+            while True:
+                batch = list(islice(rows, chunksize))
+                if not batch:
+                    break
+                start = perf_counter()
+                results = [self._generate(row) for row in batch]
+                _observe_batch(start, len(results))
+                yield from results
+            return
+        
+        from concurrent.futures import ProcessPoolExecutor
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.endpoint_overrides,)) as pool:
+            while True:
+                # Bound the number of in-flight rows so memory stays flat
+                batch = list(islice(rows, chunksize * workers * 4))
+                if not batch:
+                    break
+                start = perf_counter()
+                results = list(pool.map(_generate_row, batch, chunksize=chunksize))
+                _observe_batch(start, len(results))
+                yield from results
+    
+    def save_many(self, results, batch_size=500):
+        """Save successful results from generate_many, passing every row through"""
+        from config_store import InvalidConfigName, check_name
+        pending = []
+        for result in results:
+            if "error" not in result:
+                try:
+                    check_name(result.get("name"))
+                except InvalidConfigName as e:
+                    result["error"] = str(e)
+                else:
+                    pending.append(_to_config(result))
+                    if len(pending) >= batch_size:
+                        self.store.save_many(pending)
+                        pending = []
+            yield result
+        if pending:
+            self.store.save_many(pending)
+    
+    def save_config(self, config_name, platform, stream_key, server_url="", app_name=""):
+        config = {
+            "name": config_name,
+            "platform": platform,
+            "stream_key": stream_key,
+            "server_url": server_url,
+            "app_name": app_name,
+            "rtmp_url": self.generate_rtmp(platform, stream_key, server_url, app_name)
+        }
+        
+        return self.store.save(config)
+    
+    def watch_configs(self):
+        """Follow a json config directory so load_configs() stops rescanning it.
+        
+        Returns the ConfigWatcher, or None for backends that list cheaply.
+        Raises ImportError without watchdog.
+        """
+        if self.watcher is None:
+            import config_watch
+            self.watcher = config_watch.watch(self.store)
+        return self.watcher
+    
+    def load_configs(self):
+        """Saved configs for read-only use, e.g. probing.
+        
+        Streams the store into a compact ConfigCollection. With a watcher the
+        configs are already held in memory, so its list is returned as is.
+        """
+        if self.watcher is not None:
+            return self.watcher.load_all()
+        return self.load_config_collection()
+    
+    def load_config_collection(self):
+        """Load saved configs into a compact columnar ConfigCollection"""
+        from config_records import ConfigCollection
+        return ConfigCollection(self.store.iter_all())
+
+
+def _observe_batch(start, rows):
+    GENERATE_SECONDS.observe(perf_counter() - start)
+    GENERATED_ROWS.inc(amount=rows)
+
+
+_worker_generator = None
+
+
+def _init_worker(endpoint_overrides):
+    global _worker_generator
+    _worker_generator = RTMPGenerator()
+    for platform, endpoint in endpoint_overrides.items():
+        _worker_generator.use_endpoint(platform, endpoint)
+
+
+def _generate_row(row):
+    return _worker_generator._generate(row)
+
+
+def _to_config(result):
+    return {
+        "name": result["name"],
+        "platform": result["platform"],
+        "stream_key": result["stream_key"],
+        "server_url": result["server_url"],
+        "app_name": result["app_name"],
+        "rtmp_url": result["rtmp_url"]
+    }
+
+
+def normalize_row(row):
+    if isinstance(row, (list, tuple)):
+        row = dict(zip(BATCH_FIELDS + ("name",), row))
+    normalized = {BATCH_ALIASES.get(k, k): v for k, v in row.items()}
+    for field in BATCH_FIELDS:
+        value = normalized.get(field)
+        if value is None:
+            value = ""
+        # Non-strings (from JSON bodies) are left for validate_row to reject
+        normalized[field] = value.strip() if isinstance(value, str) else value
+    return normalized
@@ -0,0 +1,84 @@
+"""Concurrent reachability and handshake-latency probing of RTMP ingest servers.
+
+Each server gets a TCP connect followed by the RTMP C0/C1/S0/S1/C2/S2
+handshake. Connect and handshake times are reported separately so a slow
+DNS/TCP path can be told apart from a slow ingest process.
+"""
+import asyncio
+import time
+
+from rtmp_protocol import client_handshake, close_writer, run, split_host_port
+
+DEFAULT_CONCURRENCY = 50
+DEFAULT_TIMEOUT = 5.0
+
+
+async def probe_server(server, timeout=DEFAULT_TIMEOUT):
+    """Probe one "host[:port]" and return a result dict"""
+    result = {
+        "server": server,
+        "host": None,
+        "port": None,
+        "ok": False,
+        "connect_ms": None,
+        "handshake_ms": None,
+        "error": None,
+        "warning": None
+    }
+    writer = None
+    try:
+        # A malformed address fails this server only, not the whole run
+        host, port = split_host_port(server)
+        result["host"], result["port"] = host, port
+        start = time.perf_counter()
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        connected = time.perf_counter()
+        result["connect_ms"] = (connected - start) * 1000
+
+        _, echoed = await asyncio.wait_for(client_handshake(reader, writer), timeout)
+        result["handshake_ms"] = (time.perf_counter() - connected) * 1000
+        result["ok"] = True
+        if not echoed:
+            result["warning"] = "S2 does not echo C1 (digest handshake?)"
+    except asyncio.TimeoutError:
+        result["error"] = f"Timed out after {timeout:g}s"
+    except asyncio.IncompleteReadError:
+        result["error"] = "Connection closed during handshake"
+    except ValueError:
+        result["error"] = "Invalid server address"
+    except (OSError, ConnectionError) as e:
+        result["error"] = str(e) or type(e).__name__
+    finally:
+        if writer is not None:
+            await close_writer(writer)
+    return result
+
+
+async def probe_many(servers, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT):
+    """Probe servers with at most `concurrency` in flight; results keep input order"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(server):
+        async with semaphore:
+            return await probe_server(server, timeout)
+
+    return await asyncio.gather(*(bounded(server) for server in servers))
+
+
+def config_servers(generator, configs):
+    """Map each distinct ingest server to the names of the configs using it"""
+    servers = {}
+    for config in configs:
+        target = generator.target(config)
+        if target is not None and target[0]:
+            servers.setdefault(target[0], []).append(config["name"])
+    return servers
+
+
+def probe_configs(generator, configs, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT):
+    """Probe every distinct server used by configs; each server is probed once"""
+    servers = config_servers(generator, configs)
+    results = run(probe_many(list(servers), concurrency, timeout))
+    for result in results:
+        result["configs"] = servers[result["server"]]
+    return results
@@ -0,0 +1,354 @@
+"""Minimal RTMP wire helpers shared by the prober, publisher and stand-in server.
+
+Only the simple (non-digest) handshake is implemented. Every ingest we
+target accepts it, and it is all that is needed to measure reachability.
+RTMPConnection adds the chunk stream and AMF0 command layer on top, which
+is enough to connect, publish and push FLV tags.
+"""
+import asyncio
+import os
+import struct
+import time
+
+RTMP_VERSION = 3
+HANDSHAKE_SIZE = 1536
+DEFAULT_PORT = 1935
+DEFAULT_CHUNK_SIZE = 128
+DEFAULT_WINDOW = 2500000
+
+# Message type ids
+SET_CHUNK_SIZE = 1
+ACK = 3
+USER_CONTROL = 4
+WINDOW_ACK_SIZE = 5
+SET_PEER_BANDWIDTH = 6
+AUDIO = 8
+VIDEO = 9
+DATA_AMF0 = 18
+COMMAND_AMF0 = 20
+
+# Chunk stream ids
+CSID_CONTROL = 2
+CSID_COMMAND = 3
+CSID_AUDIO = 4
+CSID_DATA = 5
+CSID_VIDEO = 6
+
+# User control events
+PING_REQUEST = 6
+PING_RESPONSE = 7
+
+
+def split_host_port(server, default_port=DEFAULT_PORT):
+    """Split "host[:port]" (as stored in configs) into (host, port)"""
+    server = server.strip()
+    if server.startswith("rtmp://"):
+        server = server[len("rtmp://"):]
+    server = server.split("/", 1)[0]
+    if server.startswith("["):
+        host, _, rest = server[1:].partition("]")
+        port = rest[1:] if rest.startswith(":") else ""
+    elif server.count(":") == 1:
+        host, _, port = server.partition(":")
+    else:
+        host, port = server, ""
+    return host, int(port) if port else default_port
+
+
+def _timestamp():
+    return int(time.monotonic() * 1000) & 0xFFFFFFFF
+
+
+def make_c1():
+    return struct.pack(">II", _timestamp(), 0) + os.urandom(HANDSHAKE_SIZE - 8)
+
+
+def make_echo(packet):
+    """Build C2/S2: the peer's timestamp, our read time, then its random bytes"""
+    return packet[:4] + struct.pack(">I", _timestamp()) + packet[8:]
+
+
+async def client_handshake(reader, writer):
+    """Perform C0/C1 -> S0/S1 -> C2 -> S2; returns (S1, whether S2 echoed C1).
+
+    Only the lengths of S1 and S2 are enforced. Servers using the FMS-style
+    digest handshake answer with an S2 that doesn't echo C1 byte for byte,
+    yet accept the connection.
+    """
+    c1 = make_c1()
+    writer.write(bytes([RTMP_VERSION]) + c1)
+    await writer.drain()
+
+    s0 = await reader.readexactly(1)
+    if s0[0] != RTMP_VERSION:
+        raise ConnectionError(f"Unsupported RTMP version {s0[0]}")
+    s1 = await reader.readexactly(HANDSHAKE_SIZE)
+    writer.write(make_echo(s1))
+    await writer.drain()
+
+    s2 = await reader.readexactly(HANDSHAKE_SIZE)
+    return s1, s2[8:] == c1[8:]
+
+
+async def server_handshake(reader, writer):
+    """Server side of the handshake; returns the client's C1"""
+    c0 = await reader.readexactly(1)
+    if c0[0] != RTMP_VERSION:
+        raise ConnectionError(f"Unsupported RTMP version {c0[0]}")
+    c1 = await reader.readexactly(HANDSHAKE_SIZE)
+    writer.write(bytes([RTMP_VERSION]) + make_c1() + make_echo(c1))
+    await writer.drain()
+    await reader.readexactly(HANDSHAKE_SIZE)
+    return c1
+
+
+def amf0_encode(*values):
+    """Encode values as consecutive AMF0 items (dicts become objects)"""
+    parts = []
+    for value in values:
+        _amf0_value(value, parts)
+    return b"".join(parts)
+
+
+def _amf0_value(value, parts):
+    if value is None:
+        parts.append(b"\x05")
+    elif isinstance(value, bool):
+        parts.append(b"\x01\x01" if value else b"\x01\x00")
+    elif isinstance(value, (int, float)):
+        parts.append(struct.pack(">Bd", 0x00, value))
+    elif isinstance(value, str):
+        data = value.encode()
+        if len(data) > 0xFFFF:
+            parts.append(struct.pack(">BI", 0x0C, len(data)) + data)
+        else:
+            parts.append(struct.pack(">BH", 0x02, len(data)) + data)
+    elif isinstance(value, dict):
+        parts.append(b"\x03")
+        for key, item in value.items():
+            key = key.encode()
+            parts.append(struct.pack(">H", len(key)) + key)
+            _amf0_value(item, parts)
+        parts.append(b"\x00\x00\x09")
+    elif isinstance(value, (list, tuple)):
+        parts.append(struct.pack(">BI", 0x0A, len(value)))
+        for item in value:
+            _amf0_value(item, parts)
+    else:
+        raise TypeError(f"Can't encode {type(value).__name__} as AMF0")
+
+
+def amf0_decode(data):
+    """Decode every AMF0 item in data into a list of Python values"""
+    values = []
+    offset = 0
+    while offset < len(data):
+        value, offset = _amf0_read(data, offset)
+        values.append(value)
+    return values
+
+
+def _amf0_read(data, offset):
+    marker = data[offset]
+    offset += 1
+    if marker == 0x00:
+        return struct.unpack_from(">d", data, offset)[0], offset + 8
+    if marker == 0x01:
+        return data[offset] != 0, offset + 1
+    if marker == 0x02:
+        length = struct.unpack_from(">H", data, offset)[0]
+        return data[offset + 2:offset + 2 + length].decode(), offset + 2 + length
+    if marker == 0x0C:
+        length = struct.unpack_from(">I", data, offset)[0]
+        return data[offset + 4:offset + 4 + length].decode(), offset + 4 + length
+    if marker in (0x05, 0x06):
+        return None, offset
+    if marker in (0x03, 0x08):
+        if marker == 0x08:
+            offset += 4  # skip the ECMA array count; entries end at the object end marker
+        obj = {}
+        while True:
+            length = struct.unpack_from(">H", data, offset)[0]
+            offset += 2
+            if length == 0 and data[offset] == 0x09:
+                return obj, offset + 1
+            key = data[offset:offset + length].decode()
+            obj[key], offset = _amf0_read(data, offset + length)
+    if marker == 0x0A:
+        count = struct.unpack_from(">I", data, offset)[0]
+        offset += 4
+        items = []
+        for _ in range(count):
+            item, offset = _amf0_read(data, offset)
+            items.append(item)
+        return items, offset
+    if marker == 0x0B:
+        return struct.unpack_from(">d", data, offset)[0], offset + 10
+    raise ValueError(f"Unsupported AMF0 marker 0x{marker:02x}")
+
+
+def encode_message(csid, type_id, payload, stream_id=0, timestamp=0, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Split one message into chunks: a type 0 header, then type 3 continuations"""
+    timestamp &= 0xFFFFFFFF
+    extended = b""
+    if timestamp >= 0xFFFFFF:
+        extended = struct.pack(">I", timestamp)
+        timestamp = 0xFFFFFF
+    header = (
+        bytes([csid]) + timestamp.to_bytes(3, "big") + len(payload).to_bytes(3, "big")
+        + struct.pack("<BI", type_id, stream_id) + extended
+    )
+    if len(payload) <= chunk_size:
+        return header + payload
+    continuation = bytes([0xC0 | csid]) + extended
+    view = memoryview(payload)
+    parts = [header, view[:chunk_size]]
+    for offset in range(chunk_size, len(payload), chunk_size):
+        parts.append(continuation)
+        parts.append(view[offset:offset + chunk_size])
+    return b"".join(parts)
+
+
+class _ChunkStream:
+    __slots__ = ("timestamp", "delta", "length", "type_id", "stream_id", "extended", "buffer")
+
+    def __init__(self):
+        self.timestamp = self.delta = self.length = self.type_id = self.stream_id = 0
+        self.extended = False
+        self.buffer = bytearray()
+
+
+class RTMPConnection:
+    """Message-level RTMP over an asyncio stream pair, after the handshake.
+
+    read_message() reassembles chunks and handles protocol control
+    (chunk size, acknowledgements, pings) itself; send() writes without
+    draining so callers decide when to wait for the socket.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.in_chunk_size = DEFAULT_CHUNK_SIZE
+        self.out_chunk_size = DEFAULT_CHUNK_SIZE
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.ack_window = 0
+        self.peer_acked = 0
+        self._last_ack = 0
+        self._chunk_streams = {}
+
+    async def _read(self, size):
+        data = await self.reader.readexactly(size)
+        self.bytes_read += size
+        return data
+
+    def send(self, csid, type_id, payload, stream_id=0, timestamp=0):
+        data = encode_message(csid, type_id, payload, stream_id, timestamp, self.out_chunk_size)
+        self.writer.write(data)
+        self.bytes_written += len(data)
+
+    async def drain(self):
+        await self.writer.drain()
+
+    def send_command(self, name, transaction, *args, stream_id=0):
+        self.send(CSID_COMMAND, COMMAND_AMF0, amf0_encode(name, transaction, *args), stream_id)
+
+    def set_chunk_size(self, size):
+        self.send(CSID_CONTROL, SET_CHUNK_SIZE, struct.pack(">I", size))
+        self.out_chunk_size = size
+
+    def set_ack_window(self, size):
+        """Ask the peer to acknowledge every `size` bytes it receives from us"""
+        self.send(CSID_CONTROL, WINDOW_ACK_SIZE, struct.pack(">I", size))
+
+    async def read_message(self):
+        """Return the next complete (type_id, stream_id, timestamp, payload)"""
+        while True:
+            first = (await self._read(1))[0]
+            fmt, csid = first >> 6, first & 0x3F
+            if csid == 0:
+                csid = 64 + (await self._read(1))[0]
+            elif csid == 1:
+                extra = await self._read(2)
+                csid = 64 + extra[0] + extra[1] * 256
+
+            chunk = self._chunk_streams.get(csid)
+            if chunk is None:
+                if fmt != 0:
+                    raise ConnectionError(f"Chunk stream {csid} started without a full header")
+                chunk = self._chunk_streams[csid] = _ChunkStream()
+
+            starting = not chunk.buffer
+            if fmt < 3:
+                header = await self._read((11, 7, 3)[fmt])
+                value = int.from_bytes(header[:3], "big")
+                if fmt < 2:
+                    chunk.length = int.from_bytes(header[3:6], "big")
+                    chunk.type_id = header[6]
+                if fmt == 0:
+                    chunk.stream_id = int.from_bytes(header[7:11], "little")
+                chunk.extended = value == 0xFFFFFF
+                if chunk.extended:
+                    value = struct.unpack(">I", await self._read(4))[0]
+                if fmt == 0:
+                    chunk.timestamp, chunk.delta = value, 0
+                else:
+                    chunk.delta = value
+                    chunk.timestamp = (chunk.timestamp + value) & 0xFFFFFFFF
+            else:
+                if chunk.extended:
+                    await self._read(4)
+                if starting and chunk.delta:
+                    chunk.timestamp = (chunk.timestamp + chunk.delta) & 0xFFFFFFFF
+
+            size = min(self.in_chunk_size, chunk.length - len(chunk.buffer))
+            chunk.buffer += await self._read(size)
+            if len(chunk.buffer) < chunk.length:
+                continue
+
+            payload = bytes(chunk.buffer)
+            chunk.buffer.clear()
+            self._handle_control(chunk.type_id, payload)
+            return chunk.type_id, chunk.stream_id, chunk.timestamp, payload
+
+    def _handle_control(self, type_id, payload):
+        if type_id == SET_CHUNK_SIZE:
+            self.in_chunk_size = struct.unpack(">I", payload[:4])[0] & 0x7FFFFFFF
+        elif type_id == WINDOW_ACK_SIZE:
+            self.ack_window = struct.unpack(">I", payload[:4])[0]
+        elif type_id == ACK:
+            self.peer_acked = struct.unpack(">I", payload[:4])[0]
+        elif type_id == USER_CONTROL and payload[:2] == struct.pack(">H", PING_REQUEST):
+            self.send(CSID_CONTROL, USER_CONTROL, struct.pack(">H", PING_RESPONSE) + payload[2:6])
+
+        if self.ack_window and self.bytes_read - self._last_ack >= self.ack_window:
+            self._last_ack = self.bytes_read
+            self.send(CSID_CONTROL, ACK, struct.pack(">I", self.bytes_read & 0xFFFFFFFF))
+
+    async def read_command(self):
+        """Skip non-command messages; return (stream_id, [name, transaction, *args])"""
+        while True:
+            type_id, stream_id, _, payload = await self.read_message()
+            if type_id == COMMAND_AMF0:
+                return stream_id, amf0_decode(payload)
+
+
+async def close_writer(writer):
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except (ConnectionError, OSError):
+        pass
+
+
+def run(coro):
+    """asyncio.run that also works when a loop is already running in this thread"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    import concurrent.futures
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
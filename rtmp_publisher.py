@@ -0,0 +1,263 @@
+"""Synthetic RTMP publisher for checking that an ingest can sustain a bitrate.
+
+Connects to a generated destination, performs the handshake, connect,
+createStream and publish, then pushes synthetic FLV audio/video tags
+(H.264/AAC framing around random bytes) paced in real time. The report
+gives the achieved throughput next to the target, how often and how long
+the socket send buffer stalled, and the send-time jitter of the tags.
+"""
+import asyncio
+import os
+import socket
+import time
+
+from rtmp_protocol import (
+    AUDIO, CSID_AUDIO, CSID_DATA, CSID_VIDEO, DATA_AMF0, DEFAULT_WINDOW, VIDEO,
+    RTMPConnection, amf0_encode, client_handshake, close_writer, run, split_host_port
+)
+
+DEFAULT_BITRATE_KBPS = 6000
+DEFAULT_DURATION = 10.0
+DEFAULT_FPS = 30
+DEFAULT_TIMEOUT = 5.0
+
+PUBLISH_CHUNK_SIZE = 4096
+AUDIO_KBPS = 128
+AUDIO_SAMPLE_RATE = 44100
+AAC_FRAME_MS = 1024 * 1000 / AUDIO_SAMPLE_RATE
+KEYFRAME_INTERVAL = 2.0
+KEYFRAME_WEIGHT = 4
+# A drain() that waits this long means the socket send buffer was full
+STALL_THRESHOLD = 0.005
+# Bounded like an encoder's output queue, so a link that can't keep up
+# shows up as stalls within seconds instead of vanishing into the kernel's
+# auto-tuned (multi-megabyte) send buffer
+SEND_BUFFER = 128 * 1024
+# Achieved throughput within this fraction of the target counts as sustained
+SUSTAINED_RATIO = 0.95
+
+# FLV tag bodies: AVC keyframe/inter frame NALU, AAC raw frame, and the
+# sequence headers (AVCDecoderConfigurationRecord / AudioSpecificConfig)
+VIDEO_KEYFRAME = b"\x17\x01\x00\x00\x00"
+VIDEO_INTERFRAME = b"\x27\x01\x00\x00\x00"
+VIDEO_SEQUENCE_HEADER = b"\x17\x00\x00\x00\x00\x01\x64\x00\x1f\xff\xe1\x00\x04\x67\x64\x00\x1f\x01\x00\x04\x68\xee\x3c\x80"
+AUDIO_FRAME = b"\xaf\x01"
+AUDIO_SEQUENCE_HEADER = b"\xaf\x00\x12\x10"
+
+
+def synthetic_tags(bitrate_kbps, duration, fps=DEFAULT_FPS):
+    """Yield (timestamp_ms, type_id, payload) in timestamp order"""
+    audio_kbps = min(AUDIO_KBPS, bitrate_kbps / 4)
+    video_bytes = (bitrate_kbps - audio_kbps) * 1000 / 8 / fps
+    audio_bytes = max(1, int(audio_kbps * 1000 / 8 * AAC_FRAME_MS / 1000))
+
+    gop = max(1, int(fps * KEYFRAME_INTERVAL))
+    keyframe_bytes = int(video_bytes * min(KEYFRAME_WEIGHT, gop))
+    interframe_bytes = int((video_bytes * gop - keyframe_bytes) / (gop - 1)) if gop > 1 else keyframe_bytes
+    noise = os.urandom(max(keyframe_bytes, interframe_bytes, audio_bytes))
+
+    yield 0, VIDEO, VIDEO_SEQUENCE_HEADER
+    yield 0, AUDIO, AUDIO_SEQUENCE_HEADER
+
+    end = duration * 1000
+    frame = audio_frame = 0
+    while True:
+        video_ts = frame * 1000 / fps
+        audio_ts = audio_frame * AAC_FRAME_MS
+        if min(video_ts, audio_ts) >= end:
+            return
+        if video_ts <= audio_ts:
+            if frame % gop == 0:
+                yield int(video_ts), VIDEO, VIDEO_KEYFRAME + noise[:keyframe_bytes]
+            else:
+                yield int(video_ts), VIDEO, VIDEO_INTERFRAME + noise[:interframe_bytes]
+            frame += 1
+        else:
+            yield int(audio_ts), AUDIO, AUDIO_FRAME + noise[:audio_bytes]
+            audio_frame += 1
+
+
+async def _expect_result(conn, transaction):
+    while True:
+        _, values = await conn.read_command()
+        if len(values) < 2 or values[1] != transaction:
+            continue
+        if values[0] == "_error":
+            info = values[3] if len(values) > 3 and isinstance(values[3], dict) else {}
+            raise ConnectionError(info.get("description") or info.get("code") or "Command rejected")
+        return values
+
+
+def _status_error(values):
+    info = values[3] if len(values) > 3 and isinstance(values[3], dict) else {}
+    if info.get("level") == "error":
+        return ConnectionError(info.get("description") or info.get("code"))
+    return None
+
+
+async def _start_publish(conn, server, app_name, stream_key):
+    """connect + createStream + publish; returns the message stream id"""
+    conn.set_chunk_size(PUBLISH_CHUNK_SIZE)
+    conn.send_command("connect", 1, {
+        "app": app_name,
+        "type": "nonprivate",
+        "flashVer": "FMLE/3.0 (compatible; rtmp_mp)",
+        "tcUrl": f"rtmp://{server}/{app_name}"
+    })
+    await conn.drain()
+    await _expect_result(conn, 1)
+
+    conn.set_ack_window(DEFAULT_WINDOW)
+    conn.send_command("releaseStream", 2, None, stream_key)
+    conn.send_command("FCPublish", 3, None, stream_key)
+    conn.send_command("createStream", 4, None)
+    await conn.drain()
+    values = await _expect_result(conn, 4)
+    if len(values) < 4 or not isinstance(values[3], (int, float)):
+        raise ConnectionError("createStream returned no stream id")
+    stream_id = int(values[3])
+
+    conn.send_command("publish", 5, None, stream_key, "live", stream_id=stream_id)
+    await conn.drain()
+    while True:
+        _, values = await conn.read_command()
+        if not values or values[0] != "onStatus":
+            continue
+        error = _status_error(values)
+        if error:
+            raise error
+        info = values[3] if len(values) > 3 and isinstance(values[3], dict) else {}
+        if info.get("code") == "NetStream.Publish.Start":
+            return stream_id
+
+
+async def _watch_server(conn):
+    """Keep reading while publishing so acks and pings are handled"""
+    while True:
+        _, values = await conn.read_command()
+        if values and values[0] == "onStatus":
+            error = _status_error(values)
+            if error:
+                raise error
+
+
+async def _send_media(conn, stream_id, watcher, bitrate_kbps, duration, fps, result):
+    conn.send(CSID_DATA, DATA_AMF0, amf0_encode("@setDataFrame", "onMetaData", {
+        "width": 1280,
+        "height": 720,
+        "framerate": fps,
+        "videocodecid": 7,
+        "videodatarate": bitrate_kbps - min(AUDIO_KBPS, bitrate_kbps / 4),
+        "audiocodecid": 10,
+        "audiodatarate": min(AUDIO_KBPS, bitrate_kbps / 4),
+        "audiosamplerate": AUDIO_SAMPLE_RATE,
+        "stereo": True
+    }), stream_id)
+
+    media_bytes = tags = stalls = 0
+    stall_time = 0.0
+    late = []
+    start = time.perf_counter()
+    for timestamp, type_id, payload in synthetic_tags(bitrate_kbps, duration, fps):
+        due = start + timestamp / 1000
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if watcher.done():
+            watcher.result()  # re-raises whatever ended the server side
+
+        late.append(time.perf_counter() - due)
+        conn.send(CSID_VIDEO if type_id == VIDEO else CSID_AUDIO, type_id, payload, stream_id, timestamp)
+        media_bytes += len(payload)
+        tags += 1
+
+        before = time.perf_counter()
+        await conn.drain()
+        blocked = time.perf_counter() - before
+        if blocked >= STALL_THRESHOLD:
+            stalls += 1
+            stall_time += blocked
+    elapsed = time.perf_counter() - start
+
+    # Falling behind stretches the run past `duration`, lowering the rate
+    achieved = media_bytes * 8 / 1000 / max(elapsed, duration)
+    result.update({
+        "duration_s": elapsed,
+        "achieved_kbps": achieved,
+        "sustained": achieved >= bitrate_kbps * SUSTAINED_RATIO,
+        "media_bytes": media_bytes,
+        "tags": tags,
+        "stalls": stalls,
+        "stall_ms": stall_time * 1000,
+        "jitter_ms": sum(abs(b - a) for a, b in zip(late, late[1:])) / max(len(late) - 1, 1) * 1000,
+        "max_late_ms": max(late, default=0.0) * 1000
+    })
+
+
+async def publish(server, app_name, stream_key, bitrate_kbps=DEFAULT_BITRATE_KBPS,
+                  duration=DEFAULT_DURATION, fps=DEFAULT_FPS, timeout=DEFAULT_TIMEOUT):
+    """Publish synthetic media to rtmp://server/app_name/stream_key and return a report dict"""
+    result = {
+        "server": server,
+        "app_name": app_name,
+        "ok": False,
+        "target_kbps": bitrate_kbps,
+        "connect_ms": None,
+        "handshake_ms": None,
+        "publish_ms": None,
+        "error": None
+    }
+    writer = None
+    try:
+        try:
+            host, port = split_host_port(server)
+        except ValueError:
+            result["error"] = "Invalid server address"
+            return result
+        start = time.perf_counter()
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        connected = time.perf_counter()
+        result["connect_ms"] = (connected - start) * 1000
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER)
+
+        await asyncio.wait_for(client_handshake(reader, writer), timeout)
+        shaken = time.perf_counter()
+        result["handshake_ms"] = (shaken - connected) * 1000
+
+        conn = RTMPConnection(reader, writer)
+        stream_id = await asyncio.wait_for(_start_publish(conn, server, app_name, stream_key), timeout)
+        result["publish_ms"] = (time.perf_counter() - shaken) * 1000
+
+        watcher = asyncio.ensure_future(_watch_server(conn))
+        try:
+            await _send_media(conn, stream_id, watcher, bitrate_kbps, duration, fps, result)
+            conn.send_command("FCUnpublish", 6, None, stream_key)
+            conn.send_command("deleteStream", 7, None, stream_id)
+            await conn.drain()
+        finally:
+            watcher.cancel()
+        result["wire_bytes"] = conn.bytes_written
+        result["acked_bytes"] = conn.peer_acked
+        result["ok"] = True
+    except asyncio.TimeoutError:
+        result["error"] = f"Timed out after {timeout:g}s"
+    except asyncio.IncompleteReadError:
+        result["error"] = "Connection closed by server"
+    except (OSError, ConnectionError) as e:
+        result["error"] = str(e) or type(e).__name__
+    finally:
+        if writer is not None:
+            await close_writer(writer)
+    return result
+
+
+def publish_config(generator, config, **options):
+    target = generator.target(config)
+    if target is None:
+        raise ValueError(f"Unknown platform {config.get('platform')!r}")
+    result = run(publish(*target, **options))
+    if config.get("name"):
+        result["config"] = config["name"]
+    return result
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""Local stand-in for an RTMP ingest server.
+
+Accepts connections, completes the RTMP handshake, answers connect,
+createStream and publish, and then discards the media the client sends.
+Per-publisher byte counts are kept so receive rates can be reported, and
+latency (before every command response) or a per-connection bandwidth cap
+can be injected to see how publishers behave on a poor link. Useful for
+exercising the prober and publisher offline, including load tests with
+hundreds of concurrent publishers:
+
+    python rtmp_standin.py --port 1935 --latency 0.05 --bandwidth-kbps 4000 --report-interval 5
+"""
+import argparse
+import asyncio
+import socket
+import statistics
+import struct
+import time
+
+from rtmp_protocol import (
+    AUDIO, COMMAND_AMF0, CSID_CONTROL, DATA_AMF0, DEFAULT_WINDOW, SET_PEER_BANDWIDTH,
+    VIDEO, WINDOW_ACK_SIZE, RTMPConnection, amf0_decode, close_writer, server_handshake
+)
+
+SERVER_CHUNK_SIZE = 4096
+MEDIA_TYPES = (AUDIO, VIDEO, DATA_AMF0)
+# Room for hundreds of publishers connecting at once
+ACCEPT_BACKLOG = 1024
+# Receive buffer under a bandwidth cap, small enough that the cap reaches
+# the publisher as back-pressure rather than being buffered here
+CAPPED_RECEIVE_BUFFER = 32 * 1024
+
+
+class StandInServer:
+    def __init__(self, host="127.0.0.1", port=0, handshake_delay=0.0, latency=0.0, bandwidth_kbps=0):
+        self.host = host
+        self.port = port
+        self.handshake_delay = handshake_delay
+        self.latency = latency
+        self.bandwidth_kbps = bandwidth_kbps
+        self.handshakes = 0
+        self.publishes = 0
+        self.media_bytes = 0
+        self.sessions = []
+        self._server = None
+        self._tasks = set()
+
+    async def start(self):
+        limit = CAPPED_RECEIVE_BUFFER if self.bandwidth_kbps else 2 ** 16
+        self._server = await asyncio.start_server(
+            self._handle, self.host, self.port, limit=limit, backlog=ACCEPT_BACKLOG
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        # Sessions held back by the bandwidth cap can outlive their clients
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    @property
+    def address(self):
+        return f"{self.host}:{self.port}"
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        try:
+            if self.handshake_delay:
+                await asyncio.sleep(self.handshake_delay)
+            await server_handshake(reader, writer)
+            self.handshakes += 1
+            await self.handle_session(reader, writer)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            # Ending quietly keeps asyncio from logging the stop() cancellation
+            # as an unhandled client_connected_cb error
+            pass
+        finally:
+            self._tasks.discard(task)
+            await close_writer(writer)
+
+    def publishers(self):
+        """Per-publisher stats: stream name, bytes received and receive rate"""
+        stats = []
+        for session in self.sessions:
+            if not session["stream"]:
+                continue
+            first, last = session["first_media"], session["last_media"]
+            span = last - first if first is not None else 0.0
+            stats.append(dict(session, kbps=session["media_bytes"] * 8 / 1000 / span if span > 0 else 0.0))
+        return stats
+
+    async def handle_session(self, reader, writer):
+        conn = RTMPConnection(reader, writer)
+        peer = writer.get_extra_info("peername") or ("", 0)
+        session = {
+            "peer": f"{peer[0]}:{peer[1]}",
+            "app": "",
+            "stream": "",
+            "streams": 0,
+            "media_bytes": 0,
+            "first_media": None,
+            "last_media": None,
+            "active": True
+        }
+        self.sessions.append(session)
+        sock = writer.get_extra_info("socket")
+        if self.bandwidth_kbps and sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, CAPPED_RECEIVE_BUFFER)
+        started = time.monotonic()
+        try:
+            while True:
+                type_id, stream_id, _, payload = await conn.read_message()
+                if self.bandwidth_kbps:
+                    # Stop reading until the cap allows what was already read;
+                    # TCP back-pressure then slows the publisher down
+                    wait = started + conn.bytes_read * 8 / (self.bandwidth_kbps * 1000) - time.monotonic()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                if type_id in MEDIA_TYPES:
+                    now = time.monotonic()
+                    if session["first_media"] is None:
+                        session["first_media"] = now
+                    session["last_media"] = now
+                    session["media_bytes"] += len(payload)
+                    self.media_bytes += len(payload)
+                elif type_id == COMMAND_AMF0:
+                    await self.handle_command(conn, session, stream_id, amf0_decode(payload))
+        finally:
+            session["active"] = False
+
+    async def handle_command(self, conn, session, stream_id, values):
+        name, transaction, *args = values
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if name == "connect":
+            if args and isinstance(args[0], dict):
+                session["app"] = args[0].get("app", "")
+            conn.send(CSID_CONTROL, WINDOW_ACK_SIZE, struct.pack(">I", DEFAULT_WINDOW))
+            conn.send(CSID_CONTROL, SET_PEER_BANDWIDTH, struct.pack(">IB", DEFAULT_WINDOW, 2))
+            conn.set_chunk_size(SERVER_CHUNK_SIZE)
+            conn.send_command("_result", transaction,
+                              {"fmsVer": "FMS/3,0,1,123", "capabilities": 31},
+                              _status("NetConnection.Connect.Success", "Connection succeeded."))
+        elif name == "createStream":
+            session["streams"] += 1
+            conn.send_command("_result", transaction, None, session["streams"])
+        elif name == "publish":
+            self.publishes += 1
+            session["stream"] = args[1] if len(args) > 1 else ""
+            conn.send_command("onStatus", 0, None,
+                              _status("NetStream.Publish.Start", f"{session['stream']} is now published."),
+                              stream_id=stream_id)
+        elif transaction:
+            # releaseStream, FCPublish and friends only need an answer
+            conn.send_command("_result", transaction, None)
+        await conn.drain()
+
+
+def _status(code, description):
+    return {"level": "status", "code": code, "description": description}
+
+
+async def report_rates(server, interval):
+    """Print publisher receive rates over each interval"""
+    previous = {}
+    while True:
+        await asyncio.sleep(interval)
+        rates = []
+        for session in server.sessions:
+            if session["active"] and session["stream"]:
+                received = session["media_bytes"] - previous.get(id(session), 0)
+                previous[id(session)] = session["media_bytes"]
+                rates.append(received * 8 / 1000 / interval)
+        if rates:
+            print(f"📊 {len(rates)} publishing   total {sum(rates):10.1f} kbps   per publisher "
+                  f"min {min(rates):.1f} / median {statistics.median(rates):.1f} / max {max(rates):.1f} kbps")
+
+
+async def serve(host, port, handshake_delay, latency, bandwidth_kbps, report_interval):
+    server = await StandInServer(host, port, handshake_delay, latency, bandwidth_kbps).start()
+    print(f"🎥 RTMP stand-in listening on rtmp://{server.address}/")
+    if report_interval:
+        asyncio.ensure_future(report_rates(server, report_interval))
+    await server._server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in RTMP ingest server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1935)
+    parser.add_argument("--handshake-delay", type=float, default=0.0, help="Seconds to wait before answering the handshake")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before answering each command")
+    parser.add_argument("--bandwidth-kbps", type=int, default=0, help="Per-publisher receive cap (default: unlimited)")
+    parser.add_argument("--report-interval", type=float, default=0.0, help="Print publisher receive rates every N seconds")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.handshake_delay, args.latency,
+                          args.bandwidth_kbps, args.report_interval))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""Simulcast planning: one program feed pushed to several destinations.
+
+plan_simulcast() takes destinations (each with a quality profile from
+PROFILES) and an uplink budget, and works out:
+
+- which distinct encodes are needed (destinations on the same profile
+  share one encode, duplicated by ffmpeg's tee muxer)
+- the aggregate upload bitrate, including RTMP/TCP overhead
+- the encoder load, in 1080p30-equivalents of pixel rate
+- warnings for oversubscribed uplinks, platform bitrate caps and encoder
+  capacity
+
+With auto_downscale it steps destinations down the profile ladder,
+highest bitrate and lowest priority (latest in the list) first, until the
+plan fits the budget. Planning is pure: it takes plain dicts, does no I/O,
+and can be exercised offline. destinations_from_configs() and
+measure_uplink() connect it to the store and the network;
+ffmpeg_command() and vmix_destinations() render a plan.
+"""
+import shlex
+
+from profile_export import vmix_destination
+
+# Highest first: auto-downscale walks down this ladder
+PROFILES = {
+    "1080p60": {"width": 1920, "height": 1080, "fps": 60, "video_kbps": 6000, "audio_kbps": 160},
+    "1080p30": {"width": 1920, "height": 1080, "fps": 30, "video_kbps": 4500, "audio_kbps": 160},
+    "720p60": {"width": 1280, "height": 720, "fps": 60, "video_kbps": 4500, "audio_kbps": 128},
+    "720p30": {"width": 1280, "height": 720, "fps": 30, "video_kbps": 3000, "audio_kbps": 128},
+    "480p30": {"width": 854, "height": 480, "fps": 30, "video_kbps": 1500, "audio_kbps": 128},
+    "360p30": {"width": 640, "height": 360, "fps": 30, "video_kbps": 800, "audio_kbps": 96},
+}
+LADDER = list(PROFILES)
+DEFAULT_PROFILE = "1080p30"
+
+# Highest video bitrate each platform ingests
+PLATFORM_MAX_VIDEO_KBPS = {"twitch": 6000, "facebook": 9000, "youtube": 51000}
+# RTMP chunk headers plus TCP/IP framing on top of the media bitrate
+PROTOCOL_OVERHEAD = 0.05
+# Fraction of the uplink a plan may use, leaving room for bursts and other traffic
+DEFAULT_HEADROOM = 0.8
+VMIX_MAX_DESTINATIONS = 3
+REFERENCE_PIXEL_RATE = 1920 * 1080 * 30
+
+
+def profile_kbps(name):
+    profile = PROFILES[name]
+    return profile["video_kbps"] + profile["audio_kbps"]
+
+
+def wire_kbps(name):
+    return round(profile_kbps(name) * (1 + PROTOCOL_OVERHEAD))
+
+
+def encoder_load(name):
+    profile = PROFILES[name]
+    return profile["width"] * profile["height"] * profile["fps"] / REFERENCE_PIXEL_RATE
+
+
+def _highest_within(platform, name):
+    """The highest profile at or below name that the platform accepts, or None"""
+    cap = PLATFORM_MAX_VIDEO_KBPS.get(platform)
+    for candidate in LADDER[LADDER.index(name):]:
+        if cap is None or PROFILES[candidate]["video_kbps"] <= cap:
+            return candidate
+    return None
+
+
+def plan_simulcast(destinations, uplink_kbps=None, headroom=DEFAULT_HEADROOM,
+                   encoder_capacity=None, auto_downscale=True):
+    """Plan a simulcast; returns a dict with outputs, encodes, totals and warnings.
+
+    destinations are dicts with name, platform, rtmp_url and profile (a key
+    of PROFILES, default 1080p30), in priority order. uplink_kbps is the
+    measured or declared upload capacity (None: no budget check), and
+    encoder_capacity the encoder's limit in 1080p30-equivalents.
+    """
+    warnings = []
+    outputs = []
+    for destination in destinations:
+        requested = destination.get("profile") or DEFAULT_PROFILE
+        if requested not in PROFILES:
+            raise ValueError(f"Unknown profile {requested!r} for {destination['name']!r} "
+                             f"(choose from {', '.join(LADDER)})")
+        outputs.append(dict(destination, requested_profile=requested, profile=requested))
+
+    for output in outputs:
+        allowed = _highest_within(output["platform"], output["profile"])
+        if allowed == output["profile"]:
+            continue
+        cap = PLATFORM_MAX_VIDEO_KBPS[output["platform"]]
+        if auto_downscale and allowed is not None:
+            output["profile"] = allowed
+            warnings.append(f"{output['name']}: {output['requested_profile']} exceeds {output['platform']}'s "
+                            f"{cap} kbps video limit; using {allowed}")
+        else:
+            warnings.append(f"{output['name']}: {output['profile']} exceeds {output['platform']}'s {cap} kbps video limit")
+
+    budget_kbps = round(uplink_kbps * headroom) if uplink_kbps else None
+    if budget_kbps is not None and auto_downscale:
+        total = sum(wire_kbps(output["profile"]) for output in outputs)
+        while total > budget_kbps:
+            candidates = [
+                (wire_kbps(output["profile"]), position, output)
+                for position, output in enumerate(outputs)
+                if output["profile"] != LADDER[-1]
+            ]
+            if not candidates:
+                break
+            kbps, _, output = max(candidates, key=lambda candidate: candidate[:2])
+            output["profile"] = LADDER[LADDER.index(output["profile"]) + 1]
+            total += wire_kbps(output["profile"]) - kbps
+
+    for output in outputs:
+        output["video_kbps"] = PROFILES[output["profile"]]["video_kbps"]
+        output["audio_kbps"] = PROFILES[output["profile"]]["audio_kbps"]
+        output["wire_kbps"] = wire_kbps(output["profile"])
+        output["downscaled"] = output["profile"] != output["requested_profile"]
+
+    # Destinations on the same profile share one encode
+    encodes = []
+    for name in LADDER:
+        names = [output["name"] for output in outputs if output["profile"] == name]
+        if names:
+            encodes.append({"profile": name, "destinations": names, "load": round(encoder_load(name), 2)})
+
+    total_kbps = sum(output["wire_kbps"] for output in outputs)
+    load = round(sum(encode["load"] for encode in encodes), 2)
+    fits = budget_kbps is None or total_kbps <= budget_kbps
+    if not fits:
+        warnings.append(f"Needs {total_kbps} kbps but the budget is {budget_kbps} kbps "
+                        f"({headroom:.0%} of {uplink_kbps} kbps uplink)"
+                        + ("; even the lowest profiles don't fit, drop destinations" if auto_downscale else ""))
+    if encoder_capacity is not None and load > encoder_capacity:
+        warnings.append(f"{len(encodes)} encode(s) need {load} x 1080p30 of encoder capacity, more than {encoder_capacity}")
+    if len(outputs) > VMIX_MAX_DESTINATIONS:
+        warnings.append(f"vMix streams to at most {VMIX_MAX_DESTINATIONS} destinations; "
+                        f"use the ffmpeg plan for all {len(outputs)}")
+
+    return {
+        "outputs": outputs,
+        "encodes": encodes,
+        "total_kbps": total_kbps,
+        "uplink_kbps": uplink_kbps,
+        "budget_kbps": budget_kbps,
+        "encoder_load": load,
+        "fits": fits,
+        "warnings": warnings
+    }
+
+
+def destinations_from_configs(generator, configs, profiles=None, default_profile=DEFAULT_PROFILE):
+    """Simulcast destinations for saved configs; profiles maps config name to profile"""
+    profiles = profiles or {}
+    destinations = []
+    for config in configs:
+        target = generator.target(config)
+        if target is None:
+            raise ValueError(f"Config {config['name']!r} has unknown platform {config.get('platform')!r}")
+        server, app_name, stream_key = target
+        destinations.append({
+            "name": config["name"],
+            "platform": config["platform"],
+            "server": server,
+            "app_name": app_name,
+            "stream_key": stream_key,
+            "rtmp_url": f"rtmp://{server}/{app_name}/{stream_key}",
+            "profile": profiles.get(config["name"], default_profile)
+        })
+    return destinations
+
+
+def measure_uplink(generator, config, target_kbps, duration=10.0):
+    """Push target_kbps of synthetic media to config's ingest; returns the publisher report"""
+    import rtmp_publisher
+
+    return rtmp_publisher.publish_config(generator, config, bitrate_kbps=target_kbps, duration=duration)
+
+
+def _tee_escape(url):
+    # Characters the tee muxer treats as syntax inside its output list
+    for char in "\\|[]":
+        url = url.replace(char, "\\" + char)
+    return url
+
+
+def ffmpeg_command(plan, input_url="INPUT", preset="veryfast", keyframe_seconds=2):
+    """ffmpeg argv encoding each profile once and tee-ing it to its destinations"""
+    encodes = plan["encodes"]
+    outputs = {output["name"]: output for output in plan["outputs"]}
+    argv = ["ffmpeg", "-re", "-i", input_url]
+
+    labels = [f"v{i}" for i in range(len(encodes))]
+    scaled = [
+        f"scale={PROFILES[encode['profile']]['width']}:{PROFILES[encode['profile']]['height']},"
+        f"fps={PROFILES[encode['profile']]['fps']}"
+        for encode in encodes
+    ]
+    if len(encodes) == 1:
+        graph = f"[0:v]{scaled[0]}[{labels[0]}]"
+    else:
+        split = "".join(f"[s{i}]" for i in range(len(encodes)))
+        graph = ";".join([f"[0:v]split={len(encodes)}{split}"] + [
+            f"[s{i}]{filters}[{label}]" for i, (filters, label) in enumerate(zip(scaled, labels))
+        ])
+    argv += ["-filter_complex", graph]
+
+    for encode, label in zip(encodes, labels):
+        profile = PROFILES[encode["profile"]]
+        video_kbps = profile["video_kbps"]
+        tee = "|".join(
+            f"[f=flv:onfail=ignore]{_tee_escape(outputs[name]['rtmp_url'])}" for name in encode["destinations"]
+        )
+        argv += [
+            "-map", f"[{label}]", "-map", "0:a",
+            "-c:v", "libx264", "-preset", preset,
+            "-b:v", f"{video_kbps}k", "-maxrate", f"{video_kbps}k", "-bufsize", f"{video_kbps * 2}k",
+            "-g", str(profile["fps"] * keyframe_seconds), "-pix_fmt", "yuv420p",
+            "-c:a", "aac", "-b:a", f"{profile['audio_kbps']}k", "-ar", "48000",
+            "-flags", "+global_header", "-f", "tee", tee
+        ]
+    return argv
+
+
+def ffmpeg_shell(plan, input_url="INPUT", **options):
+    return shlex.join(ffmpeg_command(plan, input_url, **options))
+
+
+def vmix_destinations(plan):
+    """vMix <Destinations> XML for the plan, each with its profile noted"""
+    parts = ['<?xml version="1.0" encoding="utf-8"?>\n<Destinations>\n']
+    for output in plan["outputs"][:VMIX_MAX_DESTINATIONS]:
+        parts.append(f"  <!-- {output['profile']}: {output['video_kbps']} kbps video, "
+                     f"{output['audio_kbps']} kbps audio -->\n")
+        parts.append(vmix_destination(
+            output["name"], output["platform"], output["server"], output["app_name"], output["stream_key"]
+        ))
+    parts.append("</Destinations>\n")
+    return "".join(parts)
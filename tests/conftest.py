@@ -0,0 +1,7 @@
+"""Shared pytest setup: the modules under test live in the repo root"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
@@ -0,0 +1,126 @@
+"""ConfigWatcher and a watched ConfigIndex driven by real watchdog events.
+
+A second store object on the same directory stands in for another
+process (the CLI container) writing to the shared volume.
+"""
+import time
+
+import pytest
+
+pytest.importorskip("watchdog")
+
+import config_watch
+from config_index import ConfigIndex
+from config_store import STORE_SECONDS, get_config_store
+
+CONFIGS = 200
+CHANGED = 5
+
+
+def make_config(name, stream_key):
+    return {
+        "name": name,
+        "platform": "custom",
+        "stream_key": stream_key,
+        "server_url": "live.example.com",
+        "app_name": "live",
+        "rtmp_url": f"rtmp://live.example.com/live/{stream_key}",
+    }
+
+
+def parses():
+    return STORE_SECONDS.count("json", "load")
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def wait_applied(watcher, condition=lambda: True, timeout=10.0):
+    # Events arrive asynchronously: wait for the expected state, then until
+    # nothing is pending and no debounce timer is armed
+    assert wait_for(condition, timeout)
+    time.sleep(watcher.debounce)
+    assert wait_for(lambda: not watcher._pending and watcher._timer is None, timeout)
+
+
+@pytest.fixture
+def config_dir(tmp_path):
+    get_config_store("json", tmp_path).save_many(
+        [make_config(f"config-{i:06d}", f"key-{i}") for i in range(CONFIGS)]
+    )
+    return tmp_path
+
+
+@pytest.fixture
+def watched(config_dir):
+    store = get_config_store("json", config_dir)
+    watcher = config_watch.ConfigWatcher(store).start()
+    index = ConfigIndex.from_watcher(watcher)
+    yield store, get_config_store("json", config_dir), watcher, index
+    watcher.stop()
+
+
+def test_initial_load_parses_every_file_once(config_dir):
+    store = get_config_store("json", config_dir)
+    before = parses()
+    watcher = config_watch.ConfigWatcher(store).start()
+    try:
+        assert parses() - before == CONFIGS
+        assert len(watcher) == CONFIGS
+    finally:
+        watcher.stop()
+
+
+def test_external_changes_reparse_only_changed_files(watched):
+    store, other, watcher, index = watched
+    edited = [f"config-{i:06d}" for i in range(CHANGED)]
+    added = [f"new-{i}" for i in range(CHANGED)]
+    removed = [f"config-{i:06d}" for i in range(CONFIGS - CHANGED, CONFIGS)]
+    before, rescans = parses(), STORE_SECONDS.count("json", "list_index")
+
+    other.save_many([make_config(name, "rotated") for name in edited + added])
+    for name in removed:
+        other.delete(name)
+    wait_applied(watcher, lambda: all(watcher.get(name) is None for name in removed)
+                 and all(watcher.get(name) is not None for name in added))
+
+    assert parses() - before == len(edited) + len(added)
+    assert all(watcher.get(name)["stream_key"] == "rotated" for name in edited + added)
+    assert all(watcher.get(name) is None for name in removed)
+    assert all(name in index for name in added)
+    assert not any(name in index for name in removed)
+    assert len(index) == CONFIGS
+    assert index.is_fresh()
+    assert STORE_SECONDS.count("json", "list_index") == rescans
+
+
+def test_own_saves_reparse_nothing(watched):
+    store, other, watcher, index = watched
+    names = [f"config-{i:06d}" for i in range(CHANGED)]
+    before = parses()
+
+    for name in names:
+        store.save(dict(watcher.get(name), stream_key="own"))
+    wait_applied(watcher)
+
+    assert parses() == before
+    assert all(watcher.get(name)["stream_key"] == "own" for name in names)
+
+
+def test_bursts_are_debounced(watched):
+    store, other, watcher, index = watched
+    names = [f"config-{i:06d}" for i in range(CHANGED)]
+    before = parses()
+
+    for round_number in range(20):
+        other.save_many([dict(watcher.get(name), stream_key=f"burst-{round_number}") for name in names])
+    wait_applied(watcher, lambda: all(watcher.get(name)["stream_key"] == "burst-19" for name in names))
+
+    assert parses() - before <= 2 * len(names)
+    assert all(watcher.get(name)["stream_key"] == "burst-19" for name in names)
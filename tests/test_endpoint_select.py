@@ -0,0 +1,161 @@
+"""EndpointSelector against a fake probe, and configs saved on a chosen endpoint"""
+import asyncio
+
+import pytest
+
+from config_store import get_config_store
+from ingest_select import EndpointSelector, build_fastest
+from key_rotation import plan_rotation
+from rtmp_core import RTMPGenerator
+
+TTL = 300.0
+
+
+class FakeProbe:
+    """Stands in for probe_many: latencies[endpoint] is the RTT in ms, or None to fail"""
+
+    def __init__(self, latencies):
+        self.latencies = dict(latencies)
+        self.calls = []
+
+    async def __call__(self, endpoints, concurrency, timeout):
+        self.calls.append((list(endpoints), concurrency))
+        results = []
+        for endpoint in endpoints:
+            latency = self.latencies.get(endpoint)
+            result = {"server": endpoint, "ok": latency is not None, "connect_ms": None, "handshake_ms": None,
+                      "error": None if latency is not None else "Connection refused"}
+            if latency is not None:
+                result.update(connect_ms=latency / 3, handshake_ms=latency * 2 / 3)
+            results.append(result)
+        return results
+
+    @property
+    def probed(self):
+        return [endpoint for endpoints, _ in self.calls for endpoint in endpoints]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+ENDPOINTS = ["slow.example", "fast.example", "medium.example"]
+
+
+@pytest.fixture
+def fake():
+    return FakeProbe({"slow.example": 90, "fast.example": 10, "medium.example": 50})
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def selector(fake, clock):
+    return EndpointSelector(ttl=TTL, timeout=1.0, probe=fake, clock=clock)
+
+
+def test_selects_the_lowest_latency_endpoint(selector):
+    assert selector.select(ENDPOINTS) == "fast.example"
+
+
+def test_rank_orders_by_rtt(selector):
+    ranked = asyncio.run(selector.rank(ENDPOINTS))
+    assert [endpoint for endpoint, _ in ranked] == ["fast.example", "medium.example", "slow.example"]
+    assert ranked[0][1] == pytest.approx(10)
+
+
+def test_endpoints_are_probed_in_one_concurrent_batch(selector, fake):
+    selector.select(ENDPOINTS)
+    assert fake.calls == [(ENDPOINTS, len(ENDPOINTS))]
+
+
+def test_measurements_are_cached_until_the_ttl_expires(selector, fake, clock):
+    selector.select(ENDPOINTS)
+    fake.calls.clear()
+
+    # The fast endpoint degrades; nothing changes until the cache expires
+    fake.latencies["fast.example"] = 200
+    clock.now += TTL - 1
+    assert selector.select(ENDPOINTS) == "fast.example"
+    assert not fake.calls
+
+    clock.now += 1
+    assert selector.select(ENDPOINTS) == "medium.example"
+    assert sorted(fake.probed) == sorted(ENDPOINTS)
+
+
+def test_only_uncached_endpoints_are_probed(selector, fake):
+    selector.select(ENDPOINTS)
+    fake.calls.clear()
+    fake.latencies["new.example"] = 1
+
+    assert selector.select(ENDPOINTS + ["new.example"]) == "new.example"
+    assert fake.probed == ["new.example"]
+
+
+def test_invalidate_forces_a_reprobe(selector, fake):
+    selector.select(ENDPOINTS)
+    fake.calls.clear()
+
+    selector.invalidate("medium.example")
+    selector.select(ENDPOINTS)
+
+    assert fake.probed == ["medium.example"]
+
+
+def test_every_endpoint_failing_falls_back_to_the_first(clock):
+    endpoints = ["down-1.example", "down-2.example"]
+    selector = EndpointSelector(ttl=TTL, probe=FakeProbe({}), clock=clock)
+
+    assert asyncio.run(selector.rank(endpoints)) == []
+    assert selector.select(endpoints) == "down-1.example"
+
+
+def test_build_fastest_uses_the_selected_endpoint(clock):
+    generator = RTMPGenerator()
+    endpoints = generator.platforms["twitch"]["endpoints"]
+    selector = EndpointSelector(ttl=TTL, probe=FakeProbe({endpoints[0]: 30, endpoints[1]: 5}), clock=clock)
+
+    url, server, _ = build_fastest(generator, "twitch", "live_1_abc", selector)
+
+    assert server == endpoints[1]
+    assert url == f"rtmp://{endpoints[1]}/app/live_1_abc"
+
+
+def saved_on_endpoint(endpoint, stream_key="live_1_abc"):
+    return {
+        "name": "fastest",
+        "platform": "twitch",
+        "stream_key": stream_key,
+        "server_url": endpoint,
+        "app_name": "app",
+        "rtmp_url": f"rtmp://{endpoint}/app/{stream_key}",
+    }
+
+
+def test_target_uses_the_saved_endpoint():
+    generator = RTMPGenerator()
+    endpoint = generator.platforms["twitch"]["endpoints"][1]
+
+    assert generator.target(saved_on_endpoint(endpoint)) == (endpoint, "app", "live_1_abc")
+    # An empty server_url still means the platform's default server
+    assert generator.target({"platform": "twitch", "stream_key": "k"})[0] == "live.twitch.tv"
+
+
+def test_rotation_keeps_the_saved_endpoint(tmp_path):
+    store = get_config_store("sqlite", tmp_path)
+    generator = RTMPGenerator(store)
+    endpoint = generator.platforms["twitch"]["endpoints"][1]
+    store.save_many([saved_on_endpoint(endpoint)])
+
+    plan = plan_rotation(store, generator, [{"name": "fastest", "old_key": "", "new_key": "live_2_xyz"}])
+
+    assert not plan["errors"]
+    assert plan["updates"][0]["rtmp_url"] == f"rtmp://{endpoint}/app/live_2_xyz"
@@ -0,0 +1,150 @@
+"""Crash recovery and multi-process behaviour of the journal config store"""
+import os
+import signal
+import subprocess
+import sys
+
+import pytest
+
+from config_store import JournalConfigStore, JournalCorruptError, _encode_record
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WRITER = """
+import sys
+sys.path.insert(0, {root!r})
+from config_store import JournalConfigStore
+store = JournalConfigStore({path!r}, compact_min_bytes=64 * 1024)
+batch = 0
+while True:
+    store.save_many([
+        {{"name": f"crash-{{i:03d}}", "platform": "custom", "stream_key": f"batch-{{batch}}",
+          "server_url": "live.example.com", "app_name": "live", "rtmp_url": ""}}
+        for i in range(200)
+    ])
+    print(batch, flush=True)
+    batch += 1
+"""
+
+
+def configs(count, prefix="config"):
+    return [
+        {
+            "name": f"{prefix}-{i:06d}",
+            "platform": "custom",
+            "stream_key": f"key-{i}",
+            "server_url": "live.example.com",
+            "app_name": "live",
+            "rtmp_url": f"rtmp://live.example.com/live/key-{i}",
+        }
+        for i in range(count)
+    ]
+
+
+def newest_segment(store):
+    return store._segments()[-1]
+
+
+def test_torn_tail_is_ignored_then_truncated(tmp_path):
+    store = JournalConfigStore(tmp_path)
+    store.save_many(configs(10))
+    line = _encode_record({"seq": store._seq + 1, "at": 0, "op": "delete", "name": "config-000000"})
+    with open(newest_segment(store), "ab") as f:
+        f.write(line[:len(line) // 2])
+
+    reader = JournalConfigStore(tmp_path)
+    assert reader.count() == 10
+    assert reader.load("config-000000") is not None
+
+    JournalConfigStore(tmp_path).save_many(configs(1, "after"))
+    reopened = JournalConfigStore(tmp_path)
+    assert reopened.count() == 11
+    assert reopened.load("config-000000") is not None
+    assert reader.count() == 11
+
+
+def test_killed_writer_keeps_every_acknowledged_batch(tmp_path):
+    process = subprocess.Popen(
+        [sys.executable, "-c", WRITER.format(root=ROOT, path=str(tmp_path))], stdout=subprocess.PIPE, text=True
+    )
+    acked = -1
+    # Kill at an arbitrary point after a few compactions
+    while acked < 60:
+        acked = int(process.stdout.readline())
+    os.kill(process.pid, signal.SIGKILL)
+    process.wait()
+    for line in process.stdout:
+        acked = max(acked, int(line))
+
+    store = JournalConfigStore(tmp_path)
+    batches = {config["stream_key"] for config in store.load_all()}
+    assert len(batches) == 1, "a batch was applied partially"
+    assert store.count() == 200
+    assert int(batches.pop().split("-")[1]) in (acked, acked + 1)
+
+
+def test_crash_during_compaction_reopens_cleanly(tmp_path):
+    store = JournalConfigStore(tmp_path)
+    store.save_many(configs(50))
+    store.compact()
+    store.save_many(configs(5, "tail"))
+    # A temp snapshot left behind, then a compaction that renamed its
+    # snapshot but died before creating the next segment
+    (store.journal_dir / ".snapshot-000000000099.json.123.tmp").write_bytes(b'{"seq": 9')
+    store.compact()
+    newest_segment(store).unlink()
+
+    JournalConfigStore(tmp_path).save_many(configs(1, "later"))
+    assert JournalConfigStore(tmp_path).count() == 56
+
+
+def test_damaged_newest_snapshot_falls_back_to_previous(tmp_path):
+    store = JournalConfigStore(tmp_path)
+    store.save_many(configs(30))
+    store.compact()
+    store.save_many(configs(10, "second"))
+    store.compact()
+    newest = store._snapshots()[0]
+    newest.write_bytes(newest.read_bytes()[:100])
+
+    assert JournalConfigStore(tmp_path).count() == 40
+
+
+def test_damaged_record_before_intact_ones_is_reported(tmp_path):
+    store = JournalConfigStore(tmp_path)
+    for i in range(3):
+        store.save_many(configs(5, f"batch{i}"))
+    segment = newest_segment(store)
+    data = bytearray(segment.read_bytes())
+    data[20] ^= 0xFF
+    segment.write_bytes(bytes(data))
+
+    with pytest.raises(JournalCorruptError):
+        JournalConfigStore(tmp_path)
+
+
+def test_second_store_follows_writes_and_compaction(tmp_path):
+    first = JournalConfigStore(tmp_path, compact_min_bytes=1)
+    second = JournalConfigStore(tmp_path)
+    first.save_many(configs(20))
+    assert second.count() == 20
+
+    first.rename("config-000001", "renamed")
+    first.delete("config-000002")
+    updated = dict(first.load("config-000003"), stream_key="rotated")
+    first.save_many([updated])
+    assert second.load("renamed") is not None
+    assert second.load("config-000001") is None
+    assert second.load("config-000002") is None
+    assert second.load("config-000003")["stream_key"] == "rotated"
+
+    # compact_min_bytes=1 compacts after every record, pruning old segments
+    rounds = JournalConfigStore.HISTORY_SEGMENTS + 3
+    for i in range(rounds):
+        first.save_many([dict(updated, stream_key=f"rotated-{i}")])
+    latest = f"rotated-{rounds - 1}"
+    assert second.load("config-000003")["stream_key"] == latest
+
+    history = second.history("config-000003")
+    assert len(history) >= JournalConfigStore.HISTORY_SEGMENTS
+    assert history[-1]["config"]["stream_key"] == latest
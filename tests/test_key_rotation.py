@@ -0,0 +1,153 @@
+"""Bulk stream-key rotation: all-or-nothing planning and json crash safety"""
+import json
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from config_store import ROTATION_FILENAME, JSONConfigStore, get_config_store
+from key_rotation import plan_rotation, rotate_keys
+from rtmp_core import RTMPGenerator
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COUNT = 200
+
+CRASHER = """
+import os, sys
+sys.path.insert(0, {root!r})
+from config_store import JSONConfigStore
+store = JSONConfigStore({path!r})
+configs = [dict(config, stream_key=config["stream_key"] + "-crash") for config in store.load_all()]
+replace, renamed = os.replace, 0
+def crashing_replace(src, dst):
+    global renamed
+    if str(dst).endswith(".json"):
+        renamed += 1
+        if renamed > {after}:
+            os._exit(9)
+    replace(src, dst)
+os.replace = crashing_replace
+store.save_rotation(configs)
+"""
+
+
+def populate(config_dir, backend, count=COUNT):
+    store = get_config_store(backend, config_dir)
+    store.save_many([
+        {
+            "name": f"config-{i:06d}",
+            "platform": "custom",
+            "stream_key": f"key-{i}",
+            "server_url": "live.example.com",
+            "app_name": "live",
+            "rtmp_url": f"rtmp://live.example.com/live/key-{i}",
+        }
+        for i in range(count)
+    ])
+    return store
+
+
+def mapping_for(count, suffix):
+    # Half the rows match by name, half by old key
+    rows = []
+    for i in range(count):
+        if i % 2:
+            rows.append({"name": "", "old_key": f"key-{i}", "new_key": f"key-{i}-{suffix}"})
+        else:
+            rows.append({"name": f"config-{i:06d}", "old_key": "", "new_key": f"key-{i}-{suffix}"})
+    return rows
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "journal", "json"])
+def test_bad_row_writes_nothing(tmp_path, backend):
+    store = populate(tmp_path, backend)
+    mapping = mapping_for(COUNT, "bad")
+    mapping[-1]["name"], mapping[-1]["old_key"] = "no-such-config", ""
+    version = store.version()
+
+    result = rotate_keys(store, RTMPGenerator(store), mapping)
+
+    assert result["rotated"] == 0
+    assert len(result["errors"]) == 1
+    assert store.version() == version
+    assert store.load("config-000000")["stream_key"] == "key-0"
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "journal", "json"])
+def test_every_key_rotates_with_a_new_rtmp_url(tmp_path, backend):
+    store = populate(tmp_path, backend)
+    plan = plan_rotation(store, RTMPGenerator(store), mapping_for(COUNT, "new"))
+
+    assert not plan["errors"]
+    assert store.save_rotation(plan["updates"]) == COUNT
+    for config in store.load_all():
+        assert config["stream_key"].endswith("-new")
+        assert config["rtmp_url"] == f"rtmp://live.example.com/live/{config['stream_key']}"
+
+
+def test_json_failed_write_applies_nothing(tmp_path):
+    store = populate(tmp_path, "json")
+    plan = plan_rotation(store, RTMPGenerator(store), mapping_for(COUNT, "blocked"))
+    # Block the last file's temp path so staging fails partway through the batch
+    path = store._path(plan["updates"][-1]["name"])
+    blocker = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    blocker.mkdir()
+    try:
+        with pytest.raises(OSError):
+            store.save_rotation(plan["updates"])
+    finally:
+        blocker.rmdir()
+
+    assert not list(store.config_dir.glob(".*.tmp"))
+    assert not any(config["stream_key"].endswith("-blocked") for config in store.load_all())
+
+
+def rotated_on_disk(config_dir, suffix):
+    # Reads the files directly: opening a store would finish an interrupted rotation
+    return sum(
+        json.loads(path.read_text())["stream_key"].endswith(suffix) for path in Path(config_dir).glob("*.json")
+    )
+
+
+def test_json_rotation_killed_mid_rename_is_finished_on_next_open(tmp_path):
+    populate(tmp_path, "json")
+    after = COUNT // 3
+    subprocess.run([sys.executable, "-c", CRASHER.format(root=ROOT, path=str(tmp_path), after=after)])
+    assert (tmp_path / ROTATION_FILENAME).exists()
+    assert rotated_on_disk(tmp_path, "-crash") == after
+
+    configs = JSONConfigStore(tmp_path).load_all()
+
+    assert len(configs) == COUNT
+    assert all(config["stream_key"].endswith("-crash") for config in configs)
+    assert not (tmp_path / ROTATION_FILENAME).exists()
+
+
+def test_json_load_all_sees_each_rotation_whole(tmp_path):
+    writer = populate(tmp_path, "json")
+    # One uniform generation to start from, so every scan can be classified
+    configs = [dict(config, stream_key=f"{config['stream_key']}-start") for config in writer.load_all()]
+    writer.save_many(configs)
+    reader = JSONConfigStore(tmp_path)
+    generations = []
+    done = threading.Event()
+
+    def read():
+        while not done.is_set():
+            generations.append({config["stream_key"].rsplit("-", 1)[-1] for config in reader.load_all()})
+
+    thread = threading.Thread(target=read)
+    thread.start()
+    try:
+        for round_number in range(10):
+            configs = [dict(config, stream_key=f"key-{i}-g{round_number}") for i, config in enumerate(configs)]
+            writer.save_rotation(configs)
+    finally:
+        done.set()
+        thread.join()
+
+    assert len(generations) > 1
+    assert not [seen for seen in generations if len(seen) > 1]
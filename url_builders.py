@@ -0,0 +1,74 @@
+"""Compile platform URL templates into specialised builder functions.
+
+Each template such as "rtmp://live.twitch.tv/app/{stream_key}" is turned
+once into a plain Python function that concatenates the known literals with
+its arguments, instead of parsing the template with str.format on every
+call. Builders return (rtmp_url, server, app_name) so callers that need the
+vMix/OBS server and application fields don't have to re-split the URL.
+"""
+from functools import lru_cache
+from string import Formatter
+
+SCHEME = "rtmp://"
+BUILDER_ARGS = ("stream_key", "server_url", "app_name")
+
+
+def template_parts(template):
+    """Split a template into [(is_field, text)]: literals and builder argument names"""
+    parts = []
+    for literal, field, spec, conversion in Formatter().parse(template):
+        if literal:
+            parts.append((False, literal))
+        if field is None:
+            continue
+        if field not in BUILDER_ARGS or spec or conversion:
+            raise ValueError(f"Unsupported template field {{{field}}} in {template!r}")
+        parts.append((True, field))
+    return parts
+
+
+def _concat_expr(template):
+    parts = [text if is_field else repr(text) for is_field, text in template_parts(template)]
+    return " + ".join(parts) if parts else "''"
+
+
+def split_template(template):
+    """Split a template into (server, app_name) sub-templates.
+
+    Templates have the form rtmp://<server>/<app>/{stream_key}; the app part
+    may itself contain slashes.
+    """
+    suffix = "/{stream_key}"
+    if not template.startswith(SCHEME) or not template.endswith(suffix):
+        raise ValueError(f"Template must look like rtmp://<server>/<app>{suffix}: {template!r}")
+    server, _, app_name = template[len(SCHEME):-len(suffix)].partition("/")
+    return server, app_name
+
+
+def compile_template(template):
+    """Return a builder(stream_key, server_url="", app_name="") for template"""
+    server, app_name = split_template(template)
+    source = (
+        "def build(stream_key, server_url='', app_name=''):\n"
+        f"    return {_concat_expr(template)}, {_concat_expr(server)}, {_concat_expr(app_name)}\n"
+    )
+    namespace = {}
+    exec(compile(source, f"<rtmp builder {template}>", "exec"), namespace)
+    build = namespace["build"]
+    build.template = template
+    return build
+
+
+def compile_platforms(platforms):
+    """Compile the template of every platform in a registry dict"""
+    return {
+        name: compile_template(platform["template"])
+        for name, platform in platforms.items()
+    }
+
+
+@lru_cache(maxsize=256)
+def compile_for_endpoint(template, endpoint):
+    """Builder for template with its server replaced by another ingest endpoint"""
+    server, _ = split_template(template)
+    return compile_template(SCHEME + endpoint + template[len(SCHEME) + len(server):])
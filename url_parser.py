@@ -0,0 +1,47 @@
+"""Parse full RTMP URLs back into (platform, server, app_name, stream_key).
+
+The inverse of url_builders. A URL is split into server, application path
+and stream key, then (server, app) is looked up among the registry's
+ingest servers and endpoints. The stream key is the last path segment
+before any query string, so Facebook keys such as "123456789?ds=1" and
+custom apps with nested paths ("live/backup/key") both come out right.
+URLs that match no known platform are "custom".
+
+URL_PATTERN is written in the subset shared by Python's re and RE2, so the
+vectorised importer (bulk_import) parses exactly like URLParser.parse.
+"""
+import re
+
+URL_PATTERN = r"^(?i:rtmps?)://(?P<server>[^/\s]+)/(?P<app>[^?]+)/(?P<key>[^/?]+(?:\?.*)?)$"
+DEFAULT_PORT_SUFFIX = ":1935"
+
+
+def normalize_server(server):
+    """Lowercase and drop the default RTMP port, for comparing servers"""
+    server = server.lower()
+    if server.endswith(DEFAULT_PORT_SUFFIX):
+        server = server[:-len(DEFAULT_PORT_SUFFIX)]
+    return server
+
+
+class URLParser:
+    def __init__(self, platforms):
+        self.pattern = re.compile(URL_PATTERN)
+        # (normalized server, app) -> platform, covering every endpoint
+        self.destinations = {}
+        for name, info in platforms.items():
+            if not info.get("server"):
+                continue
+            for server in [info["server"], *info.get("endpoints", [])]:
+                self.destinations[(normalize_server(server), info["app_name"])] = name
+
+    def platform_for(self, server, app_name):
+        return self.destinations.get((normalize_server(server), app_name), "custom")
+
+    def parse(self, url):
+        """Return (platform, server, app_name, stream_key); raises ValueError if not an RTMP URL"""
+        match = self.pattern.match(url.strip())
+        if match is None:
+            raise ValueError(f"Not an RTMP URL of the form rtmp://server/app/key: {url!r}")
+        server, app_name, stream_key = match.group("server", "app", "key")
+        return self.platform_for(server, app_name), server, app_name, stream_key
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""Run the Streamlit web UI with /metrics, /healthz and /readyz alongside.
+
+Streamlit only executes app.py when a browser session connects, so an
+endpoint started from app.py would not exist until the first visit. This
+entry point starts it on METRICS_PORT (default 8511) first and then hands
+over to Streamlit's own command line in the same process, so app.py shares
+its metrics registry and health monitor:
+
+    python web_server.py --server.port=8509 --server.address=0.0.0.0
+
+Arguments are passed through to `streamlit run app.py`.
+"""
+import os
+import sys
+
+import health
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+
+def main():
+    port = os.environ.get("METRICS_PORT", "8511")
+    if port:
+        health.start(int(port))
+
+    from streamlit.web import cli
+
+    sys.argv = ["streamlit", "run", APP_PATH, *sys.argv[1:]]
+    sys.exit(cli.main())
+
+
+if __name__ == "__main__":
+    main()